@@ -0,0 +1,445 @@
+"""HEIC 변환 처리량 벤치마크
+
+같은 파일 묶음에 대해 형식, 품질, 백엔드, 워커 수 조합별 처리량을 측정합니다.
+결과는 임시 폴더에 저장되므로 원본 폴더는 변경되지 않습니다.
+
+    python heic_benchmark.py <입력 폴더> --backends thread process --workers 4 8
+    python heic_benchmark.py --synthetic --formats JPEG WEBP --qualities 85 95 --json result.json
+    python heic_benchmark.py --synthetic --json new.json --compare result.json
+    python heic_benchmark.py --synthetic --decode-paths --resolutions 4032x3024 8064x6048
+
+--synthetic은 시드로 재현 가능한 HEIC 표본을 해상도별로 생성하므로
+Pillow/pillow-heif 업그레이드나 설정 변경 전후의 결과를 같은 입력으로 비교할 수 있습니다.
+조합마다 별도 프로세스에서 실행해 최대 메모리 사용량(peak RSS)을 조합별로 측정합니다.
+--decode-paths는 Image.open 오프너와 pillow_heif 직접 디코딩을 파일별로 비교해
+메가픽셀당 디코딩+인코딩 시간과 추가 peak RSS를 출력합니다.
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import io
+import multiprocessing
+import tempfile
+import logging
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Sequence, Tuple
+
+from PIL import Image, ImageDraw, ImageFilter
+import PIL
+import pillow_heif
+
+from heic_engine import (
+    SUPPORTED_FORMATS, DEFAULT_MAX_WORKERS, BACKENDS, ENCODER_PRESETS, DEFAULT_PRESET, PRIMARY_PART,
+    ConversionEngine, ConversionSettings, ResizeTarget, scan_heic_files,
+    parse_resize_target, open_image_part, build_save_kwargs
+)
+
+try:
+    import resource  # 유닉스 계열에서만 사용 가능
+except ImportError:
+    resource = None
+
+logger = logging.getLogger("heic_benchmark")
+
+# 합성 표본 기본값 (VGA, FHD, 아이폰 12MP)
+DEFAULT_RESOLUTIONS = ("640x480", "1920x1080", "4032x3024")
+DEFAULT_FILES_PER_RESOLUTION = 4
+DEFAULT_SEED = 1234
+
+# 표에 표시하는 단계 (JSON에는 측정된 모든 단계를 기록)
+STAGES_SHOWN = ("decode", "metadata", "resize", "encode", "write")
+
+# 디코딩 경로 비교: Image.open 오프너(이전 방식)와 pillow_heif 직접 디코딩(변환에 사용하는 방식)
+DECODE_PATHS = ("opener", "direct")
+
+def generate_synthetic_image(size: Tuple[int, int], seed: str) -> Image.Image:
+    """시드로 재현 가능한 사진 비슷한 이미지 생성 (그라데이션 + 도형 + 약한 질감)"""
+    rng = random.Random(seed)
+    width, height = size
+
+    # 채널마다 방향이 다른 그라데이션
+    channels = [Image.linear_gradient("L").rotate(rng.uniform(0, 360)).resize(size) for _ in range(3)]
+    image = Image.merge("RGB", channels)
+
+    # 임의의 색 도형을 그린 뒤 흐리게 처리해 경계가 부드러운 장면 구성
+    draw = ImageDraw.Draw(image)
+    for _ in range(40):
+        x0, y0 = rng.randrange(width), rng.randrange(height)
+        x1 = x0 + rng.randrange(width // 8, width // 2)
+        y1 = y0 + rng.randrange(height // 8, height // 2)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        if rng.random() < 0.5:
+            draw.ellipse((x0, y0, x1, y1), fill=color)
+        else:
+            draw.rectangle((x0, y0, x1, y1), fill=color)
+    image = image.filter(ImageFilter.GaussianBlur(max(1, width // 400)))
+
+    # 센서 노이즈 비슷한 질감 (1/4 해상도 난수를 확대해 섞음)
+    noise_size = (max(1, width // 4), max(1, height // 4))
+    noise = Image.frombytes("RGB", noise_size, rng.randbytes(noise_size[0] * noise_size[1] * 3))
+    return Image.blend(image, noise.resize(size, Image.Resampling.BILINEAR), 0.08)
+
+def generate_synthetic_corpus(directory: Path, resolutions: Sequence[ResizeTarget],
+                              files_per_resolution: int = DEFAULT_FILES_PER_RESOLUTION,
+                              seed: int = DEFAULT_SEED) -> List[str]:
+    """해상도별 합성 HEIC 파일 생성 (같은 이름의 파일이 있으면 재사용) 후 파일 이름 목록 반환"""
+    directory.mkdir(parents=True, exist_ok=True)
+    file_names = []
+
+    for resolution in resolutions:
+        for index in range(files_per_resolution):
+            file_name = f"synthetic_{resolution.width}x{resolution.height}_{seed}_{index:03d}.heic"
+            file_names.append(file_name)
+            path = directory / file_name
+            if path.exists():
+                continue
+
+            image = generate_synthetic_image((resolution.width, resolution.height),
+                                             f"{seed}-{resolution.width}x{resolution.height}-{index}")
+            # 메타데이터 처리 단계도 측정되도록 EXIF 포함
+            exif = Image.Exif()
+            exif[0x010F] = "Synthetic"  # Make
+            exif[0x0110] = "heic_benchmark"  # Model
+            exif[0x0132] = "2024:01:01 12:00:00"  # DateTime
+            image.save(path, format="HEIF", quality=90, exif=exif.tobytes())
+            logger.info(f"합성 표본 생성: {file_name}")
+
+    return file_names
+
+def peak_rss_mb() -> Tuple[Optional[float], Optional[float]]:
+    """(현재 프로세스, 가장 큰 자식 프로세스)의 최대 메모리 사용량 (MB, 측정 불가면 None)"""
+    if resource is None:
+        return None, None
+    # 리눅스는 KB, macOS는 바이트 단위
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit)
+
+def run_backend_benchmark(source_directory: Path, file_names: List[str], total_bytes: int,
+                          settings: ConversionSettings, backend: str, workers: int) -> Dict[str, Any]:
+    """한 가지 백엔드/워커 조합으로 변환을 실행하고 처리량 측정"""
+    with tempfile.TemporaryDirectory(prefix="heic_bench_") as temp_dir:
+        engine = ConversionEngine(source_directory, settings, max_workers=workers,
+                                  backend=backend, output_directory=Path(temp_dir), resume=False,
+                                  profile=True)
+        summary = engine.run(file_names)
+
+    elapsed = max(summary.elapsed, 1e-9)
+    return {
+        "format": settings.output_format.name,
+        "quality": settings.quality,
+        "backend": backend,
+        "workers": workers,
+        "files": len(file_names),
+        "failed": summary.failed,
+        "seconds": summary.elapsed,
+        "files_per_sec": len(file_names) / elapsed,
+        "mb_per_sec": total_bytes / (1024 * 1024) / elapsed,
+        "stages": summary.stage_profile.to_dict(),
+    }
+
+def _isolated_case(case: Dict[str, Any], connection):
+    """별도 프로세스에서 한 조합을 실행하고 결과와 최대 메모리 사용량 전송"""
+    try:
+        settings = ConversionSettings(SUPPORTED_FORMATS[case["format"]], case["quality"], case["preset"])
+        row = run_backend_benchmark(Path(case["source_directory"]), case["file_names"], case["total_bytes"],
+                                    settings, case["backend"], case["workers"])
+        row["peak_rss_mb"], row["peak_worker_rss_mb"] = peak_rss_mb()
+        connection.send(row)
+    except Exception as e:
+        connection.send({"error": str(e)})
+    finally:
+        connection.close()
+
+def run_isolated_case(case: Dict[str, Any]) -> Dict[str, Any]:
+    """조합 하나를 새 프로세스에서 실행 (조합별 최대 메모리 사용량이 섞이지 않도록)"""
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_isolated_case, args=(case, sender))
+    process.start()
+    sender.close()
+    try:
+        row = receiver.recv()
+    except EOFError:
+        row = {"error": f"측정 프로세스가 비정상 종료되었습니다 (종료 코드 {process.exitcode})"}
+    process.join()
+
+    if "error" in row:
+        row.update({key: case[key] for key in ("format", "quality", "backend", "workers")})
+    return row
+
+def decode_and_encode(path: Path, decode_path: str, settings: ConversionSettings) -> Tuple[Tuple[int, int], int]:
+    """디코딩 경로 하나로 파일을 디코딩해 메모리에 인코딩하고 (크기, 결과 바이트 수) 반환"""
+    if decode_path == "opener":
+        image_context = Image.open(path)
+    elif decode_path == "direct":
+        image_context = open_image_part(path, PRIMARY_PART)
+    else:
+        raise ValueError(f"지원하지 않는 디코딩 경로입니다: {decode_path}")
+    with image_context as image:
+        image.load()
+        buffer = io.BytesIO()
+        image.save(buffer, **build_save_kwargs(image, settings))
+        return image.size, buffer.tell()
+
+def _isolated_decode_case(case: Dict[str, Any], connection):
+    """별도 프로세스에서 파일 하나를 한 디코딩 경로로 처리하고 시간과 추가 메모리 사용량 전송
+
+    ru_maxrss는 최댓값만 기록되므로 import 직후 값을 기준으로 늘어난 양을 측정합니다.
+    """
+    try:
+        settings = ConversionSettings(SUPPORTED_FORMATS[case["format"]], case["quality"], case["preset"])
+        baseline, _ = peak_rss_mb()
+        seconds = []
+        for _ in range(case["repeat"]):
+            start_time = time.perf_counter()
+            size, output_bytes = decode_and_encode(Path(case["path"]), case["decode_path"], settings)
+            seconds.append(time.perf_counter() - start_time)
+        peak, _ = peak_rss_mb()
+        megapixels = size[0] * size[1] / 1_000_000
+        connection.send({
+            "file": Path(case["path"]).name,
+            "decode_path": case["decode_path"],
+            "megapixels": megapixels,
+            "output_bytes": output_bytes,
+            "seconds": min(seconds),
+            "ms_per_megapixel": min(seconds) * 1000 / megapixels,
+            "peak_rss_mb": None if peak is None else peak - baseline,
+            "peak_rss_mb_per_megapixel": None if peak is None else (peak - baseline) / megapixels,
+        })
+    except Exception as e:
+        connection.send({"error": str(e)})
+    finally:
+        connection.close()
+
+def run_decode_benchmark(source_directory: Path, file_names: List[str], output_format: str,
+                         quality: int, preset: str, repeat: int) -> List[Dict[str, Any]]:
+    """파일별로 디코딩 경로마다 새 프로세스에서 시간/메모리를 측정하고 비교 표 출력"""
+    logger.info(f"{output_format} 품질 {quality} ({preset}), 디코딩 경로 비교 (파일·경로마다 새 프로세스)")
+    logger.info(f"{'file':<36} {'MP':>6} {'path':<7} {'ms/MP':>8} {'RSS MB/MP':>10}")
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for file_name in file_names:
+        rows = {}
+        for decode_path in DECODE_PATHS:
+            case = {"path": str(source_directory / file_name), "decode_path": decode_path,
+                    "format": output_format, "quality": quality, "preset": preset, "repeat": max(1, repeat)}
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_isolated_decode_case, args=(case, sender))
+            process.start()
+            sender.close()
+            try:
+                row = receiver.recv()
+            except EOFError:
+                row = {"error": f"측정 프로세스가 비정상 종료되었습니다 (종료 코드 {process.exitcode})"}
+            process.join()
+            row.setdefault("file", file_name)
+            row.setdefault("decode_path", decode_path)
+            results.append(row)
+            if "error" in row:
+                logger.error(f"{file_name} {decode_path}: {row['error']}")
+                continue
+            rows[decode_path] = row
+            rss = row["peak_rss_mb_per_megapixel"]
+            logger.info(f"{file_name[:36]:<36} {row['megapixels']:>6.1f} {decode_path:<7} "
+                        f"{row['ms_per_megapixel']:>8.1f} {rss if rss is not None else float('nan'):>10.2f}")
+
+    # 전체 합으로 비교 (큰 파일일수록 비중이 큼)
+    totals = {}
+    for decode_path in DECODE_PATHS:
+        done = [row for row in results if row.get("decode_path") == decode_path and "error" not in row]
+        megapixels = sum(row["megapixels"] for row in done)
+        if not megapixels:
+            continue
+        peaks = [row["peak_rss_mb"] for row in done if row["peak_rss_mb"] is not None]
+        totals[decode_path] = (
+            sum(row["seconds"] for row in done) * 1000 / megapixels,
+            sum(peaks) / megapixels if len(peaks) == len(done) else None,
+        )
+    if len(totals) == len(DECODE_PATHS):
+        (before_ms, before_rss), (after_ms, after_rss) = totals["opener"], totals["direct"]
+        logger.info("")
+        logger.info(f"시간: {before_ms:.1f} → {after_ms:.1f} ms/MP ({(after_ms - before_ms) / before_ms * 100:+.1f}%)")
+        if before_rss and after_rss is not None:
+            logger.info(f"추가 peak RSS: {before_rss:.2f} → {after_rss:.2f} MB/MP "
+                        f"({(after_rss - before_rss) / before_rss * 100:+.1f}%)")
+    return results
+
+def case_key(row: Dict[str, Any]) -> Tuple:
+    """실행 간 비교용 조합 식별자"""
+    return row["format"], row["quality"], row["backend"], row["workers"]
+
+def compare_results(baseline: Dict[str, Any], results: List[Dict[str, Any]]):
+    """이전 결과 파일과 조합별 처리량 비교 출력"""
+    baseline_rows: Dict[Tuple, List[float]] = {}
+    for row in baseline.get("results", []):
+        if "error" not in row:
+            baseline_rows.setdefault(case_key(row), []).append(row["files_per_sec"])
+
+    logger.info("")
+    logger.info(f"{'format':<6} {'quality':>7} {'backend':<8} {'workers':>7} {'before':>9} {'after':>9} {'change':>8}")
+    current_rows: Dict[Tuple, List[float]] = {}
+    for row in results:
+        if "error" not in row:
+            current_rows.setdefault(case_key(row), []).append(row["files_per_sec"])
+
+    for key, values in current_rows.items():
+        if key not in baseline_rows:
+            continue
+        # 반복 측정은 최댓값으로 비교 (잡음은 대부분 느려지는 쪽으로 생김)
+        before, after = max(baseline_rows[key]), max(values)
+        change = (after - before) / before * 100 if before else 0.0
+        logger.info(f"{key[0]:<6} {key[1]:>7} {key[2]:<8} {key[3]:>7} {before:>9.2f} {after:>9.2f} {change:>+7.1f}%")
+
+def environment_info() -> Dict[str, Any]:
+    """결과 비교에 필요한 실행 환경 정보"""
+    return {
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "pillow_heif": pillow_heif.__version__,
+        "platform": platform.platform(),
+        "cpu_count": DEFAULT_MAX_WORKERS,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def build_parser() -> argparse.ArgumentParser:
+    """명령줄 인자 정의"""
+    parser = argparse.ArgumentParser(description="형식/품질/백엔드/워커 수 조합별 변환 처리량을 비교합니다.")
+    parser.add_argument("input_dir", type=Path, nargs="?", help="HEIC 파일이 있는 폴더 (--synthetic이면 생략)")
+    parser.add_argument("-f", "--formats", "--format", nargs="+", choices=list(SUPPORTED_FORMATS.keys()),
+                        default=["JPEG"])
+    parser.add_argument("-q", "--qualities", "--quality", nargs="+", type=int, default=[95])
+    parser.add_argument("-p", "--preset", choices=list(ENCODER_PRESETS.keys()), default=DEFAULT_PRESET,
+                        help=f"인코더 프리셋 (기본값: {DEFAULT_PRESET})")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--workers", nargs="+", type=int, default=[DEFAULT_MAX_WORKERS])
+    parser.add_argument("--repeat", type=int, default=1, help="조합별 반복 횟수")
+    parser.add_argument("--synthetic", action="store_true", help="재현 가능한 합성 HEIC 표본으로 측정")
+    parser.add_argument("--resolutions", nargs="+", type=parse_resize_target, metavar="WxH",
+                        default=[parse_resize_target(text) for text in DEFAULT_RESOLUTIONS],
+                        help=f"합성 표본 해상도 (기본값: {' '.join(DEFAULT_RESOLUTIONS)})")
+    parser.add_argument("--count", type=int, default=DEFAULT_FILES_PER_RESOLUTION,
+                        help=f"해상도별 합성 표본 수 (기본값: {DEFAULT_FILES_PER_RESOLUTION})")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="합성 표본 시드")
+    parser.add_argument("--corpus-dir", type=Path, default=None,
+                        help="합성 표본을 저장/재사용할 폴더 (기본값: 임시 폴더)")
+    parser.add_argument("--no-isolate", action="store_true",
+                        help="조합별 프로세스를 따로 띄우지 않음 (더 빠르지만 peak RSS는 측정하지 않음)")
+    parser.add_argument("--decode-paths", action="store_true",
+                        help="처리량 대신 오프너/직접 디코딩 경로의 메가픽셀당 시간과 peak RSS 비교 "
+                             "(첫 번째 형식/품질 사용, --repeat은 시간 측정 반복)")
+    parser.add_argument("--json", type=Path, default=None, metavar="PATH", help="결과를 JSON으로 저장 ('-'는 표준 출력)")
+    parser.add_argument("--compare", type=Path, default=None, metavar="PATH", help="이전 JSON 결과와 처리량 비교")
+    return parser
+
+def run_benchmarks(args: argparse.Namespace, source_directory: Path, corpus: Dict[str, Any]) -> int:
+    """모든 조합을 실행하고 결과 출력/저장"""
+    file_names, total_bytes = scan_heic_files(source_directory)
+    if not file_names:
+        logger.error("HEIC 파일을 찾을 수 없습니다")
+        return 2
+    corpus.update({"files": len(file_names), "total_bytes": total_bytes})
+
+    logger.info(f"{len(file_names):,}개 파일, {total_bytes / (1024 * 1024):.1f} MB")
+    if args.decode_paths:
+        results = run_decode_benchmark(source_directory, file_names, args.formats[0], args.qualities[0],
+                                       args.preset, args.repeat)
+        write_report(args, {"environment": environment_info(), "corpus": corpus, "decode_results": results})
+        return 0
+
+    logger.info(f"{'format':<6} {'quality':>7} {'backend':<8} {'workers':>7} {'seconds':>9} "
+                f"{'files/s':>9} {'MB/s':>8} {'RSS MB':>8}")
+
+    results = []
+    for output_format in args.formats:
+        for quality in args.qualities:
+            for backend in args.backends:
+                for workers in args.workers:
+                    for repeat in range(args.repeat):
+                        case = {
+                            "source_directory": str(source_directory), "file_names": file_names,
+                            "total_bytes": total_bytes, "format": output_format, "quality": quality,
+                            "backend": backend, "workers": workers, "preset": args.preset,
+                        }
+                        if args.no_isolate:
+                            settings = ConversionSettings(SUPPORTED_FORMATS[output_format], quality, args.preset)
+                            row = run_backend_benchmark(source_directory, file_names, total_bytes,
+                                                        settings, backend, workers)
+                        else:
+                            row = run_isolated_case(case)
+                        row["repeat"] = repeat
+                        results.append(row)
+
+                        if "error" in row:
+                            logger.error(f"{output_format} {quality} {backend} {workers}: {row['error']}")
+                            continue
+                        peaks = [value for value in (row.get("peak_rss_mb"), row.get("peak_worker_rss_mb")) if value]
+                        peak = f"{max(peaks):>8.1f}" if peaks else f"{'-':>8}"
+                        logger.info(
+                            f"{row['format']:<6} {row['quality']:>7} {row['backend']:<8} {row['workers']:>7} "
+                            f"{row['seconds']:>9.2f} {row['files_per_sec']:>9.2f} {row['mb_per_sec']:>8.2f} {peak}"
+                        )
+
+    # 조합별 단계 시간 중앙값 (엔진이 파일마다 측정한 값)
+    logger.info("")
+    logger.info(f"{'format':<6} {'quality':>7} {'backend':<8} {'workers':>7} "
+                + " ".join(f"{stage:>9}" for stage in STAGES_SHOWN) + "  (p50 ms)")
+    for row in results:
+        if "error" in row:
+            continue
+        logger.info(
+            f"{row['format']:<6} {row['quality']:>7} {row['backend']:<8} {row['workers']:>7} "
+            + " ".join(f"{row['stages'].get(stage, {}).get('p50_ms', 0):>9.1f}" for stage in STAGES_SHOWN)
+        )
+
+    report = {"environment": environment_info(), "corpus": corpus, "results": results}
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare_results(json.load(f), results)
+
+    write_report(args, report)
+    return 0
+
+def write_report(args: argparse.Namespace, report: Dict[str, Any]):
+    """--json이 있으면 결과 저장"""
+    if args.json:
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if str(args.json) == "-":
+            print(text)
+        else:
+            args.json.write_text(text, encoding='utf-8')
+            logger.info(f"결과 저장: {args.json}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """메인 함수"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    # JSON을 표준 출력으로 내보낼 때는 표 출력과 섞이지 않도록 로그를 표준 에러로 보냄
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stderr)
+
+    if not args.synthetic:
+        if args.input_dir is None:
+            parser.error("입력 폴더 또는 --synthetic을 지정해야 합니다")
+        return run_benchmarks(args, args.input_dir, {"synthetic": False, "directory": str(args.input_dir)})
+
+    corpus = {
+        "synthetic": True,
+        "seed": args.seed,
+        "resolutions": [f"{r.width}x{r.height}" for r in args.resolutions],
+        "files_per_resolution": args.count,
+    }
+    if args.corpus_dir:
+        generate_synthetic_corpus(args.corpus_dir, args.resolutions, args.count, args.seed)
+        return run_benchmarks(args, args.corpus_dir, corpus)
+
+    with tempfile.TemporaryDirectory(prefix="heic_corpus_") as temp_dir:
+        generate_synthetic_corpus(Path(temp_dir), args.resolutions, args.count, args.seed)
+        return run_benchmarks(args, Path(temp_dir), corpus)
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
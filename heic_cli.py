@@ -0,0 +1,290 @@
+"""HEIC 변환기 명령줄 실행기
+
+디스플레이 없이(헤드리스 서버 등) 변환 엔진을 실행합니다.
+
+    python heic_cli.py <입력 폴더> --format JPEG --quality 95 --workers 8 --backend process
+"""
+import sys
+import time
+import signal
+import argparse
+import itertools
+import multiprocessing
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+from heic_engine import (
+    SUPPORTED_FORMATS, DEFAULT_MAX_WORKERS, BACKENDS, DEFAULT_BACKEND, ENCODER_PRESETS, DEFAULT_PRESET,
+    MIN_QUALITY, MAX_QUALITY,
+    RESAMPLE_FILTERS, DEFAULT_RESAMPLE, TEMPLATE_FIELDS, parse_resize_target, parse_byte_size, parse_name_template,
+    ConversionEngine, ConversionSettings, ConversionResult, iter_heic_files, scan_heic_files,
+    benchmark_presets, ProgressTracker, format_duration
+)
+from heic_watch import WATCH_SETTLE_SECONDS, InboxWatcher, WatchBatch
+
+logger = logging.getLogger("heic_cli")
+
+# 진행 상황 요약을 출력하는 간격 (초)
+REPORT_INTERVAL = 5.0
+
+def name_template(text: str) -> str:
+    """--name-template 값 검사 (오류 내용을 그대로 표시)"""
+    try:
+        parse_name_template(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return text
+
+def positive_int(text: str) -> int:
+    """1 이상의 정수 인자 검사"""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"정수가 아닙니다: {text}")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"1 이상이어야 합니다: {text}")
+    return value
+
+def build_parser() -> argparse.ArgumentParser:
+    """명령줄 인자 정의"""
+    parser = argparse.ArgumentParser(description="HEIC 이미지를 JPEG/PNG/WEBP로 일괄 변환합니다.")
+    parser.add_argument("input_dir", type=Path, help="HEIC 파일이 있는 폴더")
+    parser.add_argument("-f", "--format", action="append", choices=list(SUPPORTED_FORMATS.keys()),
+                        help="출력 형식 (기본값: JPEG). 여러 번 지정하면 한 번 디코딩해 "
+                             "<출력 폴더>/<확장자>에 형식별로 저장")
+    parser.add_argument("-q", "--quality", type=int, default=95,
+                        help=f"품질 {MIN_QUALITY}~{MAX_QUALITY} (기본값: 95)")
+    parser.add_argument("-p", "--preset", choices=list(ENCODER_PRESETS.keys()), default=DEFAULT_PRESET,
+                        help=f"인코더 속도/용량 프리셋 (기본값: {DEFAULT_PRESET})")
+    parser.add_argument("-t", "--target-size", type=parse_byte_size, metavar="SIZE",
+                        help="목표 파일 크기 (예: 500K, 1.5M). JPEG/WEBP는 --quality를 상한으로 "
+                             "이 크기 이하가 되는 가장 높은 품질로 저장")
+    parser.add_argument("-r", "--resize", action="append", type=parse_resize_target, metavar="SIZE",
+                        help="출력 크기: 긴 변 최대값(2048) 또는 맞춤 상자(1920x1080). "
+                             "여러 번 지정하면 한 번 디코딩해 크기별 파일(<이름>_<크기>)을 저장")
+    parser.add_argument("--resample", choices=list(RESAMPLE_FILTERS.keys()), default=DEFAULT_RESAMPLE,
+                        help=f"크기 조절 필터, 앞쪽일수록 빠름 (기본값: {DEFAULT_RESAMPLE})")
+    parser.add_argument("--all-images", action="store_true",
+                        help="HEIF 안의 모든 이미지(연사 등)를 저장 (기본 이미지 외에는 <이름>-<번호>)")
+    parser.add_argument("--auxiliary-images", action="store_true",
+                        help="깊이 맵 등 보조 이미지도 저장 (<이름>-depth 등)")
+    parser.add_argument("--benchmark-presets", type=int, nargs="?", const=10, metavar="N",
+                        help="표본 N개(기본값: 10)로 프리셋별 인코딩 시간과 용량을 비교하고 종료")
+    parser.add_argument("-w", "--workers", type=positive_int, default=DEFAULT_MAX_WORKERS,
+                        help=f"동시 작업 수 (기본값: {DEFAULT_MAX_WORKERS})")
+    parser.add_argument("-b", "--backend", choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help=f"병렬 처리 방식 (기본값: {DEFAULT_BACKEND})")
+    parser.add_argument("-o", "--output", type=Path, default=None,
+                        help="출력 폴더 (기본값: <입력 폴더>/<확장자>)")
+    parser.add_argument("-n", "--name-template", type=name_template, metavar="TEMPLATE",
+                        help="출력 경로 템플릿 (예: '{DateTimeOriginal:%%Y/%%m}/{stem}.{ext}'), "
+                             f"필드: {', '.join(TEMPLATE_FIELDS)}. 겹치는 이름은 변환 전에 _1, _2…로 정리")
+    parser.add_argument("-m", "--memory-budget", type=parse_byte_size, metavar="SIZE",
+                        help="동시에 디코딩하는 이미지의 추정 메모리 한도 (예: 2G, 512M). "
+                             "헤더의 가로×세로×채널로 추정해 한도 안에서만 새 파일을 시작")
+    parser.add_argument("--in-flight", type=positive_int, default=None, metavar="N",
+                        help="동시에 제출해 두는 최대 작업 수 (기본값: 워커 수 × 4)")
+    parser.add_argument("-i", "--incremental", action="store_true",
+                        help="매니페스트를 사용해 새로 추가되거나 변경된 파일만 변환")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="내용이 같은 파일은 한 번만 변환하고 나머지는 결과를 하드 링크(안 되면 복사)")
+    parser.add_argument("--watch", action="store_true",
+                        help="종료(Ctrl+C)할 때까지 폴더를 감시하며 새로 들어온 파일을 변환 (--incremental 포함)")
+    parser.add_argument("--settle", type=float, default=WATCH_SETTLE_SECONDS, metavar="SECONDS",
+                        help=f"감시 모드에서 크기/수정 시각이 이 시간 동안 그대로여야 변환 (기본값: {WATCH_SETTLE_SECONDS:g})")
+    parser.add_argument("--poll", action="store_true",
+                        help="감시 모드에서 inotify 대신 주기적 확인 사용 (네트워크 드라이브 등)")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="중단된 이전 실행을 이어서 하지 않고 처음부터 변환")
+    parser.add_argument("--no-recursive", action="store_true", help="하위 폴더는 검색하지 않음")
+    parser.add_argument("--include", action="append", metavar="GLOB",
+                        help="이 패턴과 일치하는 파일만 변환 (여러 번 지정 가능)")
+    parser.add_argument("--exclude", action="append", metavar="GLOB",
+                        help="이 패턴과 일치하는 파일/폴더 제외 (여러 번 지정 가능)")
+    parser.add_argument("--timings", type=Path, default=None, metavar="PATH",
+                        help="단계별 소요 시간(p50/p95/p99)을 출력하고 .json 또는 .csv로 저장")
+    parser.add_argument("-v", "--verbose", action="store_true", help="파일별 진행 상황 출력")
+    return parser
+
+def run_preset_benchmark(args: argparse.Namespace, settings: ConversionSettings) -> int:
+    """프리셋별 인코딩 시간/용량 비교 출력"""
+    file_names, _ = scan_heic_files(args.input_dir, not args.no_recursive, args.include, args.exclude)
+    if not file_names:
+        logger.warning("HEIC 파일을 찾을 수 없습니다")
+        return 0
+
+    results = benchmark_presets(args.input_dir, file_names, settings, args.benchmark_presets)
+    logger.info(f"{args.format} 품질 {args.quality}, 표본 {results[0].files:,}개")
+    logger.info(f"{'preset':<10} {'encode s':>9} {'ms/file':>8} {'output MB':>10}")
+    for result in results:
+        per_file = result.encode_seconds / result.files * 1000 if result.files else 0
+        logger.info(
+            f"{result.preset:<10} {result.encode_seconds:>9.2f} {per_file:>8.1f} "
+            f"{result.output_bytes / (1024 * 1024):>10.2f}"
+        )
+    return 0
+
+def run_watch(args: argparse.Namespace, settings: ConversionSettings) -> int:
+    """감시 모드: 새로 들어온 파일의 쓰기가 끝나면 배치로 변환"""
+    def create_engine(executor=None, reserved_names=None) -> ConversionEngine:
+        return ConversionEngine(args.input_dir, settings, max_workers=args.workers,
+                                backend=args.backend, output_directory=args.output,
+                                incremental=True, max_in_flight=args.in_flight,
+                                resume=not args.no_resume, memory_budget=args.memory_budget,
+                                dedupe=args.dedupe, executor=executor, reserved_names=reserved_names)
+
+    watcher = InboxWatcher(args.input_dir, create_engine, not args.no_recursive, args.include, args.exclude,
+                           args.settle, args.poll)
+
+    # 첫 Ctrl+C는 진행 중인 파일만 마치고 종료, 두 번째는 즉시 종료
+    def on_interrupt(signum, frame):
+        logger.warning("중지 요청: 진행 중인 파일만 마치고 감시를 종료합니다 (다시 누르면 즉시 종료)")
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        watcher.stop()
+
+    signal.signal(signal.SIGINT, on_interrupt)
+
+    def on_progress(completed: int, total: Optional[int], result: ConversionResult):
+        if args.verbose:
+            mark = "SKIP" if result.skipped else ("OK" if result.success else "FAIL")
+            logger.info(f"[{completed}/{total}] {mark} {result.file_name}")
+        elif not result.success:
+            logger.warning(f"실패: {result.file_name} ({result.error})")
+
+    def on_batch(batch: WatchBatch):
+        summary = batch.summary
+        logger.info(
+            f"{time.strftime('%H:%M:%S')} 배치 {len(batch.files):,}개: 성공 {summary.successful:,}개, "
+            f"실패 {summary.failed:,}개, 건너뜀 {summary.skipped:,}개, {summary.elapsed:.1f}초"
+        )
+
+    def on_ready(method: str):
+        logger.info(f"폴더 감시 중 ({method}): {args.input_dir} - 종료하려면 Ctrl+C")
+
+    batches = watcher.run(on_progress, on_batch, on_ready)
+    failed = sum(batch.summary.failed for batch in batches)
+    logger.info(
+        f"감시 종료: 배치 {len(batches):,}개, 성공 {sum(batch.summary.successful for batch in batches):,}개, "
+        f"실패 {failed:,}개"
+    )
+    return 0 if failed == 0 else 1
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """메인 함수"""
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if not args.input_dir.is_dir():
+        logger.error(f"폴더를 찾을 수 없습니다: {args.input_dir}")
+        return 2
+    if not MIN_QUALITY <= args.quality <= MAX_QUALITY:
+        logger.error(f"품질은 {MIN_QUALITY}~{MAX_QUALITY} 사이여야 합니다")
+        return 2
+    if args.settle < 0:
+        logger.error("--settle은 0 이상이어야 합니다")
+        return 2
+    if args.benchmark_presets is not None and args.benchmark_presets < 1:
+        logger.error("--benchmark-presets 표본 수는 1 이상이어야 합니다")
+        return 2
+
+    # 같은 형식을 여러 번 지정해도 한 번만 저장
+    format_names = list(dict.fromkeys(args.format or ["JPEG"]))
+    args.format = format_names[0]
+    settings = ConversionSettings(SUPPORTED_FORMATS[format_names[0]], args.quality, args.preset,
+                                  tuple(args.resize or ()), args.resample,
+                                  tuple(SUPPORTED_FORMATS[name] for name in format_names[1:]),
+                                  args.target_size, args.all_images, args.auxiliary_images,
+                                  args.name_template)
+
+    if args.benchmark_presets is not None:
+        return run_preset_benchmark(args, settings)
+    if args.watch:
+        return run_watch(args, settings)
+
+    entries = iter_heic_files(args.input_dir, not args.no_recursive, args.include, args.exclude)
+    first_entry = next(entries, None)
+    if first_entry is None:
+        logger.warning("HEIC 파일을 찾을 수 없습니다")
+        return 0
+
+    # 스캔과 변환을 동시에 진행 (스캔된 파일은 곧바로 작업으로 제출됨)
+    scanned = {"count": 0, "size": 0}
+
+    def iter_file_names():
+        for entry in itertools.chain([first_entry], entries):
+            scanned["count"] += 1
+            scanned["size"] += entry.size
+            yield entry.file_name
+
+    engine = ConversionEngine(args.input_dir, settings, max_workers=args.workers,
+                              backend=args.backend, output_directory=args.output,
+                              incremental=args.incremental, max_in_flight=args.in_flight,
+                              resume=not args.no_resume, profile=args.timings is not None,
+                              memory_budget=args.memory_budget, dedupe=args.dedupe)
+
+    # 첫 Ctrl+C는 진행 중인 파일만 마치고 종료, 두 번째는 즉시 종료
+    def on_interrupt(signum, frame):
+        logger.warning("중지 요청: 진행 중인 파일만 마치고 종료합니다 (다시 누르면 즉시 종료)")
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        engine.cancel()
+
+    signal.signal(signal.SIGINT, on_interrupt)
+
+    tracker = ProgressTracker()
+    last_report = time.monotonic()
+
+    def on_progress(completed: int, total: Optional[int], result: ConversionResult):
+        nonlocal last_report
+        tracker(completed, total, result)
+        if args.verbose:
+            mark = "SKIP" if result.skipped else ("OK" if result.success else "FAIL")
+            if result.duplicate_of is not None and result.success and not result.skipped:
+                mark = "LINK"
+            iterations = f" (인코딩 {result.encode_iterations}회)" if result.encode_iterations else ""
+            stages = ""
+            if args.timings and result.stage_seconds:
+                stages = " " + " ".join(f"{stage}={seconds * 1000:.0f}ms"
+                                        for stage, seconds in result.stage_seconds.items())
+            logger.info(f"[{completed}/{total or '?'}] {mark} {result.file_name}{iterations}{stages}")
+        elif time.monotonic() - last_report >= REPORT_INTERVAL:
+            last_report = time.monotonic()
+            snapshot = tracker.poll()
+            eta = f", 남은 시간 {format_duration(snapshot.eta_seconds)}" if snapshot.eta_seconds is not None else ""
+            logger.info(
+                f"진행: {snapshot.completed:,}/{snapshot.total or '?'} "
+                f"({snapshot.files_per_sec:.1f}개/초, {snapshot.mb_per_sec:.1f} MB/초{eta})"
+            )
+
+    summary = engine.run(iter_file_names(), on_progress)
+
+    logger.info(f"{scanned['count']:,}개의 HEIC 파일 처리 ({scanned['size'] / (1024 * 1024):.1f} MB)")
+    logger.info(
+        f"완료: 성공 {summary.successful:,}개, 실패 {summary.failed:,}개, 건너뜀 {summary.skipped:,}개, "
+        f"{summary.elapsed:.1f}초 - 저장 위치: {summary.output_directory}"
+    )
+    if summary.duplicates:
+        logger.info(
+            f"중복 파일: {summary.duplicates:,}개는 변환하지 않고 결과를 링크했습니다 "
+            f"(원본 {summary.duplicate_bytes / (1024 * 1024):.1f} MB 디코딩/인코딩 생략)"
+        )
+    if settings.target_bytes is not None and summary.encoded:
+        logger.info(
+            f"목표 용량 탐색: 파일당 평균 {summary.encode_iterations / summary.encoded:.1f}회, "
+            f"최대 {summary.max_encode_iterations}회 인코딩, 목표 초과 {summary.over_budget:,}개"
+        )
+    if summary.stage_profile is not None:
+        for line in summary.stage_profile.format_lines():
+            logger.info(line)
+        try:
+            summary.stage_profile.export(args.timings)
+        except (OSError, ValueError) as e:
+            logger.error(f"단계별 시간을 저장할 수 없습니다: {e}")
+    if summary.cancelled:
+        logger.warning("사용자 요청으로 중지되었습니다")
+        return 130
+    return 0 if summary.failed == 0 else 1
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,49 +1,151 @@
 import os
 import threading
+import multiprocessing
 import concurrent.futures
 import subprocess
 import platform
 from pathlib import Path
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass
+from typing import List, Optional, Dict, Any, Tuple
 import logging
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from PIL import Image, ImageTk, UnidentifiedImageError
-from pillow_heif import register_heif_opener
 
-# HEIF 형식 지원 등록
-register_heif_opener()
+import heic_engine
+from heic_engine import (
+    ImageFormat, ConversionEngine, ConversionSettings, ProgressTracker, format_duration
+)
+from heic_file_index import FileIndex
+from heic_metadata import ImageMetadata, IndexStats, MetadataCache, MetadataIndexer
+from heic_preview import (
+    ImageDetails, PreviewImage, PreviewCache, PreviewPrefetcher, load_file_view, render_final_preview,
+    PREVIEW_UPGRADE_DELAY_MS, PREFETCH_DISTANCE, RESIZE_DEBOUNCE_MS
+)
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
-class ImageFormat:
-    """이미지 형식 정보를 담는 데이터 클래스"""
-    name: str
-    extension: str
-    pil_format: str
-
 class HEICConverter:
     """HEIC 이미지 변환기 메인 클래스"""
     
     # 지원하는 이미지 형식들
-    SUPPORTED_FORMATS = {
-        "JPEG": ImageFormat("JPEG", "jpg", "JPEG"),
-        "PNG": ImageFormat("PNG", "png", "PNG"),
-        "WEBP": ImageFormat("WEBP", "webp", "WEBP")
-    }
+    SUPPORTED_FORMATS = heic_engine.SUPPORTED_FORMATS
     
     # 지원하는 HEIC 확장자들
-    HEIC_EXTENSIONS = {'.heic', '.heif', '.HEIC', '.HEIF'}
+    HEIC_EXTENSIONS = heic_engine.HEIC_EXTENSIONS
+    
+    # 출력 형식 (표시 이름 → 형식 이름 목록, 여러 개면 한 번 디코딩해 형식별 폴더에 저장)
+    FORMAT_LABELS = {
+        "JPEG": ("JPEG",),
+        "PNG": ("PNG",),
+        "WEBP": ("WEBP",),
+        "JPEG + WEBP": ("JPEG", "WEBP"),
+        "JPEG + PNG + WEBP": ("JPEG", "PNG", "WEBP"),
+    }
+    
+    # 목표 용량 (표시 이름 → 바이트, JPEG/WEBP는 품질을 상한으로 이 크기 이하가 되게 저장)
+    TARGET_SIZE_LABELS = {
+        "제한 없음": None,
+        "200 KB": 200 * 1024,
+        "500 KB": 500 * 1024,
+        "1 MB": 1024 * 1024,
+        "2 MB": 2 * 1024 * 1024,
+    }
+    
+    # 인코더 프리셋 (표시 이름 → 엔진 프리셋)
+    PRESET_LABELS = {
+        "빠르게": "fast",
+        "균형": "balanced",
+        "최소 용량": "smallest"
+    }
+    
+    # 출력 크기 (표시 이름 → 엔진 크기 목록, 여러 개면 크기별 파일 저장)
+    RESIZE_LABELS = {
+        "원본 크기": (),
+        "긴 변 3840px": (heic_engine.ResizeTarget(3840, 3840),),
+        "긴 변 2048px": (heic_engine.ResizeTarget(2048, 2048),),
+        "긴 변 1280px": (heic_engine.ResizeTarget(1280, 1280),),
+        "웹용 3종 (2048/1024/320)": (
+            heic_engine.ResizeTarget(2048, 2048),
+            heic_engine.ResizeTarget(1024, 1024),
+            heic_engine.ResizeTarget(320, 320),
+        ),
+    }
+    
+    # 크기 조절 필터 (표시 이름 → 엔진 필터)
+    RESAMPLE_LABELS = {
+        "고품질": "lanczos",
+        "보통": "bicubic",
+        "빠르게": "bilinear"
+    }
+    
+    # 출력 파일 이름/폴더 템플릿 (표시 이름 → 템플릿, None이면 원본 이름)
+    NAME_TEMPLATE_LABELS = {
+        "원본 이름": None,
+        "한 폴더에 모음": "{stem}.{ext}",
+        "촬영 연/월 폴더": "{DateTimeOriginal:%Y/%m}/{stem}.{ext}",
+        "촬영 일시 이름": "{DateTimeOriginal:%Y%m%d_%H%M%S}.{ext}"
+    }
+    
+    # 동시에 디코딩하는 이미지의 메모리 한도 (표시 이름 → 바이트)
+    MEMORY_BUDGET_LABELS = {
+        "제한 없음": None,
+        "1 GB": 1024 ** 3,
+        "2 GB": 2 * 1024 ** 3,
+        "4 GB": 4 * 1024 ** 3,
+        "8 GB": 8 * 1024 ** 3,
+    }
+    
+    # 단계별 시간 통계 파일 이름 (확장자 제외, 결과 폴더에 저장)
+    TIMINGS_FILE_STEM = "heic_timings"
+    
+    # 진행률 화면 갱신 주기 (ms)
+    PROGRESS_POLL_MS = 100
+    
+    # 파일 목록 열 (열 이름 → 제목, 너비, 정렬)
+    FILE_COLUMNS = {
+        "name": ("파일 이름", 160, 'w'),
+        "size": ("크기", 70, 'e'),
+        "date": ("날짜", 110, 'center'),
+        "pixels": ("해상도", 85, 'e'),
+    }
+    
+    # 필터 입력이 멈춘 뒤 목록을 다시 거르기까지 기다리는 시간 (ms)
+    FILTER_DEBOUNCE_MS = 120
+    
+    # 마우스 휠 한 칸에 움직이는 행 수
+    WHEEL_SCROLL_ROWS = 3
+    
+    # 병렬 처리 방식 (표시 이름 → 엔진 백엔드)
+    BACKEND_LABELS = {
+        "스레드": "thread",
+        "프로세스": "process"
+    }
     
     def __init__(self):
         self.source_directory: Optional[Path] = None
         self.output_directory: Optional[Path] = None
-        self.heic_files: List[str] = []
+        self.file_index = FileIndex()
+        self.list_offset = 0  # 파일 목록 맨 위에 보이는 행의 표시 순서
+        self.selected_row: Optional[int] = None  # 선택한 파일의 행 번호 (스캔 순서)
+        self.filter_job: Optional[str] = None
+        self.metadata_indexer: Optional[MetadataIndexer] = None
+        self.metadata_cache: Optional[MetadataCache] = None  # UI 스레드 조회용 연결
+        self.scan_generation = 0
+        self.scan_done = threading.Event()
+        self.scan_done.set()
+        self.preview_upgrade_job: Optional[str] = None
+        self.preview_cache = PreviewCache()
+        self.prefetcher = PreviewPrefetcher(self.preview_cache)
+        self.preview_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.preview_request_id = 0
+        self.resize_job: Optional[str] = None
+        self.window_size: Optional[Tuple[int, int]] = None
+        self.progress_tracker: Optional[ProgressTracker] = None
+        self.conversion_engine: Optional[ConversionEngine] = None
+        self.progress_job: Optional[str] = None
         self.setup_ui()
         self.setup_styles()
         
@@ -162,9 +264,9 @@ class HEICConverter:
         ttk.Label(self.format_frame, text="출력 형식:", style='Header.TLabel').pack(anchor='w')
         self.format_combo = ttk.Combobox(
             self.format_frame,
-            values=list(self.SUPPORTED_FORMATS.keys()),
+            values=list(self.FORMAT_LABELS.keys()),
             state='readonly',
-            width=12,
+            width=20,
             font=('맑은 고딕', 10)
         )
         self.format_combo.set("JPEG")
@@ -177,8 +279,8 @@ class HEICConverter:
         self.quality_var = tk.IntVar(value=95)
         self.quality_scale = ttk.Scale(
             self.quality_control_frame,
-            from_=50,
-            to=100,
+            from_=heic_engine.MIN_QUALITY,
+            to=heic_engine.MAX_QUALITY,
             variable=self.quality_var,
             orient='horizontal',
             length=150
@@ -196,6 +298,122 @@ class HEICConverter:
         
         self.quality_var.trace('w', update_quality_label)
         
+        # 목표 용량
+        self.target_size_frame = ttk.Frame(self.settings_section)
+        ttk.Label(self.target_size_frame, text="목표 용량:", style='Header.TLabel').pack(anchor='w')
+        self.target_size_combo = ttk.Combobox(
+            self.target_size_frame,
+            values=list(self.TARGET_SIZE_LABELS.keys()),
+            state='readonly',
+            width=12,
+            font=('맑은 고딕', 10)
+        )
+        self.target_size_combo.set("제한 없음")
+        
+        # 인코더 프리셋
+        self.preset_frame = ttk.Frame(self.settings_section)
+        ttk.Label(self.preset_frame, text="압축 프리셋:", style='Header.TLabel').pack(anchor='w')
+        self.preset_combo = ttk.Combobox(
+            self.preset_frame,
+            values=list(self.PRESET_LABELS.keys()),
+            state='readonly',
+            width=12,
+            font=('맑은 고딕', 10)
+        )
+        self.preset_combo.set("최소 용량")
+        
+        # 출력 크기와 크기 조절 필터
+        self.resize_frame = ttk.Frame(self.settings_section)
+        ttk.Label(self.resize_frame, text="출력 크기:", style='Header.TLabel').pack(anchor='w')
+        self.resize_control_frame = ttk.Frame(self.resize_frame)
+        self.resize_combo = ttk.Combobox(
+            self.resize_control_frame,
+            values=list(self.RESIZE_LABELS.keys()),
+            state='readonly',
+            width=20,
+            font=('맑은 고딕', 10)
+        )
+        self.resize_combo.set("원본 크기")
+        self.resample_combo = ttk.Combobox(
+            self.resize_control_frame,
+            values=list(self.RESAMPLE_LABELS.keys()),
+            state='readonly',
+            width=7,
+            font=('맑은 고딕', 10)
+        )
+        self.resample_combo.set("고품질")
+        
+        # 출력 이름/폴더 구성
+        self.name_template_frame = ttk.Frame(self.settings_section)
+        ttk.Label(self.name_template_frame, text="출력 이름:", style='Header.TLabel').pack(anchor='w')
+        self.name_template_combo = ttk.Combobox(
+            self.name_template_frame,
+            values=list(self.NAME_TEMPLATE_LABELS.keys()),
+            state='readonly',
+            width=20,
+            font=('맑은 고딕', 10)
+        )
+        self.name_template_combo.set("원본 이름")
+        
+        # 병렬 처리 방식
+        self.backend_frame = ttk.Frame(self.settings_section)
+        ttk.Label(self.backend_frame, text="처리 방식 / 메모리 한도:", style='Header.TLabel').pack(anchor='w')
+        self.backend_control_frame = ttk.Frame(self.backend_frame)
+        self.backend_combo = ttk.Combobox(
+            self.backend_control_frame,
+            values=list(self.BACKEND_LABELS.keys()),
+            state='readonly',
+            width=12,
+            font=('맑은 고딕', 10)
+        )
+        self.backend_combo.set("스레드")
+        self.memory_budget_combo = ttk.Combobox(
+            self.backend_control_frame,
+            values=list(self.MEMORY_BUDGET_LABELS.keys()),
+            state='readonly',
+            width=10,
+            font=('맑은 고딕', 10)
+        )
+        self.memory_budget_combo.set("제한 없음")
+        
+        # 증분 변환 (이전에 변환한 파일 건너뛰기)
+        self.incremental_var = tk.BooleanVar(value=True)
+        self.incremental_check = ttk.Checkbutton(
+            self.settings_section,
+            text="변경된 파일만 변환",
+            variable=self.incremental_var
+        )
+        
+        # 내용이 같은 파일은 한 번만 변환 (나머지는 결과를 하드 링크)
+        self.dedupe_var = tk.BooleanVar(value=False)
+        self.dedupe_check = ttk.Checkbutton(
+            self.settings_section,
+            text="중복 파일은 한 번만 변환",
+            variable=self.dedupe_var
+        )
+        
+        # HEIF 컨테이너 안의 다른 이미지 저장 (연사, 깊이 맵 등)
+        self.all_images_var = tk.BooleanVar(value=False)
+        self.all_images_check = ttk.Checkbutton(
+            self.settings_section,
+            text="연사 등 모든 이미지 저장",
+            variable=self.all_images_var
+        )
+        self.auxiliary_images_var = tk.BooleanVar(value=False)
+        self.auxiliary_images_check = ttk.Checkbutton(
+            self.settings_section,
+            text="깊이 맵 등 보조 이미지 저장",
+            variable=self.auxiliary_images_var
+        )
+        
+        # 단계별 소요 시간 측정 (결과 폴더에 heic_timings.json/csv 저장)
+        self.profile_var = tk.BooleanVar(value=False)
+        self.profile_check = ttk.Checkbutton(
+            self.settings_section,
+            text="단계별 시간 측정",
+            variable=self.profile_var
+        )
+        
         # 메인 컨텐츠 프레임 (3열 레이아웃)
         self.content_frame = ttk.Frame(self.main_frame)
         
@@ -207,23 +425,42 @@ class HEICConverter:
             padding="10"
         )
         
+        # 이름 필터 (입력하는 즉시 목록을 거름)
+        self.filter_var = tk.StringVar()
+        self.filter_entry = ttk.Entry(
+            self.file_list_section,
+            textvariable=self.filter_var,
+            font=('맑은 고딕', 9)
+        )
+        self.filter_var.trace_add('write', self.on_filter_changed)
+        
+        # 가상 목록: 색인 전체 중 화면에 보이는 행만 Treeview에 넣음 (스크롤바는 직접 계산)
         self.file_list_frame = ttk.Frame(self.file_list_section)
-        self.file_listbox = tk.Listbox(
+        self.file_tree = ttk.Treeview(
             self.file_list_frame,
-            selectmode=tk.SINGLE,
-            font=('맑은 고딕', 9),
-            height=15,
-            activestyle='dotbox',
-            selectbackground='#3498db'
+            columns=list(self.FILE_COLUMNS.keys()),
+            show='headings',
+            selectmode='browse',
+            height=15
         )
+        for column, (title, width, anchor) in self.FILE_COLUMNS.items():
+            self.file_tree.heading(column, text=title, command=lambda c=column: self.sort_file_list(c))
+            self.file_tree.column(column, width=width, anchor=anchor, stretch=(column == "name"))
         
         self.file_scrollbar = ttk.Scrollbar(
             self.file_list_frame,
             orient='vertical',
-            command=self.file_listbox.yview
+            command=self.on_file_scroll
         )
-        self.file_listbox.config(yscrollcommand=self.file_scrollbar.set)
-        self.file_listbox.bind('<<ListboxSelect>>', self.on_file_select)
+        self.file_tree.bind('<<TreeviewSelect>>', self.on_file_select)
+        self.file_tree.bind('<Configure>', lambda event: self.refresh_file_list())
+        self.file_tree.bind('<MouseWheel>', self.on_file_wheel)
+        self.file_tree.bind('<Button-4>', self.on_file_wheel)
+        self.file_tree.bind('<Button-5>', self.on_file_wheel)
+        for key, step in (('<Up>', -1), ('<Down>', 1), ('<Prior>', -2), ('<Next>', 2)):
+            self.file_tree.bind(key, lambda event, step=step: self.move_file_selection(step))
+        self.file_tree.bind('<Home>', lambda event: self.select_file_position(0))
+        self.file_tree.bind('<End>', lambda event: self.select_file_position(len(self.file_index.view) - 1))
         
         self.file_info_frame = ttk.Frame(self.file_list_section)
         self.file_count_label = ttk.Label(
@@ -328,6 +565,32 @@ class HEICConverter:
             state='disabled'
         )
         
+        self.pause_button = ttk.Button(
+            self.button_frame,
+            text="⏸️ 일시정지",
+            command=self.toggle_pause,
+            style='Secondary.TButton',
+            width=12,
+            state='disabled'
+        )
+        
+        self.stop_button = ttk.Button(
+            self.button_frame,
+            text="⏹️ 중지",
+            command=self.stop_conversion,
+            style='Secondary.TButton',
+            width=10,
+            state='disabled'
+        )
+        
+        self.benchmark_button = ttk.Button(
+            self.button_frame,
+            text="⏱️ 프리셋 비교",
+            command=self.start_preset_benchmark,
+            style='Secondary.TButton',
+            width=15
+        )
+        
         self.reset_button = ttk.Button(
             self.button_frame,
             text="🔄 초기화",
@@ -375,16 +638,48 @@ class HEICConverter:
         self.quality_scale.pack(side='left')
         self.quality_label.pack(side='left', padx=(10, 0))
         
+        # 목표 용량
+        self.target_size_frame.pack(fill='x', pady=(15, 0))
+        self.target_size_combo.pack(anchor='w', pady=(5, 0))
+        
+        # 인코더 프리셋
+        self.preset_frame.pack(fill='x', pady=(15, 0))
+        self.preset_combo.pack(anchor='w', pady=(5, 0))
+        
+        # 출력 크기
+        self.resize_frame.pack(fill='x', pady=(15, 0))
+        self.resize_control_frame.pack(anchor='w', pady=(5, 0))
+        self.resize_combo.pack(side='left')
+        self.resample_combo.pack(side='left', padx=(10, 0))
+        
+        # 출력 이름
+        self.name_template_frame.pack(fill='x', pady=(15, 0))
+        self.name_template_combo.pack(anchor='w', pady=(5, 0))
+        
+        # 병렬 처리 방식
+        self.backend_frame.pack(fill='x', pady=(15, 0))
+        self.backend_control_frame.pack(anchor='w', pady=(5, 0))
+        self.backend_combo.pack(side='left')
+        self.memory_budget_combo.pack(side='left', padx=(10, 0))
+        
+        # 증분 변환
+        self.incremental_check.pack(anchor='w', pady=(10, 0))
+        self.dedupe_check.pack(anchor='w', pady=(5, 0))
+        self.all_images_check.pack(anchor='w', pady=(5, 0))
+        self.auxiliary_images_check.pack(anchor='w', pady=(5, 0))
+        self.profile_check.pack(anchor='w', pady=(5, 0))
+        
         # 메인 컨텐츠 영역 (3열, 고정 크기 지정)
         self.content_frame.pack(fill='both', expand=True, pady=(0, 15))
         
-        # 파일 목록 (왼쪽, 300px 고정)
+        # 파일 목록 (왼쪽, 460px 고정)
         self.file_list_section.pack(side='left', fill='y', padx=(0, 10))
-        self.file_list_section.configure(width=300)
+        self.file_list_section.configure(width=460)
         self.file_list_section.pack_propagate(False)  # 크기 고정
         
+        self.filter_entry.pack(fill='x', pady=(0, 5))
         self.file_list_frame.pack(fill='both', expand=True)
-        self.file_listbox.pack(side='left', fill='both', expand=True)
+        self.file_tree.pack(side='left', fill='both', expand=True)
         self.file_scrollbar.pack(side='right', fill='y')
         
         self.file_info_frame.pack(fill='x', pady=(10, 0))
@@ -415,7 +710,10 @@ class HEICConverter:
         # 버튼들
         self.button_frame.pack()
         self.convert_button.pack(side='left', padx=(0, 10))
+        self.pause_button.pack(side='left', padx=(0, 10))
+        self.stop_button.pack(side='left', padx=(0, 10))
         self.open_folder_button.pack(side='left', padx=(0, 10))
+        self.benchmark_button.pack(side='left', padx=(0, 10))
         self.reset_button.pack(side='left')
         
         # 상태 표시
@@ -429,58 +727,331 @@ class HEICConverter:
         if directory:
             self.source_directory = Path(directory)
             self.directory_label.config(text=str(self.source_directory))
-            self.scan_heic_files()
             self.update_status("✅ 폴더 선택 완료", "success")
+            self.scan_heic_files()
         
     def scan_heic_files(self):
-        """HEIC 파일 스캔"""
+        """HEIC 파일 스캔 시작 (백그라운드 스레드, 하위 폴더 포함)"""
         if not self.source_directory:
             return
-            
+        
+        # 이전 스캔 결과는 새 목록으로 교체 (진행 중인 이전 스캔은 무시됨)
+        self.invalidate_scan()
+        self.reset_file_index()
+        self.scan_done = threading.Event()
+        
+        # 해상도/촬영 일시/카메라는 스캔된 묶음마다 백그라운드에서 색인 (디스크 캐시에 있으면 바로 반영)
+        generation = self.scan_generation
+        self.stop_metadata_indexer()
+        self.metadata_indexer = MetadataIndexer(
+            lambda batch: self.root.after(0, self.add_metadata_batch, generation, batch),
+            on_finished=lambda stats: self.root.after(0, self.metadata_index_completed, generation, stats)
+        )
+        
+        self.file_count_label.config(text="파일 개수: 0")
+        self.file_size_label.config(text="총 용량: 0 MB")
+        self.update_status("🔍 HEIC 파일을 찾는 중...", "info")
+        
+        thread = threading.Thread(
+            target=self.run_scan,
+            args=(self.source_directory, self.scan_generation)
+        )
+        thread.daemon = True
+        thread.start()
+        
+    def invalidate_scan(self):
+        """진행 중인 스캔을 무효화 (이전 스캔을 기다리던 쪽은 완료 표시를 보고 멈춤)"""
+        self.scan_generation += 1
+        self.scan_done.set()
+        
+    def run_scan(self, directory: Path, generation: int):
+        """HEIC 파일 스캔 (별도 스레드) - 묶음 단위로 UI에 전달"""
         try:
-            self.heic_files.clear()
-            self.file_listbox.delete(0, tk.END)
-            
-            total_size = 0
-            # HEIC 파일 찾기
-            for file_path in self.source_directory.iterdir():
-                if file_path.is_file() and file_path.suffix.lower() in self.HEIC_EXTENSIONS:
-                    self.heic_files.append(file_path.name)
-                    self.file_listbox.insert(tk.END, file_path.name)
-                    total_size += file_path.stat().st_size
-            
-            # 파일 정보 업데이트
-            count = len(self.heic_files)
-            size_mb = total_size / (1024 * 1024)
-            
-            self.file_count_label.config(text=f"파일 개수: {count:,}개")
-            self.file_size_label.config(text=f"총 용량: {size_mb:.1f} MB")
-            
-            if count == 0:
-                self.update_status("⚠️ HEIC 파일을 찾을 수 없습니다", "warning")
-                self.clear_preview_and_info()
-            else:
-                self.update_status(f"📋 {count:,}개의 HEIC 파일을 발견했습니다 ({size_mb:.1f} MB)", "success")
-                
+            for batch in heic_engine.iter_scan_batches(heic_engine.iter_heic_files(directory)):
+                if generation != self.scan_generation:
+                    return
+                self.root.after(0, self.add_scanned_batch, generation, batch)
+            
+            self.root.after(0, self.scan_completed, generation)
+            
         except Exception as e:
             logger.error(f"파일 스캔 중 오류: {e}")
-            self.update_status("❌ 파일 스캔 중 오류가 발생했습니다", "error")
+            self.root.after(0, self.scan_completed, generation)
+            self.root.after(0, lambda: self.update_status("❌ 파일 스캔 중 오류가 발생했습니다", "error"))
+            
+    def add_scanned_batch(self, generation: int, batch: List[heic_engine.ScanEntry]):
+        """스캔된 파일 묶음을 목록에 추가"""
+        if generation != self.scan_generation:
+            return
+        
+        first_row = len(self.file_index)
+        self.file_index.append((entry.file_name, entry.size, entry.mtime) for entry in batch)
+        if self.metadata_indexer is not None:
+            self.metadata_indexer.add(self.source_directory, [
+                (first_row + offset, entry.file_name, entry.size, entry.mtime) for offset, entry in enumerate(batch)
+            ])
+        self.refresh_file_list()
+        self.update_file_info()
+        
+    def scan_completed(self, generation: int):
+        """스캔 완료 처리"""
+        if generation != self.scan_generation:
+            return
+        
+        self.scan_done.set()
+        if self.metadata_indexer is not None:
+            self.metadata_indexer.finish()
+        count = len(self.file_index)
+        size_mb = self.file_index.total_size / (1024 * 1024)
+        
+        # 스캔 중에 추가된 행은 목록 끝에 붙어 있으므로 정렬 중이면 다시 정렬
+        if self.file_index.sort_column is not None:
+            self.file_index.refresh()
+            self.refresh_file_list()
+        
+        if count == 0:
+            self.update_status("⚠️ HEIC 파일을 찾을 수 없습니다", "warning")
+            self.clear_preview_and_info()
+        else:
+            self.update_status(f"📋 {count:,}개의 HEIC 파일을 발견했습니다 ({size_mb:.1f} MB)", "success")
+            
+    def iter_scanned_files(self):
+        """스캔된 파일을 순서대로 반환 (스캔 중이면 새 파일이 추가될 때까지 대기, 다시 스캔하면 종료)"""
+        heic_files = self.file_index.names
+        scan_done = self.scan_done
+        generation = self.scan_generation
+        index = 0
+        
+        while True:
+            if generation != self.scan_generation:
+                return
+            if index < len(heic_files):
+                yield heic_files[index]
+                index += 1
+            elif scan_done.is_set():
+                # 완료 표시 직전에 추가된 묶음이 있을 수 있으므로 다시 확인
+                if index >= len(heic_files):
+                    return
+            else:
+                scan_done.wait(0.05)
             
+    def stop_metadata_indexer(self):
+        """진행 중인 메타데이터 색인 중지"""
+        if self.metadata_indexer is not None:
+            self.metadata_indexer.stop()
+            self.metadata_indexer = None
+        
+    def reset_file_index(self):
+        """파일 목록 비우기 (정렬 기준과 필터는 유지)"""
+        previous = self.file_index
+        self.file_index = FileIndex()
+        self.file_index.filter_text = previous.filter_text
+        self.file_index.sort_column = previous.sort_column
+        self.file_index.sort_reverse = previous.sort_reverse
+        self.list_offset = 0
+        self.selected_row = None
+        self.refresh_file_list()
+        self.update_file_info()
+        
+    def update_file_info(self):
+        """파일 개수/용량 표시 (필터 중이면 표시 중인 개수도 함께)"""
+        count = len(self.file_index)
+        shown = len(self.file_index.view)
+        text = f"파일 개수: {count:,}개" if shown == count else f"파일 개수: {shown:,} / {count:,}개"
+        self.file_count_label.config(text=text)
+        self.file_size_label.config(text=f"총 용량: {self.file_index.total_size / (1024 * 1024):.1f} MB")
+        
+    def visible_row_count(self) -> int:
+        """파일 목록에 한 번에 보이는 행 수"""
+        rowheight = ttk.Style().lookup('Treeview', 'rowheight') or 20
+        height = self.file_tree.winfo_height()
+        if height <= 1:
+            return int(self.file_tree.cget('height'))
+        # 제목 행을 빼고 마지막에 일부만 보이는 행까지 포함
+        return max(1, (height - int(rowheight)) // int(rowheight) + 1)
+        
+    def refresh_file_list(self):
+        """현재 위치에서 보이는 행만 다시 그림"""
+        view = self.file_index.view
+        rows = self.visible_row_count()
+        count = len(view)
+        self.list_offset = max(0, min(self.list_offset, count - rows))
+        
+        self.file_tree.delete(*self.file_tree.get_children())
+        for position in range(self.list_offset, min(count, self.list_offset + rows)):
+            row = view[position]
+            self.file_tree.insert('', 'end', iid=str(row), values=self.file_index.format_row(row))
+        if self.selected_row is not None and self.file_tree.exists(str(self.selected_row)):
+            self.file_tree.selection_set(str(self.selected_row))
+        
+        if count:
+            self.file_scrollbar.set(self.list_offset / count, min(1.0, (self.list_offset + rows) / count))
+        else:
+            self.file_scrollbar.set(0.0, 1.0)
+        
+    def add_metadata_batch(self, generation: int, batch: List[Tuple[int, ImageMetadata]]):
+        """색인된 메타데이터를 목록에 반영 (그 사이 다시 스캔했으면 무시)"""
+        if generation != self.scan_generation:
+            return
+        for row, metadata in batch:
+            self.file_index.set_metadata(row, metadata.width, metadata.height, metadata.captured, metadata.camera)
+            if self.file_tree.exists(str(row)):
+                self.file_tree.item(str(row), values=self.file_index.format_row(row))
+        
+    def metadata_index_completed(self, generation: int, stats: IndexStats):
+        """색인 완료: 날짜/해상도 정렬이나 카메라 필터가 새 값으로 적용되도록 목록 다시 계산"""
+        if generation != self.scan_generation:
+            return
+        logger.info(f"메타데이터 색인 완료: 캐시 {stats.cached:,}개, 새로 읽음 {stats.extracted:,}개, "
+                    f"실패 {stats.failed:,}개 ({stats.elapsed:.1f}초)")
+        if self.file_index.sort_column in ("date", "pixels") or self.file_index.filter_text:
+            self.file_index.refresh()
+            self.scroll_to_selection()
+            self.update_file_info()
+        
+    def get_cached_details(self, row: int) -> Optional[ImageDetails]:
+        """메타데이터 캐시에 있는 파일 정보 (파일을 열지 않음)"""
+        if self.metadata_cache is None:
+            try:
+                self.metadata_cache = MetadataCache()
+            except Exception as e:
+                logger.debug(f"메타데이터 캐시를 열 수 없습니다: {e}")
+                return None
+        file_path = self.source_directory.absolute() / self.file_index.names[row]
+        size = self.file_index.sizes[row]
+        metadata = self.metadata_cache.get((str(file_path), size, self.file_index.mtimes[row]))
+        if metadata is None:
+            return None
+        return ImageDetails(self.source_directory / self.file_index.names[row], size,
+                            (metadata.width, metadata.height), metadata.mode, metadata.exif)
+        
+    def on_file_scroll(self, action: str, amount: str, unit: Optional[str] = None):
+        """스크롤바 조작"""
+        rows = self.visible_row_count()
+        if action == 'moveto':
+            self.list_offset = int(float(amount) * len(self.file_index.view))
+        elif action == 'scroll':
+            self.list_offset += int(amount) * (rows if unit == 'pages' else 1)
+        self.refresh_file_list()
+        
+    def on_file_wheel(self, event):
+        """마우스 휠 스크롤 (Windows/macOS는 delta, Linux는 Button-4/5)"""
+        if event.num == 4 or event.delta > 0:
+            self.list_offset -= self.WHEEL_SCROLL_ROWS
+        else:
+            self.list_offset += self.WHEEL_SCROLL_ROWS
+        self.refresh_file_list()
+        return "break"
+        
+    def move_file_selection(self, step: int):
+        """키보드로 선택 이동 (±1은 한 행, ±2는 한 페이지)"""
+        position = self.file_index.position_of(self.selected_row) if self.selected_row is not None else None
+        if abs(step) == 2:
+            step = (self.visible_row_count() - 1) * (step // 2)
+        self.select_file_position(step if position is None else position + step)
+        return "break"
+        
+    def select_file_position(self, position: int):
+        """표시 순서 position의 파일을 선택하고 보이도록 스크롤"""
+        view = self.file_index.view
+        if not view:
+            return "break"
+        position = max(0, min(position, len(view) - 1))
+        rows = self.visible_row_count()
+        if position < self.list_offset:
+            self.list_offset = position
+        elif position >= self.list_offset + rows - 1:
+            self.list_offset = position - rows + 2
+        self.selected_row = view[position]
+        self.refresh_file_list()
+        self.show_selected_file()
+        return "break"
+        
+    def on_filter_changed(self, *args):
+        """필터 입력 (입력이 잠시 멈추면 적용)"""
+        if self.filter_job is not None:
+            self.root.after_cancel(self.filter_job)
+        self.filter_job = self.root.after(self.FILTER_DEBOUNCE_MS, self.apply_file_filter)
+        
+    def apply_file_filter(self):
+        """이름 필터 적용"""
+        self.filter_job = None
+        self.file_index.set_filter(self.filter_var.get())
+        self.list_offset = 0
+        self.scroll_to_selection()
+        self.update_file_info()
+        
+    def sort_file_list(self, column: str):
+        """열 제목 클릭: 오름차순 → 내림차순 → 스캔 순서"""
+        index = self.file_index
+        if index.sort_column != column:
+            index.sort_by(column)
+        elif not index.sort_reverse:
+            index.sort_by(column, reverse=True)
+        else:
+            index.sort_by(None)
+        
+        for name, (title, _, _) in self.FILE_COLUMNS.items():
+            mark = ""
+            if name == index.sort_column:
+                mark = " ▼" if index.sort_reverse else " ▲"
+            self.file_tree.heading(name, text=title + mark)
+        self.scroll_to_selection()
+        
+    def scroll_to_selection(self):
+        """정렬/필터 후 선택한 파일이 보이도록 스크롤"""
+        position = self.file_index.position_of(self.selected_row) if self.selected_row is not None else None
+        if position is not None:
+            self.list_offset = position - self.visible_row_count() // 2
+        self.refresh_file_list()
+        
     def on_file_select(self, event):
-        """파일 선택 시 미리보기 및 EXIF 정보 표시"""
-        selection = self.file_listbox.curselection()
-        if not selection:
+        """목록에서 클릭한 파일 선택 (다시 그리며 선택을 복원한 경우는 무시)"""
+        selection = self.file_tree.selection()
+        if not selection or int(selection[0]) == self.selected_row:
+            return
+        self.selected_row = int(selection[0])
+        self.show_selected_file()
+        
+    def show_selected_file(self):
+        """선택한 파일의 미리보기 및 EXIF 정보 표시"""
+        if self.selected_row is None:
             return
             
         try:
-            selected_file = self.heic_files[selection[0]]
+            selected_file = self.file_index.names[self.selected_row]
             file_path = self.source_directory / selected_file
             
-            # 이미지 미리보기 로드
-            self.load_preview(file_path)
+            # 색인된 파일은 EXIF를 캐시에서 가져오고, 파일은 미리보기용으로 한 번만 엶
+            if self.preview_cache.get_details(file_path) is None:
+                details = self.get_cached_details(self.selected_row)
+                if details is not None:
+                    self.preview_cache.put_details(file_path, details)
+            
+            self.cancel_preview_upgrade()
+            self.preview_request_id += 1
+            canvas_size = self.get_canvas_size()
+            try:
+                details, preview = load_file_view(self.preview_cache, file_path, canvas_size)
+            except Exception as e:
+                logger.error(f"이미지 로드 오류: {e}")
+                self.show_preview_error()
+                self.show_info_error()
+                self.update_status("❌ 파일 정보 로드 중 오류가 발생했습니다", "error")
+                return
+            
+            # 이미지 미리보기 표시 (내장 썸네일이 없으면 안내만 띄우고 바로 백그라운드에서 디코딩)
+            if preview is not None:
+                self.show_preview(file_path, preview, canvas_size)
+            else:
+                self.show_preview_loading()
+                self.request_final_preview(file_path)
             
             # EXIF 정보 표시
-            self.display_exif_info(file_path)
+            self.display_exif_info(details)
+            
+            # 화살표 키로 넘겨 볼 주변 파일 미리 읽기
+            self.prefetch_neighbors(self.selected_row)
             
             self.update_status(f"🖼️ {selected_file} 미리보기를 표시했습니다", "info")
             
@@ -488,148 +1059,142 @@ class HEICConverter:
             logger.error(f"파일 선택 처리 중 오류: {e}")
             self.update_status("❌ 파일 정보 로드 중 오류가 발생했습니다", "error")
             
-    def load_preview(self, file_path: Path):
-        """이미지 미리보기 로드"""
+    def request_final_preview(self, file_path: Path):
+        """고화질 미리보기를 백그라운드에서 렌더링 (UI 스레드는 이미지 교체만 담당)"""
+        self.cancel_preview_upgrade()
+        self.preview_request_id += 1
+        request_id = self.preview_request_id
+        canvas_size = self.get_canvas_size()
+        
+        future = self.preview_executor.submit(render_final_preview, self.preview_cache, file_path, canvas_size)
+        future.add_done_callback(
+            lambda f: self.root.after(0, self.final_preview_ready, request_id, file_path, canvas_size, f)
+        )
+        
+    def final_preview_ready(self, request_id: int, file_path: Path, canvas_size: Tuple[int, int],
+                            future: concurrent.futures.Future):
+        """백그라운드 렌더링 결과 표시 (그 사이 다른 파일을 선택했으면 무시)"""
+        if request_id != self.preview_request_id:
+            return
+        
         try:
-            with Image.open(file_path) as image:
-                # 캔버스 크기 가져오기
-                self.canvas.update_idletasks()
-                canvas_width = self.canvas.winfo_width()
-                canvas_height = self.canvas.winfo_height()
-                
-                if canvas_width <= 1 or canvas_height <= 1:
-                    canvas_width, canvas_height = 400, 300
-                
-                # 이미지 비율 유지하면서 리사이즈
-                img_ratio = image.width / image.height
-                canvas_ratio = canvas_width / canvas_height
-                
-                margin = 20
-                if img_ratio > canvas_ratio:
-                    # 이미지가 더 넓음
-                    new_width = canvas_width - margin
-                    new_height = int(new_width / img_ratio)
-                else:
-                    # 이미지가 더 높음
-                    new_height = canvas_height - margin
-                    new_width = int(new_height * img_ratio)
-                
-                resized_image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                photo = ImageTk.PhotoImage(resized_image)
-                
-                # 캔버스 초기화 및 이미지 표시
-                self.canvas.delete("all")
-                self.canvas.create_image(
-                    canvas_width // 2,
-                    canvas_height // 2,
-                    image=photo,
-                    anchor='center'
-                )
-                
-                # 이미지 정보 표시
-                info_text = f"{image.width} × {image.height} px"
-                self.canvas.create_text(
-                    10, canvas_height - 20,
-                    text=info_text,
-                    anchor='sw',
-                    fill='#7f8c8d',
-                    font=('맑은 고딕', 9)
-                )
-                
-                # 이미지 참조 유지
-                self.canvas.image = photo
-                
+            self.show_preview(file_path, future.result(), canvas_size)
         except Exception as e:
             logger.error(f"이미지 미리보기 로드 오류: {e}")
-            self.canvas.delete("all")
-            self.canvas.create_text(
-                200, 150,
-                text="❌ 미리보기를 불러올 수 없습니다",
-                fill="#e74c3c",
-                font=('맑은 고딕', 12),
-                anchor='center'
+            self.show_preview_error()
+            
+    def show_preview(self, file_path: Path, preview: PreviewImage, canvas_size: Tuple[int, int]):
+        """렌더링된 미리보기를 캔버스에 표시 (빠른 썸네일 → 잠시 머무르면 고화질로 교체)"""
+        canvas_width, canvas_height = canvas_size
+        photo = ImageTk.PhotoImage(preview.image)
+        
+        # 캔버스 초기화 및 이미지 표시
+        self.canvas.delete("all")
+        self.canvas.create_image(
+            canvas_width // 2,
+            canvas_height // 2,
+            image=photo,
+            anchor='center'
+        )
+        
+        # 이미지 정보 표시
+        full_width, full_height = preview.full_size
+        info_text = f"{full_width} × {full_height} px"
+        self.canvas.create_text(
+            10, canvas_height - 20,
+            text=info_text,
+            anchor='sw',
+            fill='#7f8c8d',
+            font=('맑은 고딕', 9)
+        )
+        
+        # 이미지 참조 유지
+        self.canvas.image = photo
+        
+        # 임시 화질이면 잠시 후 고화질로 교체
+        if not preview.final:
+            self.preview_upgrade_job = self.root.after(
+                PREVIEW_UPGRADE_DELAY_MS,
+                lambda: self.request_final_preview(file_path)
             )
             
-    def display_exif_info(self, file_path: Path):
-        """EXIF 정보 표시"""
+    def show_preview_loading(self):
+        """미리보기를 디코딩하는 동안 표시할 안내"""
+        self.canvas.delete("all")
+        self.canvas.create_text(
+            200, 150,
+            text="⏳ 미리보기를 불러오는 중...",
+            fill="#95a5a6",
+            font=('맑은 고딕', 12),
+            anchor='center'
+        )
+            
+    def show_preview_error(self):
+        """미리보기 오류 표시"""
+        self.canvas.delete("all")
+        self.canvas.create_text(
+            200, 150,
+            text="❌ 미리보기를 불러올 수 없습니다",
+            fill="#e74c3c",
+            font=('맑은 고딕', 12),
+            anchor='center'
+        )
+            
+    def get_canvas_size(self) -> Tuple[int, int]:
+        """현재 캔버스 크기 (아직 배치 전이면 기본 크기)"""
+        self.canvas.update_idletasks()
+        canvas_width = self.canvas.winfo_width()
+        canvas_height = self.canvas.winfo_height()
+        
+        if canvas_width <= 1 or canvas_height <= 1:
+            canvas_width, canvas_height = 400, 300
+        return canvas_width, canvas_height
+        
+    def prefetch_neighbors(self, row: int):
+        """선택한 파일 앞뒤(표시 순서 기준)의 미리보기를 백그라운드에서 미리 렌더링"""
+        view = self.file_index.view
+        position = self.file_index.position_of(row)
+        if position is None:
+            return
+        neighbors = []
+        for distance in range(1, PREFETCH_DISTANCE + 1):
+            for neighbor in (position + distance, position - distance):
+                if 0 <= neighbor < len(view):
+                    neighbors.append(self.source_directory / self.file_index.names[view[neighbor]])
+        self.prefetcher.request(neighbors, self.get_canvas_size())
+        
+    def cancel_preview_upgrade(self):
+        """예약된 고화질 미리보기 교체 취소"""
+        if self.preview_upgrade_job is not None:
+            self.root.after_cancel(self.preview_upgrade_job)
+            self.preview_upgrade_job = None
+            
+    def display_exif_info(self, details: ImageDetails):
+        """EXIF 정보 표시 (헤더에서 읽은 메타데이터 사용, 픽셀 디코딩 없음)"""
         try:
-            with Image.open(file_path) as image:
-                exif_data = image.getexif()
-                file_stat = file_path.stat()
-                
-                # 기본 파일 정보
-                info_lines = []
-                info_lines.append("📁 파일 정보")
-                info_lines.append("─" * 30)
-                info_lines.append(f"파일명: {file_path.name}")
-                info_lines.append(f"크기: {image.width:,} × {image.height:,} px")
-                info_lines.append(f"모드: {image.mode}")
-                info_lines.append(f"용량: {file_stat.st_size / (1024*1024):.2f} MB")
-                info_lines.append("")
-                
-                # EXIF 정보
-                if exif_data:
-                    info_lines.append("📷 촬영 정보")
-                    info_lines.append("─" * 30)
-                    
-                    # 주요 EXIF 태그들
-                    exif_tags = {
-                        271: ("제조사", "🏢"),
-                        272: ("카메라 모델", "📸"),
-                        306: ("촬영 일시", "📅"),
-                        315: ("소프트웨어", "💻"),
-                        33434: ("노출 시간", "⏱️"),
-                        33437: ("F-Stop", "🔍"),
-                        34855: ("ISO", "🌟"),
-                        36867: ("원본 촬영 일시", "📅"),
-                        36868: ("디지털화 일시", "💾"),
-                        40961: ("색공간", "🎨"),
-                        40962: ("가로 해상도", "📐"),
-                        40963: ("세로 해상도", "📐")
-                    }
-                    
-                    for tag_id, (tag_name, emoji) in exif_tags.items():
-                        if tag_id in exif_data:
-                            value = exif_data[tag_id]
-                            if isinstance(value, tuple) and len(value) == 2:
-                                if tag_id == 33434:  # 노출 시간
-                                    value = f"1/{int(value[1]/value[0])}" if value[0] != 0 else "N/A"
-                                elif tag_id == 33437:  # F-Stop
-                                    value = f"f/{value[0]/value[1]:.1f}" if value[1] != 0 else "N/A"
-                                else:
-                                    value = f"{value[0]}/{value[1]}"
-                            elif tag_id == 34855:  # ISO
-                                value = f"ISO {value}"
-                            
-                            info_lines.append(f"{emoji} {tag_name}: {value}")
-                    
-                    # GPS 정보 확인
-                    gps_info = image.getexif().get_ifd(0x8825)
-                    if gps_info:
-                        info_lines.append("")
-                        info_lines.append("🌍 위치 정보")
-                        info_lines.append("─" * 30)
-                        info_lines.append("📍 GPS 데이터 있음")
-                else:
-                    info_lines.append("📷 촬영 정보")
-                    info_lines.append("─" * 30)
-                    info_lines.append("EXIF 정보가 없습니다.")
-                
-                # 텍스트 위젯에 정보 표시
-                self.exif_text.config(state='normal')
-                self.exif_text.delete(1.0, tk.END)
-                self.exif_text.insert(1.0, '\n'.join(info_lines))
-                self.exif_text.config(state='disabled')
-                
-        except Exception as e:
-            logger.error(f"EXIF 정보 표시 오류: {e}")
+            info_lines = details.info_lines()
+            
+            # 텍스트 위젯에 정보 표시
             self.exif_text.config(state='normal')
             self.exif_text.delete(1.0, tk.END)
-            self.exif_text.insert(1.0, "❌ 이미지 정보를 불러올 수 없습니다.")
+            self.exif_text.insert(1.0, '\n'.join(info_lines))
             self.exif_text.config(state='disabled')
+                
+        except Exception as e:
+            logger.error(f"EXIF 정보 표시 오류: {e}")
+            self.show_info_error()
+            
+    def show_info_error(self):
+        """이미지 정보 오류 표시"""
+        self.exif_text.config(state='normal')
+        self.exif_text.delete(1.0, tk.END)
+        self.exif_text.insert(1.0, "❌ 이미지 정보를 불러올 수 없습니다.")
+        self.exif_text.config(state='disabled')
             
     def clear_preview_and_info(self):
         """미리보기와 정보 초기화"""
+        self.cancel_preview_upgrade()
+        self.preview_request_id += 1
         self.canvas.delete("all")
         self.canvas.create_text(
             200, 150,
@@ -644,143 +1209,229 @@ class HEICConverter:
         self.exif_text.insert(1.0, "🖼️ 이미지를 선택하면\n정보가 표시됩니다.")
         self.exif_text.config(state='disabled')
             
-    def convert_single_file(self, file_name: str, output_format: ImageFormat, quality: int) -> bool:
-        """단일 파일 변환"""
-        try:
-            input_path = self.source_directory / file_name
-            
-            # 출력 디렉토리 생성
-            output_dir = self.source_directory / output_format.extension
-            output_dir.mkdir(exist_ok=True)
-            self.output_directory = output_dir
-            
-            # 출력 파일명 생성
-            output_filename = f"{input_path.stem}.{output_format.extension}"
-            output_path = output_dir / output_filename
-            
-            # 이미지 변환
-            with Image.open(input_path) as image:
-                # 원본 메타데이터 보존
-                exif_data = image.getexif()
-                icc_profile = image.info.get("icc_profile")
-                
-                # 변환 옵션 설정
-                save_kwargs = {
-                    'format': output_format.pil_format,
-                    'exif': exif_data if exif_data else None,
-                    'icc_profile': icc_profile
-                }
-                
-                # JPEG의 경우 품질 설정
-                if output_format.pil_format == 'JPEG':
-                    save_kwargs['quality'] = quality
-                    save_kwargs['optimize'] = True
-                
-                # PNG의 경우 최적화 설정
-                elif output_format.pil_format == 'PNG':
-                    save_kwargs['optimize'] = True
-                    
-                # WEBP의 경우 품질 설정
-                elif output_format.pil_format == 'WEBP':
-                    save_kwargs['quality'] = quality
-                    save_kwargs['method'] = 6  # 최고 압축률
-                
-                # 파일 저장
-                image.save(output_path, **save_kwargs)
-                
-            return True
-            
-        except Exception as e:
-            logger.error(f"파일 변환 오류 ({file_name}): {e}")
-            return False
-            
     def start_conversion(self):
         """변환 프로세스 시작"""
         if not self.validate_conversion():
             return
+        
+        try:
+            engine = self.create_engine()
+        except Exception as e:
+            logger.error(f"변환 설정 오류: {e}")
+            messagebox.showerror("오류", f"변환 설정이 올바르지 않습니다:\n{e}")
+            return
+        self.conversion_engine = engine
+        self.output_directory = engine.output_directory
             
         # 버튼 상태 변경
-        self.convert_button.config(state='disabled', text="🔄 변환 중...")
-        self.open_folder_button.config(state='disabled')
+        self.set_conversion_controls(running=True)
+        
+        # 진행률 초기화
+        self.progress_var.set(0)
+        self.update_progress_label("🚀 변환을 시작합니다...")
+        self.progress_tracker = ProgressTracker()
         
         # 별도 스레드에서 변환 실행
-        thread = threading.Thread(target=self.run_conversion)
+        thread = threading.Thread(target=self.run_conversion, args=(engine, self.progress_tracker))
         thread.daemon = True
         thread.start()
         
+        # 진행 상황은 일정 주기로 모아서 표시
+        self.poll_progress()
+        
+    def create_engine(self) -> ConversionEngine:
+        """현재 설정으로 변환 엔진 생성"""
+        backend = self.BACKEND_LABELS[self.backend_combo.get()]
+        
+        return ConversionEngine(
+            self.source_directory,
+            self.get_conversion_settings(),
+            backend=backend,
+            incremental=self.incremental_var.get(),
+            profile=self.profile_var.get(),
+            memory_budget=self.MEMORY_BUDGET_LABELS[self.memory_budget_combo.get()],
+            dedupe=self.dedupe_var.get()
+        )
+        
+    def get_conversion_settings(self) -> ConversionSettings:
+        """화면에서 선택한 변환 설정"""
+        output_formats = [self.SUPPORTED_FORMATS[name] for name in self.FORMAT_LABELS[self.format_combo.get()]]
+        return ConversionSettings(
+            output_formats[0],
+            self.quality_var.get(),
+            self.PRESET_LABELS[self.preset_combo.get()],
+            self.RESIZE_LABELS[self.resize_combo.get()],
+            self.RESAMPLE_LABELS[self.resample_combo.get()],
+            tuple(output_formats[1:]),
+            self.TARGET_SIZE_LABELS[self.target_size_combo.get()],
+            self.all_images_var.get(),
+            self.auxiliary_images_var.get(),
+            self.NAME_TEMPLATE_LABELS[self.name_template_combo.get()]
+        )
+        
+    def set_conversion_controls(self, running: bool):
+        """변환 중/대기 상태에 맞게 버튼 상태 변경"""
+        # 변환 중에는 폴더를 바꾸거나 초기화해 파일 목록이 바뀌지 않도록 막음
+        state = 'disabled' if running else 'normal'
+        self.select_button.config(state=state)
+        self.reset_button.config(state=state)
+        if running:
+            self.convert_button.config(state='disabled', text="🔄 변환 중...")
+            self.open_folder_button.config(state='disabled')
+            self.pause_button.config(state='normal', text="⏸️ 일시정지")
+            self.stop_button.config(state='normal')
+        else:
+            self.convert_button.config(state='normal', text="🔄 변환 시작")
+            self.pause_button.config(state='disabled', text="⏸️ 일시정지")
+            self.stop_button.config(state='disabled')
+            
+    def toggle_pause(self):
+        """변환 일시정지/재개"""
+        engine = self.conversion_engine
+        if engine is None:
+            return
+        
+        if engine.is_paused:
+            engine.resume()
+            self.pause_button.config(text="⏸️ 일시정지")
+            self.update_status("▶️ 변환을 다시 시작했습니다", "info")
+        else:
+            engine.pause()
+            self.pause_button.config(text="▶️ 재개")
+            self.update_status("⏸️ 일시정지: 진행 중인 파일만 마무리합니다", "warning")
+            
+    def stop_conversion(self):
+        """변환 중지 (진행 중인 파일만 마치고 종료)"""
+        if self.conversion_engine is None:
+            return
+        
+        self.conversion_engine.cancel()
+        self.pause_button.config(state='disabled')
+        self.stop_button.config(state='disabled')
+        self.update_status("⏹️ 변환을 중지하는 중...", "warning")
+        
     def validate_conversion(self) -> bool:
         """변환 전 유효성 검사"""
         if not self.source_directory:
             messagebox.showwarning("경고", "먼저 HEIC 파일이 있는 폴더를 선택해주세요.")
             return False
             
-        if not self.heic_files:
+        if not self.file_index.names and self.scan_done.is_set():
             messagebox.showwarning("경고", "변환할 HEIC 파일이 없습니다.")
             return False
             
         return True
         
-    def run_conversion(self):
+    def run_conversion(self, engine: ConversionEngine, progress_tracker: ProgressTracker):
         """변환 실행 (별도 스레드)"""
         try:
-            output_format = self.SUPPORTED_FORMATS[self.format_combo.get()]
-            quality = self.quality_var.get()
-            total_files = len(self.heic_files)
+            # 스캔이 아직 진행 중이어도 발견된 파일부터 변환 시작
+            summary = engine.run(self.iter_scanned_files(), progress_tracker)
             
-            # 진행률 초기화
-            self.progress_var.set(0)
-            self.update_progress_label("🚀 변환을 시작합니다...")
-            
-            successful_conversions = 0
-            failed_conversions = 0
-            
-            # 동시 처리를 위한 ThreadPoolExecutor 사용
-            max_workers = min(4, os.cpu_count() or 1)  # 최대 4개 스레드 사용
-            
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # 모든 변환 작업 제출
-                future_to_file = {
-                    executor.submit(self.convert_single_file, file_name, output_format, quality): file_name
-                    for file_name in self.heic_files
-                }
-                
-                # 완료된 작업들 처리
-                for future in concurrent.futures.as_completed(future_to_file):
-                    file_name = future_to_file[future]
-                    
-                    try:
-                        success = future.result()
-                        if success:
-                            successful_conversions += 1
-                        else:
-                            failed_conversions += 1
-                    except Exception as e:
-                        logger.error(f"변환 작업 오류 ({file_name}): {e}")
-                        failed_conversions += 1
-                    
-                    # 진행률 업데이트
-                    completed = successful_conversions + failed_conversions
-                    progress = (completed / total_files) * 100
-                    
-                    self.root.after(0, lambda p=progress: self.progress_var.set(p))
-                    self.root.after(0, lambda c=completed, t=total_files, name=file_name: 
-                                  self.update_progress_label(f"⚡ 변환 중... ({c}/{t}) - {name}"))
+            # 단계별 시간 통계는 결과 폴더에 JSON/CSV로 저장
+            if summary.stage_profile is not None:
+                timings_path = engine.format_directories[0] / self.TIMINGS_FILE_STEM
+                try:
+                    summary.stage_profile.export(timings_path.with_suffix(".json"))
+                    summary.stage_profile.export(timings_path.with_suffix(".csv"))
+                except OSError as e:
+                    logger.error(f"단계별 시간 저장 오류: {e}")
             
             # 변환 완료 처리
-            self.root.after(0, self.conversion_completed, successful_conversions, failed_conversions)
+            self.root.after(0, self.conversion_completed, summary)
             
         except Exception as e:
             logger.error(f"변환 프로세스 오류: {e}")
             self.root.after(0, lambda: self.conversion_error(str(e)))
             
-    def conversion_completed(self, successful: int, failed: int):
+    def poll_progress(self):
+        """쌓인 진행 결과를 모아 진행률/처리량/남은 시간 표시"""
+        self.progress_job = None
+        if self.progress_tracker is None:
+            return
+        
+        # 스캔 중이면 지금까지 발견된 파일 수 기준
+        snapshot = self.progress_tracker.poll()
+        total = snapshot.total or len(self.file_index)
+        
+        if snapshot.completed and total:
+            self.progress_var.set(snapshot.completed / total * 100)
+            eta = f", 남은 시간 {format_duration(snapshot.eta_seconds)}" if snapshot.eta_seconds is not None else ""
+            engine = self.conversion_engine
+            if engine is not None and engine.is_cancelled:
+                state = "⏹️ 중지하는 중..."
+            elif engine is not None and engine.is_paused:
+                state = "⏸️ 일시정지됨"
+            else:
+                state = "⚡ 변환 중..."
+            self.update_progress_label(
+                f"{state} ({snapshot.completed:,}/{total:,}) - {snapshot.current_file}\n"
+                f"{snapshot.files_per_sec:.1f}개/초, {snapshot.mb_per_sec:.1f} MB/초{eta}"
+            )
+        
+        self.progress_job = self.root.after(self.PROGRESS_POLL_MS, self.poll_progress)
+        
+    def stop_progress_polling(self) -> Optional[heic_engine.ProgressSnapshot]:
+        """진행률 갱신 중지 후 최종 집계 반환"""
+        if self.progress_job is not None:
+            self.root.after_cancel(self.progress_job)
+            self.progress_job = None
+        
+        snapshot = self.progress_tracker.poll() if self.progress_tracker else None
+        self.progress_tracker = None
+        return snapshot
+        
+    def conversion_completed(self, summary: heic_engine.ConversionSummary):
         """변환 완료 처리"""
-        self.convert_button.config(state='normal', text="🔄 변환 시작")
+        snapshot = self.stop_progress_polling()
+        self.conversion_engine = None
+        self.set_conversion_controls(running=False)
         self.open_folder_button.config(state='normal')
-        self.progress_var.set(100)
         
-        if failed == 0:
-            message = f"🎉 모든 파일이 성공적으로 변환되었습니다!\n\n✅ 성공: {successful:,}개 파일\n📁 저장 위치: {self.output_directory}"
+        successful, failed, skipped = summary.successful, summary.failed, summary.skipped
+        
+        # 소요 시간과 평균 처리량
+        timing = ""
+        if snapshot is not None:
+            timing = (f"\n⏱️ 소요 시간: {format_duration(snapshot.elapsed)} "
+                      f"({snapshot.files_per_sec:.1f}개/초, {snapshot.mb_per_sec:.1f} MB/초)")
+        
+        # 목표 용량 모드의 품질 탐색 통계
+        if summary.encode_iterations and summary.encoded:
+            timing += (f"\n🎯 품질 탐색: 파일당 평균 {summary.encode_iterations / summary.encoded:.1f}회 "
+                       f"(최대 {summary.max_encode_iterations}회)")
+            if summary.over_budget:
+                timing += f"\n⚠️ 최저 품질로도 목표 용량 초과: {summary.over_budget:,}개"
+        
+        # 중복 파일 (변환 대신 결과를 링크)
+        if summary.duplicates:
+            timing += (f"\n🔗 중복 파일: {summary.duplicates:,}개는 결과를 링크 "
+                       f"({summary.duplicate_bytes / (1024 * 1024):.1f} MB 변환 생략)")
+        
+        # 단계별 소요 시간 (p50/p95/p99)
+        if summary.stage_profile is not None:
+            stages = summary.stage_profile.to_dict()
+            if stages:
+                timing += "\n\n📊 단계별 시간 (p50 / p95 / p99):"
+                for stage, stats in stages.items():
+                    timing += (f"\n• {stage}: {stats['p50_ms']:.0f} / {stats['p95_ms']:.0f} / "
+                               f"{stats['p99_ms']:.0f} ms")
+                timing += f"\n(저장: {self.TIMINGS_FILE_STEM}.json, .csv)"
+        
+        if summary.cancelled:
+            message = f"⏹️ 변환이 중지되었습니다\n\n✅ 성공: {successful:,}개\n❌ 실패: {failed:,}개"
+            if skipped:
+                message += f"\n⏭️ 건너뜀 (변경 없음): {skipped:,}개"
+            message += f"{timing}\n📁 저장 위치: {self.output_directory}"
+            self.update_status("⏹️ 변환이 중지되었습니다", "warning")
+            self.update_progress_label(f"⏹️ 변환 중지됨 (완료: {successful + skipped:,}개)")
+            messagebox.showinfo("변환 중지", message)
+        elif failed == 0:
+            self.progress_var.set(100)
+            message = f"🎉 모든 파일이 성공적으로 변환되었습니다!\n\n✅ 성공: {successful:,}개 파일"
+            if skipped:
+                message += f"\n⏭️ 건너뜀 (변경 없음): {skipped:,}개"
+            message += f"{timing}\n📁 저장 위치: {self.output_directory}"
             self.update_status("✅ 모든 파일 변환 완료!", "success")
             self.update_progress_label("🎉 변환 완료!")
             
@@ -793,19 +1444,65 @@ class HEICConverter:
             if result == 'yes':
                 self.open_output_folder()
         else:
-            message = f"⚠️ 변환이 완료되었습니다 (일부 오류 발생)\n\n✅ 성공: {successful:,}개\n❌ 실패: {failed:,}개\n📁 저장 위치: {self.output_directory}"
+            self.progress_var.set(100)
+            message = f"⚠️ 변환이 완료되었습니다 (일부 오류 발생)\n\n✅ 성공: {successful:,}개\n❌ 실패: {failed:,}개"
+            if skipped:
+                message += f"\n⏭️ 건너뜀 (변경 없음): {skipped:,}개"
+            message += f"{timing}\n📁 저장 위치: {self.output_directory}"
             self.update_status(f"⚠️ 변환 완료 (실패: {failed:,}개)", "warning")
             self.update_progress_label(f"⚠️ 변환 완료 (실패: {failed:,}개)")
             messagebox.showwarning("변환 완료", message)
             
     def conversion_error(self, error_message: str):
         """변환 오류 처리"""
-        self.convert_button.config(state='normal', text="🔄 변환 시작")
+        self.stop_progress_polling()
+        self.conversion_engine = None
+        self.set_conversion_controls(running=False)
         self.progress_var.set(0)
         self.update_status("❌ 변환 중 오류 발생", "error")
         self.update_progress_label("❌ 변환 실패")
         messagebox.showerror("오류", f"변환 중 심각한 오류가 발생했습니다:\n\n{error_message}")
         
+    def start_preset_benchmark(self):
+        """선택한 폴더의 표본 파일로 프리셋별 인코딩 시간/용량 비교"""
+        if not self.validate_conversion():
+            return
+        
+        self.benchmark_button.config(state='disabled')
+        self.update_status("⏱️ 프리셋별 인코딩 속도를 측정하는 중...", "info")
+        
+        settings = self.get_conversion_settings()
+        output_format = settings.output_format
+        file_names = list(self.file_index.names)
+        
+        def run_benchmark():
+            try:
+                results = heic_engine.benchmark_presets(self.source_directory, file_names, settings)
+                self.root.after(0, self.preset_benchmark_completed, output_format, results)
+            except Exception as e:
+                logger.error(f"프리셋 측정 오류: {e}")
+                self.root.after(0, lambda: self.benchmark_button.config(state='normal'))
+                self.root.after(0, lambda: self.update_status("❌ 프리셋 측정 중 오류가 발생했습니다", "error"))
+        
+        thread = threading.Thread(target=run_benchmark)
+        thread.daemon = True
+        thread.start()
+        
+    def preset_benchmark_completed(self, output_format: ImageFormat, results: List[heic_engine.PresetBenchmark]):
+        """프리셋 비교 결과 표시"""
+        self.benchmark_button.config(state='normal')
+        self.update_status("✅ 프리셋 측정 완료", "success")
+        
+        preset_names = {preset: label for label, preset in self.PRESET_LABELS.items()}
+        lines = [f"{output_format.name} 형식, 표본 {results[0].files:,}개 기준\n"]
+        for result in results:
+            per_file = result.encode_seconds / result.files * 1000 if result.files else 0
+            lines.append(
+                f"• {preset_names[result.preset]}: 파일당 {per_file:.0f} ms, "
+                f"총 {result.output_bytes / (1024 * 1024):.2f} MB"
+            )
+        messagebox.showinfo("프리셋 비교", '\n'.join(lines))
+        
     def open_output_folder(self):
         """변환된 파일이 있는 폴더 열기"""
         if not self.output_directory or not self.output_directory.exists():
@@ -838,14 +1535,15 @@ class HEICConverter:
         if result == 'yes':
             self.source_directory = None
             self.output_directory = None
-            self.heic_files.clear()
+            self.invalidate_scan()
+            self.stop_metadata_indexer()
             
             # UI 초기화
             self.directory_label.config(text="아직 선택되지 않음")
-            self.file_listbox.delete(0, tk.END)
-            self.file_count_label.config(text="파일 개수: 0")
-            self.file_size_label.config(text="총 용량: 0 MB")
+            self.filter_var.set("")
+            self.reset_file_index()
             
+            self.preview_cache.clear()
             self.clear_preview_and_info()
             
             self.progress_var.set(0)
@@ -854,6 +1552,18 @@ class HEICConverter:
             
             self.format_combo.set("JPEG")
             self.quality_var.set(95)
+            self.preset_combo.set("최소 용량")
+            self.target_size_combo.set("제한 없음")
+            self.resize_combo.set("원본 크기")
+            self.resample_combo.set("고품질")
+            self.name_template_combo.set("원본 이름")
+            self.backend_combo.set("스레드")
+            self.memory_budget_combo.set("제한 없음")
+            self.incremental_var.set(True)
+            self.dedupe_var.set(False)
+            self.all_images_var.set(False)
+            self.auxiliary_images_var.set(False)
+            self.profile_var.set(False)
             
             self.update_status("🔄 모든 설정이 초기화되었습니다", "info")
         
@@ -888,18 +1598,29 @@ class HEICConverter:
             messagebox.showerror("오류", f"애플리케이션 실행 중 오류가 발생했습니다:\n{e}")
             
     def on_window_configure(self, event):
-        """창 크기 변경 시 캔버스 업데이트"""
-        if event.widget == self.root:
-            # 현재 선택된 파일이 있으면 미리보기 다시 로드
-            selection = self.file_listbox.curselection()
-            if selection and self.heic_files:
-                try:
-                    selected_file = self.heic_files[selection[0]]
-                    file_path = self.source_directory / selected_file
-                    # 짧은 지연 후 미리보기 업데이트 (레이아웃 안정화 대기)
-                    self.root.after(100, lambda: self.load_preview(file_path))
-                except:
-                    pass
+        """창 크기 변경 시 캔버스 업데이트 (크기 변경이 멈춘 뒤 한 번만)"""
+        if event.widget != self.root:
+            return
+        
+        # 창 이동처럼 크기가 그대로면 무시
+        window_size = (event.width, event.height)
+        if window_size == self.window_size:
+            return
+        self.window_size = window_size
+        
+        if self.resize_job is not None:
+            self.root.after_cancel(self.resize_job)
+        self.resize_job = self.root.after(RESIZE_DEBOUNCE_MS, self.on_resize_settled)
+        
+    def on_resize_settled(self):
+        """크기 변경이 끝나면 현재 선택된 파일의 미리보기 다시 렌더링"""
+        self.resize_job = None
+        if self.selected_row is not None:
+            try:
+                selected_file = self.file_index.names[self.selected_row]
+                self.request_final_preview(self.source_directory / selected_file)
+            except Exception as e:
+                logger.error(f"미리보기 다시 그리기 오류: {e}")
 
 def main():
     """메인 함수"""
@@ -911,4 +1632,5 @@ def main():
         messagebox.showerror("오류", f"애플리케이션을 시작할 수 없습니다:\n{e}")
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""내용이 같은 HEIC 파일 찾기
+
+휴대폰을 여러 번 백업하면 같은 사진이 여러 폴더에 그대로 복사되는 경우가 많습니다.
+크기가 같은 파일끼리만 앞/뒤 일부의 해시를 비교하고, 그래도 같은 파일만 전체 해시를 계산하므로
+대부분의 파일은 읽지 않고 걸러집니다. 해시 계산은 스레드 풀에서 병렬로 실행합니다.
+"""
+import os
+import hashlib
+import concurrent.futures
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
+import logging
+
+from heic_manifest import file_content_hash
+
+logger = logging.getLogger(__name__)
+
+# 부분 해시에 사용하는 앞/뒤 크기 (HEIF 헤더는 비슷하므로 끝부분도 함께 비교)
+PARTIAL_HASH_BYTES = 64 * 1024
+
+@dataclass
+class DuplicateScan:
+    """중복 검사 결과
+
+    unique는 변환할 파일(입력 순서 유지), duplicates는 대표 파일 → 내용이 같은 나머지 파일입니다.
+    """
+    unique: List[str]
+    duplicates: Dict[str, List[str]] = field(default_factory=dict)
+    content_hashes: Dict[str, str] = field(default_factory=dict)  # 전체 해시를 계산한 파일만
+    duplicate_bytes: int = 0  # 변환을 생략한 원본 크기 합
+    hashed_bytes: int = 0  # 해시 계산에 읽은 크기 합
+
+    @property
+    def duplicate_count(self) -> int:
+        """변환을 생략하는 파일 수"""
+        return sum(len(copies) for copies in self.duplicates.values())
+
+def partial_content_hash(path: Path, size: int) -> str:
+    """파일 앞/뒤 PARTIAL_HASH_BYTES의 해시 (크기가 작으면 전체)"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        digest.update(f.read(PARTIAL_HASH_BYTES))
+        if size > PARTIAL_HASH_BYTES * 2:
+            f.seek(-PARTIAL_HASH_BYTES, os.SEEK_END)
+            digest.update(f.read(PARTIAL_HASH_BYTES))
+    return digest.hexdigest()
+
+def _safe(function: Callable[[str], str]) -> Callable[[str], Optional[str]]:
+    """읽을 수 없는 파일은 None (중복이 아닌 것으로 처리, 변환 단계에서 오류로 보고됨)"""
+    def wrapper(file_name: str) -> Optional[str]:
+        try:
+            return function(file_name)
+        except OSError as e:
+            logger.debug(f"중복 검사용 해시 계산 실패 ({file_name}): {e}")
+            return None
+    return wrapper
+
+def _group_by(executor: concurrent.futures.Executor, groups: List[List[str]],
+              key: Callable[[str], str]) -> Tuple[List[List[str]], Dict[str, str]]:
+    """각 그룹을 key 값이 같은 파일끼리 다시 나눔 (파일이 하나뿐인 그룹은 버림)"""
+    file_names = [name for group in groups for name in group]
+    keys: Dict[str, str] = {}
+    for file_name, value in zip(file_names, executor.map(_safe(key), file_names)):
+        if value is not None:
+            keys[file_name] = value
+
+    regrouped = []
+    for group in groups:
+        buckets: Dict[str, List[str]] = {}
+        for file_name in group:
+            if file_name in keys:
+                buckets.setdefault(keys[file_name], []).append(file_name)
+        regrouped.extend(bucket for bucket in buckets.values() if len(bucket) > 1)
+    return regrouped, keys
+
+def find_duplicates(source_directory: Path, file_names: Sequence[str],
+                    max_workers: Optional[int] = None) -> DuplicateScan:
+    """크기 → 부분 해시 → 전체 해시 순서로 내용이 같은 파일을 찾음 (입력 순서상 첫 파일이 대표)"""
+    source_directory = Path(source_directory)
+
+    # 1단계: 크기가 같은 파일끼리 묶음 (stat만 사용)
+    sizes: Dict[str, int] = {}
+    by_size: Dict[int, List[str]] = {}
+    for file_name in file_names:
+        try:
+            size = os.stat(source_directory / file_name).st_size
+        except OSError:
+            continue
+        sizes[file_name] = size
+        by_size.setdefault(size, []).append(file_name)
+    groups = [group for group in by_size.values() if len(group) > 1]
+
+    hashed_bytes = 0
+    content_hashes: Dict[str, str] = {}
+    if groups:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # 2단계: 앞/뒤 일부만 읽어 비교
+            groups, _ = _group_by(executor, groups, lambda name: partial_content_hash(
+                source_directory / name, sizes[name]))
+            hashed_bytes += sum(min(sizes[name], PARTIAL_HASH_BYTES * 2)
+                                for group in by_size.values() if len(group) > 1 for name in group)
+
+            # 3단계: 남은 후보만 전체 해시 계산
+            groups, content_hashes = _group_by(executor, groups,
+                                               lambda name: file_content_hash(source_directory / name))
+            hashed_bytes += sum(sizes[name] for name in content_hashes)
+
+    duplicates = {group[0]: group[1:] for group in groups}
+    duplicate_names = {name for copies in duplicates.values() for name in copies}
+    return DuplicateScan(
+        [name for name in file_names if name not in duplicate_names],
+        duplicates,
+        content_hashes,
+        sum(sizes[name] for name in duplicate_names),
+        hashed_bytes,
+    )
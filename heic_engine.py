@@ -0,0 +1,1610 @@
+"""HEIC 변환 엔진
+
+Tkinter에 의존하지 않는 변환 로직 모음입니다.
+GUI(heic_converter_env.py)와 CLI(heic_cli.py)가 모두 이 모듈을 사용합니다.
+"""
+import os
+import io
+import json
+import math
+import time
+import queue
+import signal
+import shutil
+import threading
+import struct
+import fnmatch
+import string
+import datetime
+import contextlib
+import collections
+import multiprocessing
+import concurrent.futures
+from pathlib import Path
+from typing import List, Dict, Optional, Callable, Tuple, Iterable, Iterator, Sequence, Deque
+from dataclasses import dataclass, asdict, replace
+import logging
+
+from PIL import Image
+import pillow_heif
+from pillow_heif import register_heif_opener
+
+from heic_profile import StageProfile
+from heic_dedupe import DuplicateScan, find_duplicates
+from heic_metadata import ImageMetadata, load_metadata
+from heic_manifest import (
+    ConversionManifest, ManifestRecord, ConversionJournal, JournalEntry, file_content_hash, fsync_directory
+)
+
+# HEIF 형식 지원 등록
+register_heif_opener()
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ImageFormat:
+    """이미지 형식 정보를 담는 데이터 클래스"""
+    name: str
+    extension: str
+    pil_format: str
+
+# 지원하는 이미지 형식들
+SUPPORTED_FORMATS = {
+    "JPEG": ImageFormat("JPEG", "jpg", "JPEG"),
+    "PNG": ImageFormat("PNG", "png", "PNG"),
+    "WEBP": ImageFormat("WEBP", "webp", "WEBP")
+}
+
+# 지원하는 HEIC 확장자들
+HEIC_EXTENSIONS = {'.heic', '.heif', '.HEIC', '.HEIF'}
+
+# 기본 동시 작업 수 (모든 코어 사용)
+DEFAULT_MAX_WORKERS = os.cpu_count() or 1
+
+# 병렬 처리 방식: 스레드 풀 또는 프로세스 풀 (GIL 회피)
+BACKENDS = ("thread", "process")
+DEFAULT_BACKEND = "thread"
+
+# 형식별 인코더 속도/용량 프리셋 (smallest는 기존 기본값과 동일)
+ENCODER_PRESETS = {
+    "fast": {
+        "JPEG": {'optimize': False},
+        "PNG": {'compress_level': 1},
+        "WEBP": {'method': 0},
+    },
+    "balanced": {
+        "JPEG": {'optimize': True},
+        "PNG": {'compress_level': 6},
+        "WEBP": {'method': 4},
+    },
+    "smallest": {
+        "JPEG": {'optimize': True},
+        "PNG": {'optimize': True},
+        "WEBP": {'method': 6},  # 최고 압축률
+    },
+}
+DEFAULT_PRESET = "smallest"
+
+# 크기 조절 필터 (위에서부터 빠름 → 고품질)
+RESAMPLE_FILTERS = {
+    "nearest": Image.Resampling.NEAREST,
+    "bilinear": Image.Resampling.BILINEAR,
+    "bicubic": Image.Resampling.BICUBIC,
+    "lanczos": Image.Resampling.LANCZOS,
+}
+DEFAULT_RESAMPLE = "lanczos"
+
+# 크게 축소할 때 정수배 축소를 먼저 적용하는 기준 (화질 차이는 거의 없고 훨씬 빠름)
+RESIZE_REDUCING_GAP = 3.0
+
+# 화면과 명령줄에서 지정할 수 있는 품질 범위
+MIN_QUALITY = 50
+MAX_QUALITY = 100
+
+# 목표 용량 모드에서 탐색하는 최저 품질 (이보다 낮추면 화질 손상이 너무 큼)
+TARGET_MIN_QUALITY = 10
+
+# 메모리 추정: Pillow는 RGB도 픽셀당 4바이트로 저장
+PILLOW_BYTES_PER_PIXEL = 4
+
+# 이미지 크기를 찾을 때 읽는 'meta' 상자의 최대 크기 (더 크면 Image.open으로 헤더를 읽음)
+META_BOX_MAX_BYTES = 1024 * 1024
+
+# 메모리 예산이 있을 때 헤더를 미리 읽어 두는 파일 수와 스레드 수 (스케줄러가 디스크를 기다리지 않도록)
+ESTIMATE_LOOKAHEAD = 8
+ESTIMATE_THREADS = 2
+
+# 알파 채널 보조 이미지를 나타내는 HEIF 식별자
+HEIF_ALPHA_URNS = (b"urn:mpeg:hevc:2015:auxid:1", b"urn:mpeg:mpegB:cicp:systems:auxiliary:alpha")
+
+# 저장 중인 임시 파일 접미사 (완료되면 최종 이름으로 교체)
+TEMP_FILE_SUFFIX = ".heic-tmp"
+
+# 출력 이름 템플릿 필드 (메타데이터 필드를 쓰면 변환 전에 모든 파일의 헤더를 한 번 읽음)
+TEMPLATE_FIELDS = ("stem", "name", "parent", "DateTimeOriginal", "camera", "width", "height")
+TEMPLATE_METADATA_FIELDS = ("DateTimeOriginal", "camera", "width", "height")
+
+# 템플릿 끝의 확장자 표시 (형식별 확장자로 바뀜)
+TEMPLATE_EXTENSION = ".{ext}"
+
+# 파일/폴더 이름에 쓸 수 없는 문자 (Windows 기준)
+INVALID_NAME_CHARS = '<>:"\\|?*'
+
+# 한 파일의 여러 결과(형식×크기)를 동시에 인코딩하는 스레드 수 (전체 합계, 프로세스 워커끼리 나눠 씀)
+ENCODE_THREADS = DEFAULT_MAX_WORKERS
+
+# 워커당 동시에 제출해 두는 작업 수 (진행 중 작업 수 = 워커 수 × 이 값)
+IN_FLIGHT_PER_WORKER = 4
+
+# 증분 모드에서 매니페스트를 커밋하는 간격 (파일 수)
+MANIFEST_COMMIT_INTERVAL = 500
+
+# 스캔 결과를 UI 등에 넘길 때의 기본 묶음 크기
+DEFAULT_SCAN_BATCH_SIZE = 500
+
+@dataclass
+class ScanEntry:
+    """스캔으로 발견한 HEIC 파일 (file_name은 원본 폴더 기준 상대 경로)"""
+    file_name: str
+    size: int
+    mtime: float
+
+@dataclass(frozen=True)
+class ResizeTarget:
+    """출력 크기 (비율을 유지한 채 width×height 상자 안에 맞춤, 확대는 하지 않음)"""
+    width: int
+    height: int
+
+    @property
+    def label(self) -> str:
+        """파일 이름에 붙는 크기 표시 (긴 변 기준이면 숫자 하나)"""
+        if self.width == self.height:
+            return str(self.width)
+        return f"{self.width}x{self.height}"
+
+def parse_resize_target(text: str) -> ResizeTarget:
+    """'2048'(긴 변 최대 크기) 또는 '1920x1080'(맞춤 상자) 형식의 크기 해석"""
+    try:
+        parts = [int(part) for part in text.lower().split("x")]
+    except ValueError:
+        parts = []
+    if len(parts) == 1:
+        parts *= 2
+    if len(parts) != 2 or min(parts) <= 0:
+        raise ValueError(f"지원하지 않는 크기 형식입니다: {text}")
+    return ResizeTarget(*parts)
+
+def parse_byte_size(text: str) -> int:
+    """'500K', '1.5M', '2G', '800000' 형식의 용량을 바이트로 해석"""
+    units = {"K": 1024, "M": 1024 * 1024, "G": 1024 * 1024 * 1024}
+    number = text.strip().upper().removesuffix("B")
+    multiplier = units.get(number[-1:], 1)
+    if multiplier != 1:
+        number = number[:-1]
+    try:
+        size = int(float(number) * multiplier)
+    except (ValueError, OverflowError):
+        # 숫자가 아니거나 inf처럼 정수로 바꿀 수 없는 값
+        size = 0
+    if size <= 0:
+        raise ValueError(f"지원하지 않는 용량 형식입니다: {text}")
+    return size
+
+@dataclass
+class ConversionSettings:
+    """변환 설정
+
+    sizes가 비어 있으면 원본 크기로 저장합니다.
+    extra_formats를 지정하면 한 번 디코딩한 이미지를 output_format과 함께 여러 형식으로 저장합니다.
+    all_images를 켜면 HEIF 컨테이너의 모든 최상위 이미지(연사 등)를, auxiliary_images를 켜면
+    깊이 맵 등 보조 이미지도 각각 저장합니다.
+    name_template을 지정하면 출력 폴더 아래 경로를 템플릿으로 정합니다 (예: {DateTimeOriginal:%Y/%m}/{stem}.{ext}).
+    target_bytes를 지정하면 JPEG/WEBP는 quality를 상한으로 목표 용량 이하가 되는 가장 높은 품질로 저장합니다.
+    """
+    output_format: ImageFormat
+    quality: int = 95
+    preset: str = DEFAULT_PRESET
+    sizes: Tuple[ResizeTarget, ...] = ()
+    resample: str = DEFAULT_RESAMPLE
+    extra_formats: Tuple[ImageFormat, ...] = ()
+    target_bytes: Optional[int] = None
+    all_images: bool = False
+    auxiliary_images: bool = False
+    name_template: Optional[str] = None
+
+    @property
+    def output_formats(self) -> Tuple[ImageFormat, ...]:
+        """저장할 모든 형식 (첫 번째가 기본 형식)"""
+        return (self.output_format,) + tuple(self.extra_formats)
+
+    @property
+    def multi_image(self) -> bool:
+        """컨테이너의 기본 이미지 외 다른 이미지도 저장하는지 여부"""
+        return self.all_images or self.auxiliary_images
+
+    def cache_key(self) -> str:
+        """매니페스트 비교용 설정 문자열 (설정이 바뀌면 다시 변환)"""
+        return json.dumps(asdict(self), sort_keys=True)
+
+@dataclass(frozen=True)
+class ImagePart:
+    """HEIF 컨테이너 안의 이미지 하나
+
+    index는 최상위 이미지 순서, kind는 보조 이미지 종류("depth", "hdrgainmap" 등, 본 이미지는 빈 문자열),
+    aux_id는 깊이 맵 순서 또는 보조 이미지 ID입니다.
+    """
+    index: int = 0
+    primary: bool = True
+    kind: str = ""
+    aux_id: int = 0
+
+    @property
+    def suffix(self) -> str:
+        """출력 파일 이름에 붙는 표시 (기본 이미지는 없음, 예: -2, -depth, -2-depth, 번호는 1부터)"""
+        labels = ([] if self.primary else [str(self.index + 1)]) + ([self.kind] if self.kind else [])
+        return "".join(f"-{label}" for label in labels)
+
+# 기본 이미지 (단일 이미지 변환)
+PRIMARY_PART = ImagePart()
+
+@dataclass
+class ConversionResult:
+    """단일 파일 변환 결과"""
+    file_name: str
+    success: bool
+    output_path: Optional[Path] = None
+    error: Optional[str] = None
+    skipped: bool = False  # 증분 모드에서 변경이 없어 건너뜀
+    content_hash: Optional[str] = None
+    input_bytes: int = 0  # 처리한 원본 크기 (처리량 계산용)
+    encode_iterations: int = 0  # 목표 용량 모드에서 품질 탐색에 사용한 인코딩 횟수
+    over_budget: bool = False  # 최저 품질로도 목표 용량을 넘은 결과가 있음
+    stage_seconds: Optional[Dict[str, float]] = None  # 단계별 소요 시간 (heic_profile.STAGES)
+    duplicate_of: Optional[str] = None  # 내용이 같은 파일의 결과를 링크/복사한 경우 그 파일 이름
+
+@dataclass
+class PresetBenchmark:
+    """프리셋별 인코딩 측정 결과"""
+    preset: str
+    files: int
+    encode_seconds: float
+    output_bytes: int
+
+@dataclass
+class ConversionSummary:
+    """전체 변환 결과 요약"""
+    successful: int
+    failed: int
+    output_directory: Path
+    elapsed: float
+    skipped: int = 0
+    cancelled: bool = False
+    encode_iterations: int = 0  # 목표 용량 모드의 전체 인코딩 횟수
+    max_encode_iterations: int = 0  # 파일 하나에 사용한 최대 인코딩 횟수
+    over_budget: int = 0  # 목표 용량을 넘은 파일 수
+    stage_profile: Optional[StageProfile] = None  # 단계별 시간 통계 (profile 모드)
+    duplicates: int = 0  # 변환 대신 결과를 링크/복사한 중복 파일 수
+    duplicate_bytes: int = 0  # 변환을 생략한 중복 원본 크기 합
+
+    @property
+    def encoded(self) -> int:
+        """실제로 인코딩한 파일 수 (결과를 링크한 중복 파일 제외)"""
+        return self.successful - self.duplicates
+
+# 진행률 콜백: (완료 개수, 전체 개수 - 스캔 중이라 모르면 None, 방금 끝난 파일 결과)
+ProgressCallback = Callable[[int, Optional[int], ConversionResult], None]
+
+@dataclass
+class ProgressSnapshot:
+    """특정 시점의 진행 상황 집계"""
+    completed: int
+    total: Optional[int]
+    successful: int
+    failed: int
+    skipped: int
+    current_file: Optional[str]
+    elapsed: float
+    files_per_sec: float
+    mb_per_sec: float
+    eta_seconds: Optional[float]
+
+def format_duration(seconds: float) -> str:
+    """남은 시간 등 표시용 문자열 (예: 1시간 5분, 3분 20초, 15초)"""
+    seconds = int(round(seconds))
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}시간 {minutes}분"
+    if minutes:
+        return f"{minutes}분 {seconds}초"
+    return f"{seconds}초"
+
+class ProgressTracker:
+    """변환 진행 상황 집계기
+
+    ProgressCallback으로 넘기면 작업 스레드는 결과를 큐에 넣기만 하고,
+    UI 등은 원하는 주기로 poll()을 호출해 쌓인 결과를 한 번에 집계합니다.
+    파일 수와 관계없이 화면 갱신 비용이 일정합니다.
+    """
+
+    def __init__(self):
+        self.queue: "queue.SimpleQueue[Tuple[Optional[int], ConversionResult]]" = queue.SimpleQueue()
+        self.start_time = time.perf_counter()
+        self.total: Optional[int] = None
+        self.successful = 0
+        self.failed = 0
+        self.skipped = 0
+        self.input_bytes = 0
+        self.current_file: Optional[str] = None
+
+    def __call__(self, completed: int, total: Optional[int], result: ConversionResult):
+        self.queue.put((total, result))
+
+    def poll(self, total: Optional[int] = None) -> ProgressSnapshot:
+        """쌓인 결과를 집계해 현재 진행 상황 반환 (total을 주면 전체 개수로 사용)"""
+        while True:
+            try:
+                result_total, result = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if result_total is not None:
+                self.total = result_total
+            if result.skipped:
+                self.skipped += 1
+            elif result.success:
+                self.successful += 1
+            else:
+                self.failed += 1
+            self.input_bytes += result.input_bytes
+            self.current_file = result.file_name
+
+        total = total if total is not None else self.total
+        completed = self.successful + self.failed + self.skipped
+        elapsed = time.perf_counter() - self.start_time
+        files_per_sec = completed / elapsed if elapsed > 0 else 0.0
+        mb_per_sec = self.input_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+        eta_seconds = (total - completed) / files_per_sec if total and files_per_sec > 0 else None
+
+        return ProgressSnapshot(
+            completed, total, self.successful, self.failed, self.skipped, self.current_file,
+            elapsed, files_per_sec, mb_per_sec, eta_seconds
+        )
+
+def _matches_any(rel_path: str, name: str, patterns: Sequence[str]) -> bool:
+    """상대 경로 또는 파일 이름이 glob 패턴 중 하나와 일치하는지 확인"""
+    return any(fnmatch.fnmatch(rel_path, pattern) or fnmatch.fnmatch(name, pattern)
+               for pattern in patterns)
+
+def matches_scan_filters(rel_path: str, is_dir: bool = False,
+                         include: Optional[Sequence[str]] = None,
+                         exclude: Optional[Sequence[str]] = None) -> bool:
+    """스캔 대상인지 확인 (폴더는 exclude만, 파일은 확장자와 include/exclude까지 검사)"""
+    name = rel_path.rsplit("/", 1)[-1]
+    if exclude and _matches_any(rel_path, name, exclude):
+        return False
+    if is_dir:
+        return True
+    if os.path.splitext(name)[1] not in HEIC_EXTENSIONS:
+        return False
+    return not include or _matches_any(rel_path, name, include)
+
+def iter_heic_files(directory: Path, recursive: bool = True,
+                    include: Optional[Sequence[str]] = None,
+                    exclude: Optional[Sequence[str]] = None) -> Iterator[ScanEntry]:
+    """HEIC 파일을 발견하는 즉시 하나씩 반환하는 스캐너
+
+    os.scandir의 DirEntry 정보를 재사용하므로 파일당 추가 stat 호출이 없습니다.
+    include가 주어지면 일치하는 파일만, exclude와 일치하는 파일/폴더는 제외합니다.
+    """
+    root = str(directory)
+    pending_dirs = [""]
+
+    while pending_dirs:
+        rel_dir = pending_dirs.pop()
+        try:
+            with os.scandir(os.path.join(root, rel_dir)) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            logger.warning(f"폴더를 읽을 수 없습니다 ({rel_dir or root}): {e}")
+            continue
+
+        sub_dirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and matches_scan_filters(rel_path, True, exclude=exclude):
+                        sub_dirs.append(rel_path)
+                    continue
+
+                if not matches_scan_filters(rel_path, False, include, exclude) or not entry.is_file():
+                    continue
+
+                stat = entry.stat()
+                yield ScanEntry(rel_path, stat.st_size, stat.st_mtime)
+
+            except OSError as e:
+                logger.warning(f"파일 정보를 읽을 수 없습니다 ({rel_path}): {e}")
+
+        # 이름순으로 탐색하도록 역순으로 쌓음
+        pending_dirs.extend(reversed(sub_dirs))
+
+def iter_scan_batches(entries: Iterable[ScanEntry],
+                      batch_size: int = DEFAULT_SCAN_BATCH_SIZE) -> Iterator[List[ScanEntry]]:
+    """스캔 결과를 batch_size 단위로 묶어서 반환"""
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def scan_heic_files(directory: Path, recursive: bool = True,
+                    include: Optional[Sequence[str]] = None,
+                    exclude: Optional[Sequence[str]] = None) -> Tuple[List[str], int]:
+    """디렉토리에서 HEIC 파일 목록(상대 경로)과 총 용량(바이트)을 한 번에 반환"""
+    heic_files = []
+    total_size = 0
+    for entry in iter_heic_files(directory, recursive, include, exclude):
+        heic_files.append(entry.file_name)
+        total_size += entry.size
+    return heic_files, total_size
+
+def get_output_directory(source_directory: Path, output_format: ImageFormat) -> Path:
+    """출력 디렉토리 경로 (<원본 폴더>/<확장자>)"""
+    return source_directory / output_format.extension
+
+def get_output_path(output_dir: Path, file_name: str, output_format: ImageFormat,
+                    suffix: str = "", output_name: Optional[str] = None) -> Path:
+    """출력 파일 경로 (<출력 폴더>/<원본 상대 경로><접미사>.<확장자>)
+
+    하위 폴더의 파일은 원본과 같은 폴더 구조로 저장하므로 다른 폴더의 같은 이름 파일끼리 덮어쓰지 않습니다.
+    output_name(출력 폴더 기준 상대 경로, 확장자 제외)을 지정하면 원본 경로 대신 사용합니다.
+    """
+    return output_dir / f"{output_name or os.path.splitext(file_name)[0]}{suffix}.{output_format.extension}"
+
+def get_format_directory(output_dir: Path, settings: ConversionSettings, output_format: ImageFormat) -> Path:
+    """형식별 출력 폴더 (형식이 여러 개면 <출력 폴더>/<확장자>)"""
+    if settings.extra_formats:
+        return output_dir / output_format.extension
+    return output_dir
+
+def get_output_paths(output_dir: Path, file_name: str, settings: ConversionSettings,
+                     part: ImagePart = PRIMARY_PART, output_name: Optional[str] = None) -> List[Path]:
+    """설정에 따른 출력 파일 경로들 (형식 × 크기 순서, 크기가 여러 개면 이름 뒤에 _<크기>를 붙임)
+
+    컨테이너의 기본 이미지가 아니면 크기 표시 앞에 이미지 표시(-2, -depth 등)를 붙입니다.
+    """
+    if len(settings.sizes) <= 1:
+        suffixes = [part.suffix]
+    else:
+        suffixes = [f"{part.suffix}_{target.label}" for target in settings.sizes]
+    return [get_output_path(get_format_directory(output_dir, settings, output_format),
+                            file_name, output_format, suffix, output_name)
+            for output_format in settings.output_formats for suffix in suffixes]
+
+def parse_name_template(template: str) -> Tuple[str, ...]:
+    """출력 이름 템플릿 검사 후 사용한 필드 목록 반환 (확장자는 끝의 .{ext}로만 쓸 수 있음)"""
+    body = template.removesuffix(TEMPLATE_EXTENSION)
+    fields = []
+    try:
+        parsed = list(string.Formatter().parse(body))
+    except ValueError as e:
+        raise ValueError(f"지원하지 않는 이름 템플릿입니다: {template} ({e})")
+    for _, field_name, _, _ in parsed:
+        if field_name is None:
+            continue
+        if field_name not in TEMPLATE_FIELDS:
+            raise ValueError(f"지원하지 않는 이름 템플릿 필드입니다: {{{field_name}}}")
+        fields.append(field_name)
+    if not fields:
+        raise ValueError(f"이름 템플릿에 필드가 없습니다: {template}")
+    return tuple(fields)
+
+def _sanitize_name(part: str) -> str:
+    """파일/폴더 이름 하나에서 쓸 수 없는 문자를 _로 바꿈"""
+    cleaned = "".join("_" if ch in INVALID_NAME_CHARS or ord(ch) < 32 else ch for ch in part)
+    return cleaned.strip(" .") or "_"
+
+def render_output_name(template: str, file_name: str, mtime: float,
+                       metadata: Optional[ImageMetadata] = None) -> str:
+    """템플릿으로 출력 이름(출력 폴더 기준 상대 경로, 확장자 제외) 생성
+
+    촬영 일시가 없으면 수정 시각, 카메라가 없으면 Unknown을 사용합니다.
+    """
+    source = Path(file_name)
+    captured = metadata.captured if metadata is not None and metadata.captured is not None else mtime
+    fields = {
+        "stem": source.stem,
+        "name": source.name,
+        "parent": source.parent.as_posix() if source.parent != Path(".") else "",
+        "DateTimeOriginal": datetime.datetime.fromtimestamp(captured),
+        "camera": (metadata.camera if metadata is not None else "") or "Unknown",
+        "width": metadata.width if metadata is not None else 0,
+        "height": metadata.height if metadata is not None else 0,
+    }
+    rendered = template.removesuffix(TEMPLATE_EXTENSION).format(**fields)
+    # 빈 폴더 이름과 상위 폴더 이동(..)은 버려서 항상 출력 폴더 안에 저장
+    parts = [_sanitize_name(part) for part in rendered.replace("\\", "/").split("/")
+             if part.strip() not in ("", ".", "..")]
+    if not parts:
+        raise ValueError(f"이름 템플릿 결과가 비어 있습니다: {file_name}")
+    return "/".join(parts)
+
+@dataclass
+class OutputPlan:
+    """배치 전체의 출력 이름 계획 (names는 원본 상대 경로 → 출력 이름)"""
+    names: Dict[str, str]
+    collisions: int = 0  # 이름이 겹쳐 번호를 붙인 파일 수
+    metadata_read: int = 0  # 템플릿을 위해 메타데이터를 확인한 파일 수
+
+def plan_output_names(source_directory: Path, file_names: Sequence[str], template: str,
+                      max_workers: Optional[int] = None,
+                      reserved: Optional[Dict[str, str]] = None) -> OutputPlan:
+    """변환 전에 모든 파일의 출력 이름을 정하고, 겹치는 이름에는 입력 순서대로 _1, _2…를 붙임
+
+    메타데이터 필드를 쓰면 헤더를 한 번만 읽으며(메타데이터 캐시 사용), 변환 중에는 다시 읽지 않습니다.
+    이름 비교는 대소문자를 구분하지 않습니다 (Windows/macOS 파일 시스템 기준).
+    reserved(원본 → 출력 이름)는 이전 배치에서 정한 이름으로, 그 이름은 다른 파일에 주지 않고
+    같은 원본이 다시 들어오면 같은 이름을 씁니다.
+    """
+    reserved = reserved or {}
+    fields = parse_name_template(template)
+    metadata: Dict[str, Optional[ImageMetadata]] = {}
+    if any(field in TEMPLATE_METADATA_FIELDS for field in fields):
+        metadata = load_metadata(source_directory, file_names, max_workers)
+
+    names: Dict[str, str] = {}
+    taken = {name.casefold() for name in reserved.values()}
+    collisions = 0
+    for file_name in file_names:
+        if file_name in reserved:
+            names[file_name] = reserved[file_name]
+            continue
+        file_metadata = metadata.get(file_name)
+        try:
+            mtime = 0.0
+            if "DateTimeOriginal" in fields and (file_metadata is None or file_metadata.captured is None):
+                mtime = os.stat(source_directory / file_name).st_mtime
+            name = render_output_name(template, file_name, mtime, file_metadata)
+        except (OSError, ValueError, OverflowError) as e:
+            # 이름을 만들 수 없는 파일은 원본 이름으로 저장 (변환 오류는 변환 단계에서 보고됨)
+            logger.warning(f"출력 이름 생성 실패, 원본 이름 사용 ({file_name}): {e}")
+            name = _sanitize_name(Path(file_name).stem)
+
+        candidate = name
+        number = 1
+        while candidate.casefold() in taken:
+            candidate = f"{name}_{number}"
+            number += 1
+        if candidate != name:
+            collisions += 1
+        taken.add(candidate.casefold())
+        names[file_name] = candidate
+
+    return OutputPlan(names, collisions, len(metadata))
+
+def fit_within(size: Tuple[int, int], target: ResizeTarget) -> Tuple[int, int]:
+    """비율을 유지하며 target 상자 안에 들어가는 크기 (원본보다 크게 하지 않음)"""
+    width, height = size
+    scale = min(target.width / width, target.height / height, 1.0)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+def iter_boxes(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[bytes, int, int]]:
+    """ISO BMFF 상자 목록 (형식, 내용 시작, 내용 끝) - 크기가 맞지 않는 상자에서 멈춤"""
+    end = len(data) if end is None else end
+    position = start
+    while position + 8 <= end:
+        size, box_type = struct.unpack('>I4s', data[position:position + 8])
+        header_size = 8
+        if size == 1:
+            if position + 16 > end:
+                return
+            size, = struct.unpack('>Q', data[position + 8:position + 16])
+            header_size = 16
+        elif size == 0:
+            size = end - position
+        if size < header_size or position + size > end:
+            return
+        yield box_type, position + header_size, position + size
+        position += size
+
+def read_meta_box(path: Path) -> Optional[bytes]:
+    """파일 최상위 'meta' 상자의 내용만 읽기 (mdat 등 다른 상자는 건너뜀, 없거나 너무 크면 None)"""
+    with open(path, 'rb') as f:
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            size, box_type = struct.unpack('>I4s', header)
+            header_size = 8
+            if size == 1:
+                size, = struct.unpack('>Q', f.read(8))
+                header_size = 16
+            elif size == 0:
+                # 파일 끝까지 이어지는 상자 (meta가 아니면 더 볼 상자가 없음)
+                return f.read(META_BOX_MAX_BYTES) if box_type == b'meta' else None
+            if size < header_size:
+                return None
+            if box_type == b'meta':
+                if size - header_size > META_BOX_MAX_BYTES:
+                    return None
+                return f.read(size - header_size)
+            f.seek(size - header_size, os.SEEK_CUR)
+
+def read_image_geometry(path: Path) -> Tuple[int, int, int]:
+    """디코딩 없이 (가로, 세로, 채널 수) 읽기
+
+    meta/iprp/ipco 상자의 'ispe' 속성(항목별 크기) 중 가장 큰 값을 전체 이미지 크기로 사용하고,
+    'auxC' 속성에 알파 식별자가 있으면 4채널로 봅니다. 찾지 못하면 Image.open으로 헤더를 읽습니다.
+    """
+    meta = read_meta_box(path)
+    width = height = 0
+    channels = 3
+    if meta is not None:
+        # meta는 전체 상자(버전/플래그 4바이트)
+        for box_type, start, end in iter_boxes(meta, 4):
+            if box_type != b'iprp':
+                continue
+            for child_type, child_start, child_end in iter_boxes(meta, start, end):
+                if child_type != b'ipco':
+                    continue
+                for property_type, property_start, property_end in iter_boxes(meta, child_start, child_end):
+                    # ispe: 버전/플래그(4) 가로(4) 세로(4), auxC: 버전/플래그(4) 식별자(NUL 종료)
+                    if property_type == b'ispe' and property_end - property_start >= 12:
+                        item_width, item_height = struct.unpack('>II', meta[property_start + 4:property_start + 12])
+                        if item_width * item_height > width * height:
+                            width, height = item_width, item_height
+                    elif property_type == b'auxC':
+                        urn = meta[property_start + 4:property_end].split(b'\0', 1)[0]
+                        if urn in HEIF_ALPHA_URNS:
+                            channels = 4
+
+    if width and height:
+        return width, height, channels
+
+    with Image.open(path) as image:
+        return image.width, image.height, len(image.getbands())
+
+def list_image_parts(path: Path, settings: ConversionSettings) -> List[ImagePart]:
+    """변환할 컨테이너 안의 이미지 목록 (기본 이미지가 첫 번째)"""
+    if not settings.multi_image:
+        return [PRIMARY_PART]
+
+    parts = []
+    heif_file = pillow_heif.open_heif(path)
+    for index in range(len(heif_file)):
+        heif_image = heif_file[index]
+        primary = heif_image.info.get("primary", index == 0) if len(heif_file) > 1 else True
+        if primary or settings.all_images:
+            parts.append(ImagePart(index, primary))
+        if not settings.auxiliary_images:
+            continue
+
+        # 깊이 맵
+        depth_images = heif_image.info.get("depth_images") or []
+        for depth_index in range(len(depth_images)):
+            kind = "depth" if depth_index == 0 else f"depth{depth_index + 1}"
+            parts.append(ImagePart(index, primary, kind, depth_index))
+
+        # 그 밖의 보조 이미지 (HDR 게인 맵, 인물 매트 등, 알파는 본 이미지에 합쳐져 있으므로 제외)
+        for urn, aux_ids in (heif_image.info.get("aux") or {}).items():
+            if urn.encode() in HEIF_ALPHA_URNS:
+                continue
+            label = "".join(ch for ch in urn.rsplit(":", 1)[-1].lower() if ch.isalnum()) or "aux"
+            for aux_number, aux_id in enumerate(aux_ids):
+                kind = label if aux_number == 0 else f"{label}{aux_number + 1}"
+                parts.append(ImagePart(index, primary, kind, aux_id))
+
+    # 기본 이미지를 맨 앞으로 (결과의 대표 출력 경로로 사용)
+    parts.sort(key=lambda part: (not part.primary, part.kind != "", part.index))
+    return parts
+
+def decode_heif_image(input_path: Path, part: ImagePart = PRIMARY_PART) -> Image.Image:
+    """pillow_heif로 직접 디코딩해 Pillow 이미지로 넘김 (Image.open 오프너를 거치지 않음)
+
+    libheif가 디코딩한 버퍼를 Pillow가 그대로 쓸 수 있는 모드(RGBA, L)는 Image.frombuffer로 복사 없이 공유하고,
+    내부적으로 픽셀당 4바이트로 저장하는 RGB는 한 번만 복사한 뒤 디코딩 버퍼를 바로 놓습니다.
+    오프너는 항상 복사하고, 이미지가 여러 개인 컨테이너는 닫을 때까지 디코딩 버퍼도 함께 유지합니다.
+    """
+    # 오프너와 같은 디코딩 옵션 (HDR은 8비트로, 행 패딩은 제거하지 않고 stride로 전달)
+    heif_file = pillow_heif.open_heif(input_path, convert_hdr_to_8bit=True, remove_stride=False)
+    heif_image = heif_file[part.index if part.index or not part.primary else heif_file.primary_index]
+    image = Image.frombuffer(heif_image.mode, heif_image.size, heif_image.data,
+                             "raw", heif_image.mode, heif_image.stride, 1)
+
+    # 메타데이터는 오프너와 같게 (회전은 디코딩 때 적용되었으므로 EXIF 방향은 1로)
+    image.info = heif_image.info.copy()
+    image.info["original_orientation"] = pillow_heif.set_orientation(image.info)
+    # 깊이 맵 등은 컨테이너 전체를 붙잡고 있으므로 넘기지 않음 (보조 이미지는 open_image_part에서 따로 읽음)
+    image.info.pop("depth_images", None)
+    return image
+
+@contextlib.contextmanager
+def open_image_part(input_path: Path, part: ImagePart) -> Iterator[Image.Image]:
+    """컨테이너 안의 이미지 하나 열기 (pillow_heif로 직접 디코딩, HEIF가 아닌 파일은 Image.open)"""
+    if not part.kind:
+        # 확장자만 .heic인 JPEG 등 (아이폰 '호환성 우선' 내보내기)
+        if not pillow_heif.is_supported(input_path):
+            with Image.open(input_path) as image:
+                yield image
+            return
+        with decode_heif_image(input_path, part) as image:
+            yield image
+        return
+
+    heif_image = pillow_heif.open_heif(input_path)[part.index]
+    if part.kind.startswith("depth"):
+        auxiliary = heif_image.info["depth_images"][part.aux_id]
+    else:
+        auxiliary = heif_image.get_aux_image(part.aux_id)
+    yield auxiliary.to_pillow()
+
+def combine_part_results(file_name: str, results: Sequence[ConversionResult]) -> ConversionResult:
+    """컨테이너 안 이미지별 결과를 파일 하나의 결과로 합침 (첫 번째가 기본 이미지)"""
+    failed = [result for result in results if not result.success]
+    combined = ConversionResult(
+        file_name,
+        not failed,
+        results[0].output_path,
+        error="; ".join(result.error for result in failed if result.error) or None,
+        skipped=all(result.skipped for result in results),
+        content_hash=next((result.content_hash for result in results if result.content_hash), None),
+        input_bytes=sum(result.input_bytes for result in results),
+        encode_iterations=sum(result.encode_iterations for result in results),
+        over_budget=any(result.over_budget for result in results),
+    )
+    # 단계별 시간은 이미지별 시간의 합
+    for result in results:
+        if result.stage_seconds:
+            combined.stage_seconds = combined.stage_seconds or {}
+            for stage, seconds in result.stage_seconds.items():
+                combined.stage_seconds[stage] = combined.stage_seconds.get(stage, 0.0) + seconds
+    return combined
+
+def outputs_complete(source_path: Path, output_dir: Path, file_name: str, settings: ConversionSettings,
+                     output_name: Optional[str] = None) -> bool:
+    """변환할 모든 이미지(여러 장, 보조 이미지 포함)의 결과 파일이 다 있는지 (원본을 읽지 못하면 False)"""
+    try:
+        parts = list_image_parts(source_path, settings)
+    except Exception:
+        return False
+    return all(path.exists() for part in parts
+               for path in get_output_paths(output_dir, file_name, settings, part, output_name))
+
+def link_duplicate_outputs(source_directory: Path, output_dir: Path, file_name: str, duplicate_name: str,
+                           settings: ConversionSettings, output_name: Optional[str] = None,
+                           duplicate_output_name: Optional[str] = None) -> ConversionResult:
+    """file_name의 결과 파일들을 내용이 같은 duplicate_name의 출력 경로에 링크"""
+    try:
+        output_paths = []
+        for part in list_image_parts(source_directory / file_name, settings):
+            source_paths = get_output_paths(output_dir, file_name, settings, part, output_name)
+            target_paths = get_output_paths(output_dir, duplicate_name, settings, part, duplicate_output_name)
+            for source_path, target_path in zip(source_paths, target_paths):
+                # 이름이 같아 출력 경로가 겹치면 이미 같은 내용
+                if target_path != source_path:
+                    target_path.parent.mkdir(parents=True, exist_ok=True)
+                    link_output(source_path, target_path)
+            output_paths.extend(target_paths)
+        return ConversionResult(duplicate_name, True, output_paths[0], duplicate_of=file_name)
+    except Exception as e:
+        logger.error(f"중복 파일 결과 링크 오류 ({duplicate_name}): {e}")
+        return ConversionResult(duplicate_name, False, error=str(e), duplicate_of=file_name)
+
+def estimate_decoded_bytes(path: Path, settings: ConversionSettings) -> int:
+    """파일 하나를 변환하는 동안 필요한 메모리 추정
+
+    디코더 버퍼 + Pillow 이미지 + 크기별 결과, 형식이 여러 개면 동시 인코딩용 복사본도 포함합니다.
+    """
+    width, height, channels = read_image_geometry(path)
+    pixels = width * height
+    estimate = pixels * channels + pixels * PILLOW_BYTES_PER_PIXEL
+    extra_formats = len(settings.output_formats) - 1
+    for target in settings.sizes:
+        target_width, target_height = fit_within((width, height), target)
+        rendition_bytes = target_width * target_height * PILLOW_BYTES_PER_PIXEL
+        if (target_width, target_height) != (width, height):
+            estimate += rendition_bytes
+        estimate += rendition_bytes * extra_formats
+    if not settings.sizes:
+        estimate += pixels * PILLOW_BYTES_PER_PIXEL * extra_formats
+    return estimate
+
+def resize_renditions(image: Image.Image, targets: Sequence[ResizeTarget],
+                      resample: str = DEFAULT_RESAMPLE) -> List[Image.Image]:
+    """한 번 디코딩한 이미지에서 크기별 결과 생성 (targets 순서, 비어 있으면 원본 하나)"""
+    if not targets:
+        return [image]
+    if resample not in RESAMPLE_FILTERS:
+        raise ValueError(f"지원하지 않는 크기 조절 필터입니다: {resample}")
+
+    sizes = [fit_within(image.size, target) for target in targets]
+    renditions: Dict[Tuple[int, int], Image.Image] = {}
+
+    # 큰 크기부터 만들고, 작은 크기는 바로 앞 결과에서 축소 (원본을 매번 다시 축소하지 않음)
+    source = image
+    for size in sorted(set(sizes), key=lambda s: s[0] * s[1], reverse=True):
+        if size != source.size:
+            source = source.resize(size, RESAMPLE_FILTERS[resample], reducing_gap=RESIZE_REDUCING_GAP)
+        renditions[size] = source
+
+    return [renditions[size] for size in sizes]
+
+_encode_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_encode_executor_pid: Optional[int] = None
+_encode_executor_lock = threading.Lock()
+# 이 프로세스의 인코딩 스레드 수 (프로세스 워커는 초기화할 때 나눠 받은 값으로 바꿈)
+_encode_threads = ENCODE_THREADS
+
+def encode_threads_per_process(backend: str, max_workers: int) -> int:
+    """처리 방식별 프로세스당 인코딩 스레드 수
+
+    스레드 방식은 한 프로세스의 풀 하나를 모든 워커가 함께 쓰고,
+    프로세스 방식은 워커마다 풀이 생기므로 ENCODE_THREADS를 워커 수로 나눕니다 (최소 1).
+    """
+    if backend == "process":
+        return max(1, ENCODE_THREADS // max(1, max_workers))
+    return ENCODE_THREADS
+
+def _get_encode_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """인코딩용 스레드 풀 (fork된 프로세스에서는 새로 생성)"""
+    global _encode_executor, _encode_executor_pid
+    with _encode_executor_lock:
+        if _encode_executor is None or _encode_executor_pid != os.getpid():
+            _encode_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=_encode_threads, thread_name_prefix="heic_encode"
+            )
+            _encode_executor_pid = os.getpid()
+        return _encode_executor
+
+def encode_to_target(image: Image.Image, save_kwargs: dict, target_bytes: int,
+                     min_quality: int = TARGET_MIN_QUALITY) -> Tuple[bytes, int, int]:
+    """목표 용량 이하가 되는 가장 높은 품질을 메모리 인코딩 이진 탐색으로 찾기
+
+    save_kwargs의 quality를 상한으로 사용하며 (인코딩 결과, 품질, 인코딩 횟수)를 반환합니다.
+    최저 품질로도 목표를 넘으면 최저 품질 결과를 반환합니다.
+    """
+    def encode(quality: int) -> bytes:
+        buffer = io.BytesIO()
+        image.save(buffer, **{**save_kwargs, 'quality': quality})
+        return buffer.getvalue()
+
+    # 대부분의 파일은 상한 품질에서 바로 목표를 만족하므로 먼저 확인
+    high = save_kwargs['quality']
+    data = encode(high)
+    iterations = 1
+    if len(data) <= target_bytes or high <= min_quality:
+        return data, high, iterations
+
+    best: Optional[Tuple[bytes, int]] = None
+    smallest = (data, high)
+    low, high = min_quality, high - 1
+    while low <= high:
+        quality = (low + high) // 2
+        data = encode(quality)
+        iterations += 1
+        if len(data) <= target_bytes:
+            best = (data, quality)
+            low = quality + 1
+        else:
+            if quality < smallest[1]:
+                smallest = (data, quality)
+            high = quality - 1
+
+    data, quality = best or smallest
+    return data, quality, iterations
+
+@contextlib.contextmanager
+def atomic_output(output_path: Path) -> Iterator[io.BufferedWriter]:
+    """같은 폴더의 임시 파일에 쓰고, 끝까지 쓰면 최종 경로로 원자적으로 교체
+
+    교체 전에 내용을, 교체 후에 폴더 항목을 fsync하므로 쓰는 도중 종료되거나 전원이 꺼져도
+    최종 경로에 잘린 파일이 남지 않습니다 (작업 일지/매니페스트는 이 뒤에 기록됨).
+    """
+    # 프로세스/스레드마다 다른 이름을 써서 동시에 같은 파일을 쓰는 경우에도 충돌하지 않음
+    temp_path = output_path.with_name(
+        f".{output_path.name}.{os.getpid()}-{threading.get_ident()}{TEMP_FILE_SUFFIX}"
+    )
+    try:
+        with open(temp_path, 'wb') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, output_path)
+        fsync_directory(output_path.parent)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+def link_output(source_path: Path, target_path: Path):
+    """결과 파일을 다른 경로에 하드 링크 (다른 볼륨 등으로 안 되면 복사, 임시 파일을 거쳐 원자적으로 교체)"""
+    # 이미 같은 파일에 링크되어 있음 (같은 파일끼리는 os.replace가 아무것도 하지 않아 임시 파일이 남음)
+    with contextlib.suppress(OSError):
+        if os.path.samefile(source_path, target_path):
+            return
+    temp_path = target_path.with_name(
+        f".{target_path.name}.{os.getpid()}-{threading.get_ident()}{TEMP_FILE_SUFFIX}"
+    )
+    try:
+        try:
+            os.link(source_path, temp_path)
+        except OSError:
+            shutil.copy2(source_path, temp_path)
+            with open(temp_path, 'rb+') as f:
+                os.fsync(f.fileno())
+        os.replace(temp_path, target_path)
+        fsync_directory(target_path.parent)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+def remove_stale_temp_files(directory: Path, recursive: bool = False) -> int:
+    """이전 실행이 강제 종료되며 남긴 임시 파일 삭제 후 삭제한 개수 반환 (recursive면 하위 폴더 포함)"""
+    removed = 0
+    pattern = f".*{TEMP_FILE_SUFFIX}"
+    for temp_path in (directory.rglob(pattern) if recursive else directory.glob(pattern)):
+        with contextlib.suppress(OSError):
+            temp_path.unlink()
+            removed += 1
+    return removed
+
+@dataclass
+class RenditionStats:
+    """결과 하나의 저장 통계"""
+    iterations: int = 1  # 인코딩 횟수 (목표 용량 모드에서는 품질 탐색 포함)
+    fits: bool = True  # 목표 용량 충족 여부
+    encode_seconds: float = 0.0
+    write_seconds: float = 0.0
+
+def save_rendition(output_path: Path, image: Image.Image, save_kwargs: dict,
+                   target_bytes: Optional[int] = None) -> RenditionStats:
+    """결과 하나를 메모리에 인코딩한 뒤 파일로 저장
+
+    목표 용량은 품질 옵션이 있는 형식(JPEG, WEBP)에만 적용됩니다.
+    인코딩과 쓰기를 나눠 두어 어느 쪽이 느린지 따로 측정할 수 있습니다.
+    """
+    start_time = time.perf_counter()
+    if target_bytes is None or 'quality' not in save_kwargs:
+        buffer = io.BytesIO()
+        image.save(buffer, **save_kwargs)
+        data = buffer.getbuffer()
+        stats = RenditionStats()
+    else:
+        data, _, iterations = encode_to_target(image, save_kwargs, target_bytes)
+        stats = RenditionStats(iterations, len(data) <= target_bytes)
+    encoded = time.perf_counter()
+
+    with atomic_output(output_path) as f:
+        f.write(data)
+
+    stats.encode_seconds = encoded - start_time
+    stats.write_seconds = time.perf_counter() - encoded
+    return stats
+
+def save_renditions(jobs: Sequence[Tuple[Path, Image.Image, dict]],
+                    target_bytes: Optional[int] = None) -> List[RenditionStats]:
+    """(출력 경로, 이미지, 저장 옵션) 목록을 저장 (여러 개면 병렬 인코딩)
+
+    Pillow 인코더는 GIL을 놓고 동작하므로 서로 다른 이미지는 동시에 인코딩할 수 있습니다.
+    Image.save는 객체에 인코더 설정을 기록하므로 같은 이미지를 여러 형식으로 저장할 때는
+    첫 작업만 원본을 쓰고 나머지는 복사본을 씁니다. 작업별 저장 통계를 jobs 순서로 반환합니다.
+    """
+    if len(jobs) == 1:
+        output_path, image, save_kwargs = jobs[0]
+        return [save_rendition(output_path, image, save_kwargs, target_bytes)]
+
+    seen = set()
+    shared = []
+    for _, image, _ in jobs:
+        shared.append(id(image) in seen)
+        seen.add(id(image))
+
+    def save(job, copy):
+        output_path, image, save_kwargs = job
+        return save_rendition(output_path, image.copy() if copy else image, save_kwargs, target_bytes)
+
+    # 모든 인코딩이 끝날 때까지 기다리고, 실패가 있으면 첫 오류를 그대로 전달
+    return list(_get_encode_executor().map(save, jobs, shared))
+
+def build_save_kwargs(image: Image.Image, settings: ConversionSettings) -> dict:
+    """형식별 저장 옵션 구성"""
+    output_format = settings.output_format
+
+    # 원본 메타데이터 보존
+    exif_data = image.getexif()
+    icc_profile = image.info.get("icc_profile")
+
+    save_kwargs = {'format': output_format.pil_format}
+
+    # 값이 없을 때 None을 넘기면 인코더가 오류를 내므로 있는 경우에만 지정
+    if exif_data:
+        save_kwargs['exif'] = exif_data
+    if icc_profile:
+        save_kwargs['icc_profile'] = icc_profile
+
+    # JPEG, WEBP의 경우 품질 설정
+    if output_format.pil_format in ('JPEG', 'WEBP'):
+        save_kwargs['quality'] = settings.quality
+
+    # 프리셋에 따른 압축 속도/용량 설정
+    save_kwargs.update(ENCODER_PRESETS[settings.preset][output_format.name])
+
+    return save_kwargs
+
+def convert_single_file(source_directory: Path, file_name: str, output_dir: Path,
+                        settings: ConversionSettings, part: ImagePart = PRIMARY_PART,
+                        output_name: Optional[str] = None) -> ConversionResult:
+    """단일 파일(또는 컨테이너 안 이미지 하나) 변환 (출력 디렉토리는 미리 생성되어 있어야 함)
+
+    output_name은 plan_output_names로 미리 정한 출력 이름입니다. 출력 경로에 하위 폴더가 있으면 여기서 만듭니다.
+    """
+    try:
+        input_path = source_directory / file_name
+
+        # 출력 파일명 생성
+        output_paths = get_output_paths(output_dir, file_name, settings, part, output_name)
+        if "/" in (output_name or file_name):
+            for output_directory in {path.parent for path in output_paths}:
+                output_directory.mkdir(parents=True, exist_ok=True)
+
+        # 한 번 디코딩한 이미지를 형식별, 크기별로 저장 (메타데이터는 원본 기준)
+        start_time = time.perf_counter()
+        with open_image_part(input_path, part) as image:
+            image.load()
+            decoded = time.perf_counter()
+            format_save_kwargs = [build_save_kwargs(image, replace(settings, output_format=output_format))
+                                  for output_format in settings.output_formats]
+            extracted = time.perf_counter()
+            renditions = resize_renditions(image, settings.sizes, settings.resample)
+            resized = time.perf_counter()
+
+            output_path_iter = iter(output_paths)
+            jobs = [(next(output_path_iter), rendition, save_kwargs)
+                    for save_kwargs in format_save_kwargs for rendition in renditions]
+            rendition_stats = save_renditions(jobs, settings.target_bytes)
+
+        # 처리량 계산용 원본 크기는 기본 이미지에만 기록 (컨테이너를 나눠 처리해도 한 번만 집계)
+        input_bytes = os.path.getsize(input_path) if part.primary and not part.kind else 0
+        result = ConversionResult(file_name, True, output_paths[0], input_bytes=input_bytes)
+        # 인코딩/쓰기는 결과(형식×크기)별 시간의 합
+        result.stage_seconds = {
+            "decode": decoded - start_time,
+            "metadata": extracted - decoded,
+            "resize": resized - extracted,
+            "encode": sum(stats.encode_seconds for stats in rendition_stats),
+            "write": sum(stats.write_seconds for stats in rendition_stats),
+        }
+        if settings.target_bytes is not None:
+            result.encode_iterations = sum(stats.iterations for stats in rendition_stats)
+            result.over_budget = not all(stats.fits for stats in rendition_stats)
+            if result.over_budget:
+                logger.warning(f"최저 품질로도 목표 용량을 넘었습니다 ({file_name})")
+        return result
+
+    except Exception as e:
+        logger.error(f"파일 변환 오류 ({file_name}): {e}")
+        return ConversionResult(file_name, False, error=str(e))
+
+def convert_if_changed(source_directory: Path, file_name: str, output_dir: Path,
+                       settings: ConversionSettings, known_hash: Optional[str],
+                       part: ImagePart = PRIMARY_PART, output_name: Optional[str] = None) -> ConversionResult:
+    """내용 해시가 기록과 다를 때만 변환 (증분 모드용, 해시 결과를 함께 반환)"""
+    start_time = time.perf_counter()
+    try:
+        content_hash = file_content_hash(source_directory / file_name)
+    except OSError as e:
+        logger.error(f"파일 해시 계산 오류 ({file_name}): {e}")
+        return ConversionResult(file_name, False, error=str(e))
+    hash_seconds = time.perf_counter() - start_time
+
+    # 수정 시각만 바뀌고 내용은 같은 경우 (복사, touch 등)
+    output_paths = get_output_paths(output_dir, file_name, settings, part, output_name)
+    if content_hash == known_hash and all(path.exists() for path in output_paths):
+        return ConversionResult(file_name, True, output_paths[0], skipped=True, content_hash=content_hash,
+                                stage_seconds={"hash": hash_seconds})
+
+    result = convert_single_file(source_directory, file_name, output_dir, settings, part, output_name)
+    result.content_hash = content_hash
+    if result.stage_seconds is not None:
+        result.stage_seconds["hash"] = hash_seconds
+    return result
+
+def benchmark_presets(source_directory: Path, file_names: Sequence[str], settings: ConversionSettings,
+                      sample_size: int = 10) -> List[PresetBenchmark]:
+    """표본 파일을 한 번씩 디코딩한 뒤 프리셋별로 메모리에 인코딩해 시간과 용량 측정"""
+    step = max(1, len(file_names) // max(1, sample_size))
+    sample = list(file_names[::step])[:sample_size]
+    results = {preset: PresetBenchmark(preset, 0, 0.0, 0) for preset in ENCODER_PRESETS}
+
+    for file_name in sample:
+        try:
+            with Image.open(source_directory / file_name) as image:
+                image.load()
+                # 크기 조절 설정이 있으면 실제 변환과 같은 크기로 인코딩
+                renditions = resize_renditions(image, settings.sizes, settings.resample)
+                for preset, result in results.items():
+                    save_kwargs = build_save_kwargs(image, replace(settings, preset=preset))
+                    for rendition in renditions:
+                        buffer = io.BytesIO()
+                        start_time = time.perf_counter()
+                        rendition.save(buffer, **save_kwargs)
+                        result.encode_seconds += time.perf_counter() - start_time
+                        result.output_bytes += buffer.tell()
+                    result.files += 1
+        except Exception as e:
+            logger.error(f"프리셋 측정 오류 ({file_name}): {e}")
+
+    return list(results.values())
+
+def _init_process_worker(encode_threads: int = ENCODE_THREADS):
+    """프로세스 풀 워커 초기화 (워커당 한 번 HEIF 오프너 등록, 인코딩 스레드 수 설정)"""
+    global _encode_threads
+    # Ctrl+C는 부모 프로세스가 받아 cancel()로 정리
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    register_heif_opener()
+    _encode_threads = encode_threads
+
+def create_executor(backend: str, max_workers: int) -> concurrent.futures.Executor:
+    """병렬 처리 방식에 맞는 Executor 생성
+
+    프로세스 방식은 spawn으로 워커를 시작합니다 (fork하면 다른 스레드가 잡고 있던 잠금이 복사되어 멈출 수 있음).
+    """
+    if backend == "process":
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_process_worker,
+            initargs=(encode_threads_per_process(backend, max_workers),)
+        )
+    if backend == "thread":
+        return concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    raise ValueError(f"지원하지 않는 처리 방식입니다: {backend}")
+
+class ConversionEngine:
+    """HEIC 배치 변환 엔진
+
+    동시에 제출하는 작업 수를 max_in_flight로 제한하므로 파일 수와 관계없이 메모리 사용량이 일정합니다.
+    다른 스레드에서 pause()/resume()/cancel()로 실행을 제어할 수 있습니다 (한 번의 run에 사용).
+    resume이 켜져 있으면 완료한 파일을 작업 일지에 기록해, 중단된 실행을 다시 시작할 때 끝낸 파일은 건너뜁니다.
+    profile이 켜져 있으면 단계별 소요 시간 통계를 요약(stage_profile)에 담아 반환합니다.
+    memory_budget(바이트)을 지정하면 헤더로 추정한 디코딩 메모리의 합이 예산 안에 들 때만 새 파일을 제출합니다.
+    settings.multi_image가 켜져 있으면 컨테이너 안 이미지마다 작업을 따로 제출하고, 모두 끝나면 파일 하나의 결과로 합칩니다.
+    dedupe가 켜져 있으면 시작 전에 내용이 같은 파일을 찾아 한 번만 변환하고, 나머지는 결과를 하드 링크(안 되면 복사)합니다.
+    settings.name_template이 있으면 시작 전에 모든 파일의 출력 이름을 정하고 겹치는 이름에 번호를 붙입니다.
+    dedupe나 name_template을 쓰면 파일 목록을 모두 받은 뒤에 변환을 시작합니다.
+    executor를 넘기면 새 풀을 만들지 않고 그 풀에 작업을 제출합니다 (풀은 닫지 않음, 감시 모드처럼 여러 번 실행할 때 사용).
+    reserved_names(원본 → 출력 이름)를 넘기면 이전 실행에서 정한 이름과 겹치지 않게 계획하고, 새로 정한 이름을 여기에 추가합니다.
+    """
+
+    def __init__(self, source_directory: Path, settings: ConversionSettings,
+                 max_workers: Optional[int] = None, backend: str = DEFAULT_BACKEND,
+                 output_directory: Optional[Path] = None, incremental: bool = False,
+                 max_in_flight: Optional[int] = None, resume: bool = True, profile: bool = False,
+                 memory_budget: Optional[int] = None, dedupe: bool = False,
+                 executor: Optional[concurrent.futures.Executor] = None,
+                 reserved_names: Optional[Dict[str, str]] = None):
+        if backend not in BACKENDS:
+            raise ValueError(f"지원하지 않는 처리 방식입니다: {backend}")
+        if settings.preset not in ENCODER_PRESETS:
+            raise ValueError(f"지원하지 않는 프리셋입니다: {settings.preset}")
+        if settings.resample not in RESAMPLE_FILTERS:
+            raise ValueError(f"지원하지 않는 크기 조절 필터입니다: {settings.resample}")
+        if settings.target_bytes is not None and settings.target_bytes <= 0:
+            raise ValueError(f"목표 용량은 0보다 커야 합니다: {settings.target_bytes}")
+        if memory_budget is not None and memory_budget <= 0:
+            raise ValueError(f"메모리 예산은 0보다 커야 합니다: {memory_budget}")
+        if max_workers is not None and max_workers < 1:
+            raise ValueError(f"동시 작업 수는 1 이상이어야 합니다: {max_workers}")
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError(f"동시에 제출하는 작업 수는 1 이상이어야 합니다: {max_in_flight}")
+        if settings.name_template is not None:
+            parse_name_template(settings.name_template)
+        format_names = [output_format.name for output_format in settings.output_formats]
+        if len(set(format_names)) != len(format_names):
+            raise ValueError(f"출력 형식이 중복되었습니다: {', '.join(format_names)}")
+        self.source_directory = Path(source_directory)
+        self.settings = settings
+        self.max_workers = max_workers if max_workers is not None else DEFAULT_MAX_WORKERS
+        self.backend = backend
+        # 형식이 여러 개면 출력 폴더 아래에 형식별 폴더를 만듦 (기본값: 원본 폴더 아래 <확장자>)
+        if output_directory:
+            self.output_directory = Path(output_directory)
+        elif settings.extra_formats:
+            self.output_directory = self.source_directory
+        else:
+            self.output_directory = get_output_directory(self.source_directory, settings.output_format)
+        self.format_directories = [get_format_directory(self.output_directory, settings, output_format)
+                                   for output_format in settings.output_formats]
+        self.incremental = incremental
+        self.resume = resume
+        self.profile = profile
+        self.memory_budget = memory_budget
+        self.dedupe = dedupe
+        self.executor = executor
+        self.reserved_names = reserved_names
+        self.max_in_flight = max_in_flight if max_in_flight is not None else self.max_workers * IN_FLIGHT_PER_WORKER
+
+        # 실행 제어 (resume 이벤트가 꺼져 있으면 일시정지 상태)
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+        self._cancel_event = threading.Event()
+
+    def pause(self):
+        """새 작업 제출을 멈춤 (진행 중인 작업은 끝까지 처리)"""
+        self._resume_event.clear()
+
+    def resume(self):
+        """일시정지 해제"""
+        self._resume_event.set()
+
+    def cancel(self):
+        """남은 작업을 취소하고 진행 중인 작업만 마친 뒤 종료"""
+        self._cancel_event.set()
+        self._resume_event.set()
+
+    @property
+    def memory_budget_bytes(self) -> float:
+        """메모리 예산 (지정하지 않으면 무제한)"""
+        return self.memory_budget if self.memory_budget is not None else math.inf
+
+    def estimate_memory(self, file_name: str) -> int:
+        """예산 계산용 파일별 추정 메모리 (예산이 없으면 헤더를 읽지 않음, 미리 읽기 스레드에서 호출)"""
+        if self.memory_budget is None:
+            return 0
+        path = self.source_directory / file_name
+        try:
+            estimate = estimate_decoded_bytes(path, self.settings)
+        except Exception as e:
+            # 헤더를 못 읽는 파일은 변환 단계에서 오류로 보고됨
+            logger.debug(f"메모리 추정 실패 ({file_name}): {e}")
+            return 0
+        if estimate > self.memory_budget:
+            logger.warning(f"메모리 예산보다 큰 파일입니다 ({file_name}, 약 {estimate / (1024 * 1024):.0f} MB): "
+                           f"다른 작업이 끝난 뒤 단독으로 변환합니다")
+        return estimate
+
+    def split_parts(self, file_name: str, task: Tuple[Callable, tuple, dict]) -> List[Tuple[Callable, tuple, dict]]:
+        """파일 하나의 작업을 컨테이너 안 이미지별 작업으로 나눔 (첫 번째가 기본 이미지)"""
+        if not self.settings.multi_image:
+            return [task]
+        try:
+            parts = list_image_parts(self.source_directory / file_name, self.settings)
+        except Exception as e:
+            # 컨테이너를 못 읽는 파일은 기본 이미지 변환 단계에서 오류로 보고됨
+            logger.debug(f"이미지 목록 읽기 실패 ({file_name}): {e}")
+            return [task]
+        function, args, kwargs = task
+        return [(function, args, {**kwargs, "part": part}) for part in parts]
+
+    @property
+    def is_paused(self) -> bool:
+        """일시정지 상태 여부"""
+        return not self._resume_event.is_set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        """취소 요청 여부"""
+        return self._cancel_event.is_set()
+
+    def run(self, file_names: Iterable[str],
+            progress_callback: Optional[ProgressCallback] = None,
+            total: Optional[int] = None) -> ConversionSummary:
+        """파일 목록을 병렬로 변환하고 결과 요약 반환
+
+        file_names는 스캐너 제너레이터여도 되며, 이 경우 스캔이 끝나기 전에 변환이 시작됩니다.
+        """
+        start_time = time.perf_counter()
+
+        # 중복 검사: 내용이 같은 파일은 대표 파일만 변환 목록에 남김
+        dedupe_scan: Optional[DuplicateScan] = None
+        if self.dedupe:
+            file_names = list(file_names)
+            dedupe_scan = find_duplicates(self.source_directory, file_names, self.max_workers)
+            if dedupe_scan.duplicates:
+                logger.info(
+                    f"내용이 같은 파일 {dedupe_scan.duplicate_count:,}개 "
+                    f"({dedupe_scan.duplicate_bytes / (1024 * 1024):.1f} MB)는 변환하지 않고 결과를 링크합니다"
+                )
+
+        # 출력 이름 템플릿: 변환 전에 배치 전체의 출력 이름과 충돌을 한 번에 계획
+        output_names: Dict[str, str] = {}
+        if self.settings.name_template is not None:
+            file_names = list(file_names)
+            plan = plan_output_names(self.source_directory, file_names, self.settings.name_template,
+                                     self.max_workers, self.reserved_names)
+            output_names = plan.names
+            if self.reserved_names is not None:
+                self.reserved_names.update(output_names)
+            if plan.collisions:
+                logger.info(f"출력 이름이 겹치는 파일 {plan.collisions:,}개에 번호(_1, _2…)를 붙여 저장합니다")
+
+        total_files = total if total is not None else \
+            (len(file_names) if hasattr(file_names, '__len__') else None)
+        if dedupe_scan is not None:
+            file_names = dedupe_scan.unique
+        successful_conversions = 0
+        failed_conversions = 0
+        skipped_conversions = 0
+        encode_stats = {"iterations": 0, "max_iterations": 0, "over_budget": 0}
+        duplicate_stats = {"count": 0}
+        completed = False
+        stage_profile = StageProfile() if self.profile else None
+
+        # 출력 디렉토리 생성 (강제 종료된 이전 실행의 임시 파일 정리)
+        for format_directory in self.format_directories:
+            format_directory.mkdir(parents=True, exist_ok=True)
+            removed = remove_stale_temp_files(format_directory, recursive=True)
+            if removed:
+                logger.info(f"이전 실행이 남긴 임시 파일 {removed:,}개를 삭제했습니다 ({format_directory})")
+
+        # 증분 모드: 이전 변환 기록 로드 (기본 형식 폴더에 저장)
+        manifest = ConversionManifest(self.format_directories[0]) if self.incremental else None
+        records = manifest.load() if manifest else {}
+        settings_key = self.settings.cache_key()
+        pending_records: List[ManifestRecord] = []
+        file_stats: Dict[str, os.stat_result] = {}
+
+        # 작업 일지: 중단된 이전 실행이 있으면 완료한 파일 목록을 이어받음
+        journal = ConversionJournal(self.format_directories[0], settings_key) if self.resume else None
+        if journal is not None and journal.entries:
+            logger.info(f"중단된 이전 실행을 이어서 진행합니다 (완료 {len(journal.entries):,}개)")
+
+        def prepare(file_name: str):
+            """제출할 작업 (함수, 인자, 키워드 인자) 또는 건너뛸 경우 바로 결과 반환"""
+            output_name = output_names.get(file_name)
+            options = {"output_name": output_name} if output_name else {}
+            if manifest is None and journal is None:
+                return convert_single_file, (self.source_directory, file_name,
+                                             self.output_directory, self.settings), options
+
+            # 변환 전 원본 크기/수정 시각 (변환 기록에 사용)
+            try:
+                file_stat = os.stat(self.source_directory / file_name)
+                file_stats[file_name] = file_stat
+            except OSError:
+                file_stat = None
+
+            # 이전 실행에서 이미 끝낸 파일 (원본이 그대로이고 결과 파일이 있으면 건너뜀)
+            entry = journal.entries.get(file_name) if journal is not None else None
+            if entry is not None and file_stat is not None:
+                output_paths = get_output_paths(self.output_directory, file_name, self.settings,
+                                                output_name=output_name)
+                if (entry.size == file_stat.st_size and entry.mtime_ns == file_stat.st_mtime_ns
+                        and outputs_complete(self.source_directory / file_name, self.output_directory,
+                                             file_name, self.settings, output_name)):
+                    return ConversionResult(file_name, True, output_paths[0], skipped=True,
+                                            content_hash=entry.content_hash)
+
+            if manifest is None:
+                return convert_single_file, (self.source_directory, file_name,
+                                             self.output_directory, self.settings), options
+
+            record = records.get(file_name)
+            known_hash = None
+            if record is not None and record.settings_key == settings_key and file_stat is not None:
+                output_paths = get_output_paths(self.output_directory, file_name, self.settings,
+                                                output_name=output_name)
+                # 크기와 수정 시각이 같으면 해시 계산 없이 건너뜀
+                if (record.size == file_stat.st_size and record.mtime_ns == file_stat.st_mtime_ns
+                        and outputs_complete(self.source_directory / file_name, self.output_directory,
+                                             file_name, self.settings, output_name)):
+                    file_stats.pop(file_name, None)
+                    return ConversionResult(file_name, True, output_paths[0], skipped=True)
+                known_hash = record.content_hash
+
+            return convert_if_changed, (self.source_directory, file_name,
+                                        self.output_directory, self.settings, known_hash), options
+
+        def handle(result: ConversionResult):
+            """결과 집계, 변환 기록 저장, 진행률 보고"""
+            nonlocal successful_conversions, failed_conversions, skipped_conversions
+
+            if stage_profile is not None and result.stage_seconds:
+                stage_profile.add(result.stage_seconds)
+
+            file_stat = file_stats.pop(result.file_name, None)
+            if result.success and file_stat is not None:
+                # 작업 일지는 파일마다 바로 기록 (중단되어도 이어서 할 수 있도록)
+                if journal is not None and not result.skipped:
+                    journal.append(JournalEntry(
+                        result.file_name, file_stat.st_size, file_stat.st_mtime_ns, result.content_hash
+                    ))
+
+                # 변환 기록은 모아서 한 번에 저장
+                if manifest is not None and result.content_hash:
+                    pending_records.append(ManifestRecord(
+                        result.file_name, file_stat.st_size, file_stat.st_mtime_ns,
+                        result.content_hash, settings_key
+                    ))
+                    if len(pending_records) >= MANIFEST_COMMIT_INTERVAL:
+                        manifest.update(pending_records)
+                        pending_records.clear()
+
+            if result.skipped:
+                skipped_conversions += 1
+            elif result.success:
+                successful_conversions += 1
+                encode_stats["iterations"] += result.encode_iterations
+                encode_stats["max_iterations"] = max(encode_stats["max_iterations"], result.encode_iterations)
+                encode_stats["over_budget"] += result.over_budget
+            else:
+                failed_conversions += 1
+
+            if result.duplicate_of is not None:
+                duplicate_stats["count"] += result.success and not result.skipped
+
+            if progress_callback:
+                completed = successful_conversions + failed_conversions + skipped_conversions
+                progress_callback(completed, total_files, result)
+
+            # 대표 파일이 끝나면 내용이 같은 파일들에 결과를 링크
+            copies = dedupe_scan.duplicates.get(result.file_name, ()) if dedupe_scan is not None else ()
+            for duplicate_name in copies:
+                if not result.success:
+                    handle(ConversionResult(duplicate_name, False, error=f"내용이 같은 {result.file_name} 변환 실패",
+                                            duplicate_of=result.file_name))
+                    continue
+                # 대표 파일을 건너뛰었고 링크해 둔 결과도 있으면 함께 건너뜀
+                output_paths = get_output_paths(self.output_directory, duplicate_name, self.settings,
+                                                output_name=output_names.get(duplicate_name))
+                if result.skipped and outputs_complete(self.source_directory / duplicate_name,
+                                                       self.output_directory, duplicate_name, self.settings,
+                                                       output_names.get(duplicate_name)):
+                    handle(ConversionResult(duplicate_name, True, output_paths[0], skipped=True,
+                                            duplicate_of=result.file_name))
+                    continue
+                if manifest is not None or journal is not None:
+                    with contextlib.suppress(OSError):
+                        file_stats[duplicate_name] = os.stat(self.source_directory / duplicate_name)
+                duplicate_result = link_duplicate_outputs(self.source_directory, self.output_directory,
+                                                          result.file_name, duplicate_name, self.settings,
+                                                          output_names.get(result.file_name),
+                                                          output_names.get(duplicate_name))
+                duplicate_result.content_hash = dedupe_scan.content_hashes.get(duplicate_name)
+                handle(duplicate_result)
+
+        try:
+            pool = contextlib.nullcontext(self.executor) if self.executor is not None \
+                else create_executor(self.backend, self.max_workers)
+            # 메모리 예산이 있으면 다음 파일들의 헤더를 별도 스레드에서 미리 읽어 추정
+            # (프로세스 방식은 작업을 제출할 때 워커를 fork하므로, 헤더를 읽는 스레드가 잡고 있던
+            #  import 잠금이 자식에 복사되어 멈출 수 있음: 스케줄러 스레드에서 바로 읽음)
+            lookahead = ESTIMATE_LOOKAHEAD if self.memory_budget is not None and self.backend != "process" else 0
+            estimate_pool = concurrent.futures.ThreadPoolExecutor(ESTIMATE_THREADS) if lookahead \
+                else contextlib.nullcontext()
+            with pool as executor, estimate_pool:
+                file_iterator = iter(file_names)
+                source_exhausted = False
+                # 준비를 마친 다음 파일들: (파일 이름, 이미지별 작업, 추정 메모리 Future)
+                upcoming: Deque[Tuple[str, List[Tuple[Callable, tuple, dict]],
+                                      Optional[concurrent.futures.Future]]] = collections.deque()
+                # 진행 중인 작업: Future → (파일 이름, 추정 메모리, 컨테이너 안 이미지 순서)
+                in_flight: Dict[concurrent.futures.Future, Tuple[str, int, int]] = {}
+                in_flight_bytes = 0
+                # 이미지 작업이 진행 중인 파일: 파일 이름 → 작업 수 (추정 메모리는 파일당 한 번만 셈)
+                charged_files: Dict[str, int] = {}
+                # 아직 제출하지 않은 (파일 이름, 작업, 추정 메모리, 이미지 순서) (메모리 예산 때문에 미룬 작업 포함)
+                waiting: List[Tuple[str, Tuple[Callable, tuple, dict], int, int]] = []
+                # 이미지 여러 개로 나눈 파일: 파일 이름 → 이미지별 결과 (모두 채워지면 합쳐서 처리)
+                part_results: Dict[str, List[Optional[ConversionResult]]] = {}
+                exhausted = False
+
+                while True:
+                    # 취소되면 더 이상 제출하지 않고, 아직 시작 안 한 작업은 취소
+                    if self.is_cancelled and not exhausted:
+                        exhausted = True
+                        waiting.clear()
+                        for _, _, cost_future in upcoming:
+                            if cost_future is not None:
+                                cost_future.cancel()
+                        upcoming.clear()
+                        for future in in_flight:
+                            future.cancel()
+
+                    # 진행 중인 작업이 max_in_flight개가 될 때까지 다음 파일 제출
+                    while not exhausted and not self.is_paused and len(in_flight) < self.max_in_flight:
+                        if not waiting:
+                            while not source_exhausted and len(upcoming) <= lookahead:
+                                file_name = next(file_iterator, None)
+                                if file_name is None:
+                                    source_exhausted = True
+                                    break
+                                task = prepare(file_name)
+                                if isinstance(task, ConversionResult):
+                                    handle(task)
+                                    continue
+                                cost_future = estimate_pool.submit(self.estimate_memory, file_name) \
+                                    if lookahead else None
+                                upcoming.append((file_name, self.split_parts(file_name, task), cost_future))
+                            if not upcoming:
+                                exhausted = True
+                                break
+                            file_name, tasks, cost_future = upcoming.popleft()
+                            if len(tasks) > 1:
+                                part_results[file_name] = [None] * len(tasks)
+                            cost = cost_future.result() if cost_future is not None \
+                                else self.estimate_memory(file_name)
+                            waiting = [(file_name, part_task, cost, position)
+                                       for position, part_task in enumerate(tasks)]
+
+                        # 메모리 예산을 넘으면 진행 중인 작업이 끝날 때까지 대기 (작업이 없으면 하나는 제출)
+                        file_name, (function, args, kwargs), cost, position = waiting[0]
+                        charge = 0 if file_name in charged_files else cost
+                        if in_flight and in_flight_bytes + charge > self.memory_budget_bytes:
+                            break
+                        waiting.pop(0)
+                        in_flight[executor.submit(function, *args, **kwargs)] = (file_name, cost, position)
+                        charged_files[file_name] = charged_files.get(file_name, 0) + 1
+                        in_flight_bytes += charge
+
+                    if not in_flight:
+                        if exhausted:
+                            break
+                        # 일시정지 중이고 진행 중인 작업도 없음: 재개/취소까지 대기
+                        self._resume_event.wait()
+                        continue
+
+                    # 완료된 작업들 처리
+                    done, _ = concurrent.futures.wait(
+                        in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    for future in done:
+                        file_name, cost, position = in_flight.pop(future)
+                        charged_files[file_name] -= 1
+                        if not charged_files[file_name]:
+                            # 파일의 마지막 진행 중 작업이 끝나면 추정 메모리 반환
+                            del charged_files[file_name]
+                            in_flight_bytes -= cost
+                        if future.cancelled():
+                            # 일부 이미지만 끝난 파일은 결과가 채워지지 않으므로 기록되지 않음 (다음 실행에서 다시 변환)
+                            continue
+
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            logger.error(f"변환 작업 오류 ({file_name}): {e}")
+                            result = ConversionResult(file_name, False, error=str(e))
+
+                        # 컨테이너 안 이미지가 모두 끝나야 파일 하나의 결과로 처리
+                        results = part_results.get(file_name)
+                        if results is not None:
+                            results[position] = result
+                            if any(part is None for part in results):
+                                continue
+                            del part_results[file_name]
+                            result = combine_part_results(file_name, results)
+
+                        handle(result)
+
+            completed = not self.is_cancelled
+
+        finally:
+            if manifest is not None:
+                manifest.update(pending_records)
+                manifest.close()
+            # 끝까지 완료했으면 일지 삭제, 중단되었으면 다음 실행을 위해 남김
+            if journal is not None:
+                if completed:
+                    journal.finish()
+                else:
+                    journal.close()
+
+        return ConversionSummary(
+            successful_conversions,
+            failed_conversions,
+            self.output_directory,
+            time.perf_counter() - start_time,
+            skipped_conversions,
+            self.is_cancelled,
+            encode_stats["iterations"],
+            encode_stats["max_iterations"],
+            encode_stats["over_budget"],
+            stage_profile,
+            duplicate_stats["count"],
+            dedupe_scan.duplicate_bytes if dedupe_scan is not None else 0
+        )
@@ -0,0 +1,155 @@
+"""파일 목록용 열 단위 색인
+
+Tkinter에 의존하지 않는 파일 목록 로직입니다.
+수십만 개의 파일도 가볍게 다룰 수 있도록 열마다 array에 값을 모아 두고,
+화면에는 필터와 정렬을 적용한 행 번호 목록(view) 중 보이는 부분만 그립니다.
+"""
+import time
+from array import array
+from typing import Callable, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 정렬할 수 있는 열
+SORT_COLUMNS = ("name", "size", "date", "pixels")
+
+def format_file_size(size: int) -> str:
+    """목록 표시용 파일 크기"""
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MB"
+    return f"{size / 1024:.0f} KB"
+
+class FileIndex:
+    """스캔한 파일의 열 단위 색인 (행 번호는 스캔 순서, 한 스레드에서만 사용)
+
+    names는 스캔 순서 그대로 유지되므로 변환 대상 목록으로도 사용합니다.
+    메타데이터 색인 전에는 가로/세로가 0이고 날짜는 수정 시각이며, 색인 후에는 촬영 일시(있으면)로 바뀝니다.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.folded_names: List[str] = []  # 필터/정렬용 소문자 이름
+        self.sizes = array('q')
+        self.mtimes = array('d')
+        self.dates = array('d')  # 촬영 일시, 없으면 수정 시각
+        self.cameras: List[str] = []  # 필터용 소문자 카메라 이름
+        self.widths = array('l')
+        self.heights = array('l')
+        self.total_size = 0
+
+        # 화면 표시 순서 (필터와 정렬을 적용한 행 번호)와 행별 표시 위치 (숨겨진 행은 -1)
+        self.view = array('l')
+        self.positions = array('l')
+        self.filter_text = ""
+        self.sort_column: Optional[str] = None
+        self.sort_reverse = False
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def append(self, entries: Iterable[Tuple[str, int, float]]):
+        """(파일 이름, 크기, 수정 시각) 행 추가
+
+        필터와 일치하는 행은 표시 목록 끝에 붙습니다 (정렬 중이면 스캔이 끝난 뒤 refresh()로 다시 정렬).
+        """
+        for file_name, size, mtime in entries:
+            row = len(self.names)
+            folded = file_name.casefold()
+            self.names.append(file_name)
+            self.folded_names.append(folded)
+            self.sizes.append(size)
+            self.mtimes.append(mtime)
+            self.dates.append(mtime)
+            self.cameras.append("")
+            self.widths.append(0)
+            self.heights.append(0)
+            self.total_size += size
+            if self.filter_text in folded:
+                self.positions.append(len(self.view))
+                self.view.append(row)
+            else:
+                self.positions.append(-1)
+
+    def set_metadata(self, row: int, width: int, height: int, captured: Optional[float], camera: str):
+        """메타데이터 색인 결과 기록"""
+        self.widths[row] = width
+        self.heights[row] = height
+        if captured is not None:
+            self.dates[row] = captured
+        self.cameras[row] = camera.casefold()
+
+    def set_filter(self, text: str):
+        """파일 이름이나 카메라 이름에 text가 포함된 행만 표시 (대소문자 무시)"""
+        text = text.strip().casefold()
+        if text == self.filter_text:
+            return
+        folded_names, cameras = self.folded_names, self.cameras
+        # 입력을 이어서 치는 경우 현재 결과 안에서만 다시 거름 (순서도 그대로 유지)
+        if self.filter_text in text:
+            self.view = array('l', [row for row in self.view
+                                    if text in folded_names[row] or text in cameras[row]])
+            self.filter_text = text
+            self._rebuild_positions()
+            return
+        self.filter_text = text
+        self.refresh()
+
+    def sort_by(self, column: Optional[str], reverse: bool = False):
+        """column 기준으로 정렬 (None이면 스캔 순서)"""
+        if column is not None and column not in SORT_COLUMNS:
+            raise ValueError(f"지원하지 않는 정렬 기준입니다: {column}")
+        self.sort_column = column
+        self.sort_reverse = reverse
+        self.refresh()
+
+    def _sort_key(self) -> Optional[Callable[[int], object]]:
+        """현재 정렬 기준의 행별 값"""
+        if self.sort_column == "name":
+            return self.folded_names.__getitem__
+        if self.sort_column == "size":
+            return self.sizes.__getitem__
+        if self.sort_column == "date":
+            return self.dates.__getitem__
+        if self.sort_column == "pixels":
+            widths, heights = self.widths, self.heights
+            return lambda row: widths[row] * heights[row]
+        return None
+
+    def refresh(self):
+        """필터와 정렬을 처음부터 다시 적용"""
+        text = self.filter_text
+        if text:
+            cameras = self.cameras
+            rows = [row for row, folded in enumerate(self.folded_names) if text in folded or text in cameras[row]]
+        else:
+            rows = range(len(self.names))
+        key = self._sort_key()
+        if key is not None:
+            rows = sorted(rows, key=key, reverse=self.sort_reverse)
+        elif self.sort_reverse:
+            rows = reversed(rows)
+        self.view = array('l', rows)
+        self._rebuild_positions()
+
+    def _rebuild_positions(self):
+        """표시 목록이 바뀐 뒤 행별 표시 위치를 다시 계산"""
+        positions = array('l', [-1]) * len(self.names)
+        for position, row in enumerate(self.view):
+            positions[row] = position
+        self.positions = positions
+
+    def position_of(self, row: int) -> Optional[int]:
+        """표시 목록에서 행의 위치 (필터로 숨겨졌으면 None)"""
+        position = self.positions[row] if 0 <= row < len(self.positions) else -1
+        return position if position >= 0 else None
+
+    def format_row(self, row: int) -> Tuple[str, str, str, str]:
+        """목록 표시용 값 (이름, 크기, 날짜, 해상도)"""
+        width, height = self.widths[row], self.heights[row]
+        return (
+            self.names[row],
+            format_file_size(self.sizes[row]),
+            time.strftime("%Y-%m-%d %H:%M", time.localtime(self.dates[row])),
+            f"{width}×{height}" if width else "",
+        )
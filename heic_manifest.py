@@ -0,0 +1,196 @@
+"""증분 변환용 매니페스트와 작업 일지
+
+출력 폴더의 SQLite 파일에 원본 파일별 크기, 수정 시각, 내용 해시, 변환 설정을 기록합니다.
+다음 실행 때 기록과 같은 파일은 다시 변환하지 않습니다.
+
+작업 일지는 실행 중 완료한 파일을 한 줄씩 바로 기록해, 중단된 실행을 멈춘 지점부터 이어서 할 수 있게 합니다.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from dataclasses import dataclass, asdict
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 출력 폴더 안의 매니페스트 파일 이름
+MANIFEST_FILE_NAME = ".heic_manifest.sqlite"
+
+# 출력 폴더 안의 작업 일지 파일 이름
+JOURNAL_FILE_NAME = ".heic_journal.jsonl"
+
+# 해시 계산 시 한 번에 읽는 크기
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# 작업 일지를 디스크에 강제로 기록(fsync)하는 최소 간격 (초, 닫을 때는 항상 기록)
+JOURNAL_FSYNC_INTERVAL = 1.0
+
+@dataclass
+class ManifestRecord:
+    """변환 완료 기록 (file_name은 원본 폴더 기준 상대 경로)"""
+    file_name: str
+    size: int
+    mtime_ns: int
+    content_hash: str
+    settings_key: str
+
+def file_content_hash(path: Path) -> str:
+    """파일 내용 해시 (BLAKE2b)"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def fsync_directory(directory: Path):
+    """폴더 항목(새 파일, 이름 교체)을 디스크에 기록 (폴더를 열 수 없는 Windows 등에서는 생략)"""
+    if os.name == 'nt':
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+class ConversionManifest:
+    """출력 폴더별 변환 기록 저장소 (생성한 스레드에서만 사용)"""
+
+    def __init__(self, output_directory: Path, file_name: str = MANIFEST_FILE_NAME):
+        self.path = Path(output_directory) / file_name
+        self.connection = sqlite3.connect(str(self.path))
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS conversions (
+                file_name TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                settings_key TEXT NOT NULL
+            )"""
+        )
+        self.connection.commit()
+
+    def load(self) -> Dict[str, ManifestRecord]:
+        """전체 기록을 메모리로 읽기 (파일당 쿼리를 피하기 위함)"""
+        cursor = self.connection.execute(
+            "SELECT file_name, size, mtime_ns, content_hash, settings_key FROM conversions"
+        )
+        return {row[0]: ManifestRecord(*row) for row in cursor}
+
+    def update(self, records: Iterable[ManifestRecord]):
+        """기록 추가/갱신 후 커밋"""
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO conversions VALUES (?, ?, ?, ?, ?)",
+            [(r.file_name, r.size, r.mtime_ns, r.content_hash, r.settings_key) for r in records]
+        )
+        self.connection.commit()
+
+    def close(self):
+        """연결 종료"""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+@dataclass
+class JournalEntry:
+    """작업 일지의 완료 기록 (content_hash는 증분 모드에서만 기록)"""
+    file_name: str
+    size: int
+    mtime_ns: int
+    content_hash: Optional[str] = None
+
+class ConversionJournal:
+    """완료한 파일을 바로 덧붙여 기록하는 작업 일지 (생성한 스레드에서만 사용)
+
+    첫 줄에 변환 설정을 기록하며, 설정이 다른 이전 일지는 버리고 새로 시작합니다.
+    기록은 바로 flush하고 JOURNAL_FSYNC_INTERVAL마다 fsync합니다. 전원이 꺼져 마지막 기록 몇 개를 잃어도
+    그 파일을 다시 변환할 뿐이고, 결과 파일은 기록 전에 이미 디스크에 쓰여 있으므로 잘린 결과를 완료로 보지 않습니다.
+    실행이 끝까지 완료되면 finish()로 삭제하고, 중단되면 남겨 두어 다음 실행이 이어서 처리합니다.
+    """
+
+    def __init__(self, output_directory: Path, settings_key: str, file_name: str = JOURNAL_FILE_NAME):
+        self.path = Path(output_directory) / file_name
+        self.entries: Dict[str, JournalEntry] = {}
+
+        resumed = self._load(settings_key)
+        self.file = open(self.path, 'a' if resumed else 'w', encoding='utf-8')
+        self.last_sync = 0.0
+        if not resumed:
+            self._write_line({"settings": settings_key})
+            fsync_directory(self.path.parent)
+
+    def _load(self, settings_key: str) -> bool:
+        """같은 설정의 이전 일지가 있으면 완료 기록을 읽고 True 반환"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.read().split('\n')
+        except FileNotFoundError:
+            return False
+
+        # 설정 줄까지 온전히 기록된 경우만 사용
+        if len(lines) < 2:
+            return False
+        try:
+            if json.loads(lines[0]).get("settings") != settings_key:
+                return False
+        except ValueError:
+            return False
+
+        # 마지막 줄은 기록 도중 중단되어 잘렸을 수 있음 (빈 줄로 끝나지 않으면 버림)
+        complete_lines = lines[1:-1]
+        for line in complete_lines:
+            try:
+                entry = JournalEntry(**json.loads(line))
+            except (ValueError, TypeError):
+                continue
+            self.entries[entry.file_name] = entry
+
+        if lines[-1]:
+            # 잘린 줄을 잘라내고 이어서 기록
+            with open(self.path, 'r+', encoding='utf-8') as f:
+                f.truncate(len('\n'.join(lines[:-1]).encode('utf-8')) + 1)
+        return True
+
+    def _write_line(self, data: dict):
+        self.file.write(json.dumps(data, ensure_ascii=False) + '\n')
+        self.file.flush()
+        if time.monotonic() - self.last_sync >= JOURNAL_FSYNC_INTERVAL:
+            self.sync()
+
+    def sync(self):
+        """기록한 내용을 디스크에 강제로 기록"""
+        os.fsync(self.file.fileno())
+        self.last_sync = time.monotonic()
+
+    def append(self, entry: JournalEntry):
+        """완료 기록 추가 (프로세스가 종료되어도 남도록 바로 flush, 전원 차단에 대비해 주기적으로 fsync)"""
+        self.entries[entry.file_name] = entry
+        self._write_line(asdict(entry))
+
+    def close(self):
+        """일지를 남겨 둔 채 닫기 (다음 실행에서 이어서 처리)"""
+        self.file.flush()
+        self.sync()
+        self.file.close()
+
+    def finish(self):
+        """실행 완료: 일지 삭제"""
+        self.file.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
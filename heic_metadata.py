@@ -0,0 +1,289 @@
+"""백그라운드 메타데이터 색인과 디스크 캐시
+
+Tkinter에 의존하지 않는 메타데이터 색인 로직입니다.
+스캔한 파일의 해상도, 촬영 일시, 카메라, GPS 유무와 EXIF 원본을 픽셀 디코딩 없이 읽어
+경로 + 크기 + 수정 시각을 키로 SQLite 캐시에 저장합니다.
+같은 폴더를 다시 열면 캐시에서 바로 읽으므로 파일을 열지 않습니다.
+"""
+import os
+import time
+import queue
+import sqlite3
+import threading
+import concurrent.futures
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+import logging
+
+from PIL import Image
+from pillow_heif import register_heif_opener
+
+# HEIF 형식 지원 등록
+register_heif_opener()
+
+logger = logging.getLogger(__name__)
+
+# 캐시 파일 이름 (사용자 캐시 폴더 아래)
+METADATA_CACHE_FILE_NAME = "metadata.sqlite"
+
+# 한 번에 읽어서 캐시에 저장하고 화면에 넘기는 파일 수
+INDEX_BATCH_SIZE = 256
+
+# SQLite 한 쿼리에 넣는 경로 수 (변수 개수 제한 이하)
+CACHE_QUERY_CHUNK = 500
+
+# EXIF 태그 (기본 IFD / Exif IFD / GPS IFD)
+EXIF_MAKE = 271
+EXIF_MODEL = 272
+EXIF_DATETIME = 306
+EXIF_DATETIME_ORIGINAL = 36867
+EXIF_IFD = 0x8769
+GPS_IFD = 0x8825
+
+def default_cache_path() -> Path:
+    """메타데이터 캐시 경로 (Windows는 %LOCALAPPDATA%, 그 외에는 ~/.cache 아래)"""
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "heic-converter" / METADATA_CACHE_FILE_NAME
+
+@dataclass
+class ImageMetadata:
+    """파일 하나의 헤더 메타데이터 (captured는 촬영 시각 타임스탬프, 없으면 None)"""
+    width: int
+    height: int
+    mode: str
+    captured: Optional[float] = None
+    camera: str = ""
+    has_gps: bool = False
+    exif: Optional[bytes] = None
+
+def parse_exif_datetime(value) -> Optional[float]:
+    """'YYYY:MM:DD HH:MM:SS' 형식의 EXIF 일시를 로컬 시각 타임스탬프로 변환"""
+    if not isinstance(value, str):
+        return None
+    try:
+        return time.mktime(time.strptime(value.strip("\x00 ")[:19], "%Y:%m:%d %H:%M:%S"))
+    except (ValueError, OverflowError):
+        return None
+
+def read_metadata(path: Path) -> ImageMetadata:
+    """컨테이너 헤더와 EXIF만 읽어 메타데이터 추출 (픽셀은 디코딩하지 않음)"""
+    with Image.open(path) as image:
+        exif_bytes = image.info.get("exif")
+        exif = image.getexif()
+        exif_ifd = exif.get_ifd(EXIF_IFD)
+        make = str(exif.get(EXIF_MAKE, "")).strip("\x00 ")
+        model = str(exif.get(EXIF_MODEL, "")).strip("\x00 ")
+        # 모델 이름에 제조사가 이미 들어 있으면 모델만 표시 (예: Canon EOS R5)
+        camera = model if not make or model.lower().startswith(make.lower()) else f"{make} {model}".strip()
+        captured = parse_exif_datetime(exif_ifd.get(EXIF_DATETIME_ORIGINAL)) \
+            or parse_exif_datetime(exif.get(EXIF_DATETIME))
+        return ImageMetadata(image.width, image.height, image.mode, captured, camera,
+                             bool(exif.get_ifd(GPS_IFD)), exif_bytes)
+
+# 캐시 키: (절대 경로, 크기, 수정 시각)
+CacheKey = Tuple[str, int, float]
+
+class MetadataCache:
+    """메타데이터 디스크 캐시 (생성한 스레드에서만 사용, 여러 연결이 동시에 열어도 됨)"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path is not None else default_cache_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.path), timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS metadata (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                width INTEGER NOT NULL,
+                height INTEGER NOT NULL,
+                mode TEXT NOT NULL,
+                captured REAL,
+                camera TEXT NOT NULL,
+                has_gps INTEGER NOT NULL,
+                exif BLOB
+            )"""
+        )
+        self.connection.commit()
+
+    def get_many(self, keys: Sequence[CacheKey], with_exif: bool = False) -> Dict[CacheKey, ImageMetadata]:
+        """캐시에 있고 크기와 수정 시각이 같은 항목만 반환"""
+        found = {}
+        wanted = {path: (size, mtime) for path, size, mtime in keys}
+        paths = list(wanted)
+        exif_column = "exif" if with_exif else "NULL"
+        for start in range(0, len(paths), CACHE_QUERY_CHUNK):
+            chunk = paths[start:start + CACHE_QUERY_CHUNK]
+            cursor = self.connection.execute(
+                f"SELECT path, size, mtime, width, height, mode, captured, camera, has_gps, {exif_column} "
+                f"FROM metadata WHERE path IN ({', '.join('?' * len(chunk))})",
+                chunk
+            )
+            for path, size, mtime, width, height, mode, captured, camera, has_gps, exif in cursor:
+                if wanted[path] == (size, mtime):
+                    found[(path, size, mtime)] = ImageMetadata(width, height, mode, captured, camera,
+                                                               bool(has_gps), exif)
+        return found
+
+    def get(self, key: CacheKey) -> Optional[ImageMetadata]:
+        """항목 하나 (EXIF 원본 포함)"""
+        return self.get_many([key], with_exif=True).get(key)
+
+    def put_many(self, items: Sequence[Tuple[CacheKey, ImageMetadata]]):
+        """항목 추가/갱신 후 커밋"""
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(path, size, mtime, m.width, m.height, m.mode, m.captured, m.camera, int(m.has_gps), m.exif)
+             for (path, size, mtime), m in items]
+        )
+        self.connection.commit()
+
+    def close(self):
+        """연결 종료"""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def load_metadata(source_directory: Path, file_names: Sequence[str], max_workers: Optional[int] = None,
+                  cache_path: Optional[Path] = None) -> Dict[str, Optional[ImageMetadata]]:
+    """여러 파일의 메타데이터 (캐시에 없는 파일만 병렬로 읽어 캐시에 저장, 읽지 못한 파일은 None)"""
+    source_directory = Path(source_directory).absolute()
+    keys: Dict[str, CacheKey] = {}
+    for file_name in file_names:
+        try:
+            file_stat = os.stat(source_directory / file_name)
+        except OSError:
+            continue
+        keys[file_name] = (str(source_directory / file_name), file_stat.st_size, file_stat.st_mtime)
+
+    try:
+        cache = MetadataCache(cache_path)
+    except (OSError, sqlite3.Error) as e:
+        # 캐시를 쓸 수 없어도 파일에서 직접 읽어 계속 진행
+        logger.warning(f"메타데이터 캐시를 열 수 없습니다: {e}")
+        cache = None
+
+    try:
+        cached = cache.get_many(list(keys.values())) if cache is not None else {}
+        results = {file_name: cached.get(key) for file_name, key in keys.items()}
+        missing = [file_name for file_name, metadata in results.items() if metadata is None]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            paths = [Path(keys[file_name][0]) for file_name in missing]
+            for file_name, metadata in zip(missing, executor.map(_read_metadata_safe, paths)):
+                results[file_name] = metadata
+        if cache is not None:
+            cache.put_many([(keys[file_name], results[file_name]) for file_name in missing
+                            if results[file_name] is not None])
+    finally:
+        if cache is not None:
+            cache.close()
+    return results
+
+# 색인 결과 콜백: [(행 번호, 메타데이터)] (색인 스레드에서 호출)
+IndexCallback = Callable[[List[Tuple[int, ImageMetadata]]], None]
+
+@dataclass
+class IndexStats:
+    """색인 통계"""
+    cached: int = 0  # 캐시에서 바로 읽은 파일 수
+    extracted: int = 0  # 새로 읽은 파일 수
+    failed: int = 0  # 읽지 못한 파일 수
+    elapsed: float = 0.0
+
+class MetadataIndexer:
+    """백그라운드 메타데이터 색인
+
+    스캔한 파일 묶음을 add()로 넘기면 캐시에 있는 파일은 바로, 없는 파일은 스레드 풀에서
+    병렬로 읽은 뒤 캐시에 저장하고 callback으로 넘깁니다. finish() 후 모든 묶음을 처리하면
+    on_finished가 통계와 함께 호출됩니다.
+    """
+
+    def __init__(self, callback: IndexCallback, cache_path: Optional[Path] = None,
+                 max_workers: Optional[int] = None,
+                 on_finished: Optional[Callable[[IndexStats], None]] = None):
+        self.callback = callback
+        self.cache_path = cache_path
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self.on_finished = on_finished
+        self.stats = IndexStats()
+        self._queue: "queue.Queue[Optional[Tuple[Path, list]]]" = queue.Queue()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def add(self, source_directory: Path, entries: Sequence[Tuple[int, str, int, float]]):
+        """(행 번호, 상대 경로, 크기, 수정 시각) 묶음 추가"""
+        self._queue.put((Path(source_directory).absolute(), list(entries)))
+
+    def finish(self):
+        """더 이상 추가할 묶음이 없음"""
+        self._queue.put(None)
+
+    def stop(self):
+        """남은 작업을 버리고 종료"""
+        self._stop_event.set()
+        self._queue.put(None)
+
+    @property
+    def is_stopped(self) -> bool:
+        """중지 요청 여부"""
+        return self._stop_event.is_set()
+
+    def _run(self):
+        """색인 스레드"""
+        start_time = time.perf_counter()
+        try:
+            with MetadataCache(self.cache_path) as cache, \
+                    concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                while not self.is_stopped:
+                    item = self._queue.get()
+                    if item is None:
+                        break
+                    self._index_batch(cache, executor, *item)
+        except Exception as e:
+            logger.error(f"메타데이터 색인 오류: {e}")
+            return
+
+        self.stats.elapsed = time.perf_counter() - start_time
+        if not self.is_stopped and self.on_finished:
+            self.on_finished(self.stats)
+
+    def _index_batch(self, cache: MetadataCache, executor: concurrent.futures.Executor,
+                     source_directory: Path, entries: List[Tuple[int, str, int, float]]):
+        """묶음 하나 처리: 캐시 조회 → 없는 파일만 병렬로 읽기 → 캐시 저장"""
+        keys = [(str(source_directory / file_name), size, mtime)
+                for _, file_name, size, mtime in entries]
+        cached = cache.get_many(keys)
+        hits = [(entry[0], cached[key]) for entry, key in zip(entries, keys) if key in cached]
+        misses = [(entry[0], key) for entry, key in zip(entries, keys) if key not in cached]
+        self.stats.cached += len(hits)
+        if hits:
+            self.callback(hits)
+
+        for start in range(0, len(misses), INDEX_BATCH_SIZE):
+            if self.is_stopped:
+                return
+            chunk = misses[start:start + INDEX_BATCH_SIZE]
+            results = executor.map(_read_metadata_safe, [Path(key[0]) for _, key in chunk])
+            extracted = [(row, key, metadata) for (row, key), metadata in zip(chunk, results)
+                         if metadata is not None]
+            self.stats.extracted += len(extracted)
+            self.stats.failed += len(chunk) - len(extracted)
+            if extracted:
+                cache.put_many([(key, metadata) for _, key, metadata in extracted])
+                self.callback([(row, metadata) for row, _, metadata in extracted])
+
+def _read_metadata_safe(path: Path) -> Optional[ImageMetadata]:
+    """읽을 수 없는 파일은 None (미리보기/변환 단계에서 오류로 보고됨)"""
+    try:
+        return read_metadata(path)
+    except Exception as e:
+        logger.debug(f"메타데이터 읽기 실패 ({path}): {e}")
+        return None
@@ -0,0 +1,387 @@
+"""미리보기 이미지 생성
+
+Tkinter에 의존하지 않는 미리보기 렌더링 로직입니다.
+HEIF에 내장된 썸네일이 있으면 전체 이미지 대신 썸네일만 디코딩합니다.
+"""
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+from dataclasses import dataclass
+import logging
+
+from PIL import Image
+from pillow_heif import register_heif_opener
+
+# HEIF 형식 지원 등록
+register_heif_opener()
+
+logger = logging.getLogger(__name__)
+
+# 캔버스 가장자리 여백 (px)
+PREVIEW_MARGIN = 20
+
+# 빠른 미리보기 후 고화질로 교체하기까지 기다리는 시간 (ms)
+PREVIEW_UPGRADE_DELAY_MS = 400
+
+# 창 크기 변경 시 다시 리샘플링할 수 있도록 보관하는 디코딩 원본의 최대 변 길이 (px)
+PREVIEW_SOURCE_MAX_SIZE = 1600
+
+# 창 크기 변경이 멈춘 뒤 다시 렌더링하기까지 기다리는 시간 (ms)
+RESIZE_DEBOUNCE_MS = 150
+
+# 미리보기 캐시 메모리 한도 (렌더링된 픽셀 기준)
+PREVIEW_CACHE_BYTES = 128 * 1024 * 1024
+
+# 선택한 파일 앞뒤로 미리 읽어 둘 파일 수
+PREFETCH_DISTANCE = 3
+
+# 주요 EXIF 태그들
+EXIF_TAGS = {
+    271: ("제조사", "🏢"),
+    272: ("카메라 모델", "📸"),
+    306: ("촬영 일시", "📅"),
+    315: ("소프트웨어", "💻"),
+    33434: ("노출 시간", "⏱️"),
+    33437: ("F-Stop", "🔍"),
+    34855: ("ISO", "🌟"),
+    36867: ("원본 촬영 일시", "📅"),
+    36868: ("디지털화 일시", "💾"),
+    40961: ("색공간", "🎨"),
+    40962: ("가로 해상도", "📐"),
+    40963: ("세로 해상도", "📐")
+}
+
+@dataclass
+class PreviewImage:
+    """렌더링된 미리보기"""
+    image: Image.Image
+    full_size: Tuple[int, int]  # 원본 이미지 크기
+    final: bool  # False면 작은 썸네일을 확대한 임시 화질
+
+def fit_size(image_size: Tuple[int, int], canvas_size: Tuple[int, int],
+             margin: int = PREVIEW_MARGIN) -> Tuple[int, int]:
+    """이미지 비율을 유지하면서 캔버스(여백 제외)에 맞는 크기 계산"""
+    image_width, image_height = image_size
+    canvas_width, canvas_height = canvas_size
+    img_ratio = image_width / image_height
+    canvas_ratio = canvas_width / canvas_height
+
+    if img_ratio > canvas_ratio:
+        # 이미지가 더 넓음
+        new_width = canvas_width - margin
+        new_height = int(new_width / img_ratio)
+    else:
+        # 이미지가 더 높음
+        new_height = canvas_height - margin
+        new_width = int(new_height * img_ratio)
+
+    return max(1, new_width), max(1, new_height)
+
+class ImageDetails:
+    """파일 하나의 메타데이터 (미리보기와 정보 패널이 함께 사용)
+
+    컨테이너 헤더만 읽으며 픽셀은 디코딩하지 않습니다.
+    EXIF는 원본 바이트로 보관했다가 처음 접근할 때 한 번만 파싱합니다.
+    """
+
+    def __init__(self, file_path: Path, file_size: int, size: Tuple[int, int], mode: str,
+                 exif_bytes: Optional[bytes]):
+        self.file_path = file_path
+        self.file_size = file_size
+        self.size = size
+        self.mode = mode
+        self.exif_bytes = exif_bytes
+        self._exif: Optional[Image.Exif] = None
+        self._info_lines: Optional[List[str]] = None
+
+    @classmethod
+    def from_image(cls, file_path: Path, image: Image.Image) -> "ImageDetails":
+        """열려 있는 이미지에서 메타데이터 추출"""
+        return cls(file_path, os.stat(file_path).st_size, image.size, image.mode,
+                   image.info.get("exif"))
+
+    @property
+    def exif(self) -> Image.Exif:
+        """파싱된 EXIF (처음 접근할 때 파싱)"""
+        if self._exif is None:
+            exif = Image.Exif()
+            if self.exif_bytes:
+                exif.load(self.exif_bytes)
+            self._exif = exif
+        return self._exif
+
+    @property
+    def memory_size(self) -> int:
+        """캐시 한도 계산용 대략적인 크기"""
+        return len(self.exif_bytes or b"") * 2 + 1024
+
+    def info_lines(self) -> List[str]:
+        """이미지 정보 패널에 표시할 파일/EXIF 정보"""
+        if self._info_lines is not None:
+            return self._info_lines
+
+        exif_data = self.exif
+
+        # 기본 파일 정보
+        info_lines = []
+        info_lines.append("📁 파일 정보")
+        info_lines.append("─" * 30)
+        info_lines.append(f"파일명: {self.file_path.name}")
+        info_lines.append(f"크기: {self.size[0]:,} × {self.size[1]:,} px")
+        info_lines.append(f"모드: {self.mode}")
+        info_lines.append(f"용량: {self.file_size / (1024*1024):.2f} MB")
+        info_lines.append("")
+
+        # EXIF 정보
+        if exif_data:
+            info_lines.append("📷 촬영 정보")
+            info_lines.append("─" * 30)
+
+            # 촬영 관련 태그는 Exif IFD에 들어 있으므로 기본 IFD와 합쳐서 조회
+            tags = dict(exif_data)
+            tags.update(exif_data.get_ifd(0x8769))
+
+            for tag_id, (tag_name, emoji) in EXIF_TAGS.items():
+                if tag_id in tags:
+                    value = tags[tag_id]
+                    if isinstance(value, tuple) and len(value) == 2:
+                        if tag_id == 33434:  # 노출 시간
+                            value = f"1/{int(value[1]/value[0])}" if value[0] != 0 else "N/A"
+                        elif tag_id == 33437:  # F-Stop
+                            value = f"f/{value[0]/value[1]:.1f}" if value[1] != 0 else "N/A"
+                        else:
+                            value = f"{value[0]}/{value[1]}"
+                    elif tag_id == 33434 and value:  # 노출 시간 (IFDRational)
+                        value = f"1/{round(1 / float(value))}" if value < 1 else f"{float(value):g}"
+                    elif tag_id == 33437:  # F-Stop (IFDRational)
+                        value = f"f/{float(value):.1f}"
+                    elif tag_id == 34855:  # ISO
+                        value = f"ISO {value}"
+
+                    info_lines.append(f"{emoji} {tag_name}: {value}")
+
+            # GPS 정보 확인 (같은 EXIF 객체 재사용)
+            gps_info = exif_data.get_ifd(0x8825)
+            if gps_info:
+                info_lines.append("")
+                info_lines.append("🌍 위치 정보")
+                info_lines.append("─" * 30)
+                info_lines.append("📍 GPS 데이터 있음")
+        else:
+            info_lines.append("📷 촬영 정보")
+            info_lines.append("─" * 30)
+            info_lines.append("EXIF 정보가 없습니다.")
+
+        self._info_lines = info_lines
+        return info_lines
+
+def _render_open_image(image: Image.Image, canvas_size: Tuple[int, int],
+                       fast: bool) -> Tuple[Optional[PreviewImage], Optional[PreviewImage]]:
+    """열려 있는 이미지로 캔버스 크기에 맞는 미리보기 생성
+
+    (미리보기, 디코딩 원본) 반환. 디코딩 원본은 창 크기 변경 시 다시 리샘플링하는 데 쓰이며,
+    작은 썸네일을 확대한 임시 화질일 때는 None입니다.
+    fast=True인데 내장 썸네일이 없으면 전체 디코딩하지 않고 (None, None)을 반환합니다.
+    """
+    full_size = image.size
+    target_size = fit_size(full_size, canvas_size)
+
+    # 내장 썸네일 선택 (지원하지 않는 버전에서는 아무 일도 하지 않음)
+    draft_size = (1, 1) if fast else target_size
+    used_thumbnail = image.draft(image.mode, draft_size) is not None
+    if fast and not used_thumbnail:
+        return None, None
+
+    if used_thumbnail and image.width < target_size[0]:
+        resized_image = image.resize(target_size, Image.Resampling.LANCZOS)
+        return PreviewImage(resized_image, full_size, False), None
+
+    # 디코딩 원본은 적당한 크기로 줄여서 보관
+    source_size = fit_size(image.size, (PREVIEW_SOURCE_MAX_SIZE, PREVIEW_SOURCE_MAX_SIZE), margin=0)
+    if source_size[0] < image.width:
+        source_image = image.resize(source_size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+    else:
+        source_image = image.copy()
+
+    resized_image = source_image.resize(target_size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+    return PreviewImage(resized_image, full_size, True), PreviewImage(source_image, full_size, True)
+
+def render_preview(file_path: Path, canvas_size: Tuple[int, int], fast: bool = True) -> Optional[PreviewImage]:
+    """캔버스 크기에 맞는 미리보기 생성
+
+    fast=True면 크기와 관계없이 가장 작은 내장 썸네일을 사용하고, 썸네일이 없으면 None을 반환합니다.
+    fast=False면 캔버스보다 큰 썸네일이 있을 때만 사용하고,
+    없으면 전체 디코딩 후 정수 배율 축소(reduce)를 먼저 적용해 리샘플링 비용을 줄입니다.
+    """
+    with Image.open(file_path) as image:
+        preview, _ = _render_open_image(image, canvas_size, fast)
+    return preview
+
+class PreviewCache:
+    """렌더링된 미리보기와 파일 메타데이터를 담는 메모리 한도 LRU 캐시 (스레드 안전)
+
+    키에 파일 수정 시각이 포함되므로 파일이 바뀌면 자동으로 새로 읽습니다.
+    """
+
+    def __init__(self, max_bytes: int = PREVIEW_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[tuple, Tuple[object, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _file_key(file_path: Path) -> Optional[tuple]:
+        """경로 + 수정 시각 키 (파일이 없으면 None)"""
+        try:
+            return str(file_path), os.stat(file_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _get(self, key: tuple):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            self._entries.move_to_end(key)
+            return item[0]
+
+    def _put(self, key: tuple, value, size: int):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+
+            # 한도를 넘으면 가장 오래 사용하지 않은 항목부터 제거
+            while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def get_preview(self, file_path: Path, canvas_size: Tuple[int, int]) -> Optional[PreviewImage]:
+        """캐시된 미리보기 반환"""
+        file_key = self._file_key(file_path)
+        return self._get(("preview", file_key, canvas_size)) if file_key else None
+
+    def put_preview(self, file_path: Path, canvas_size: Tuple[int, int], preview: PreviewImage):
+        """미리보기 저장 (이미 고화질이 있으면 임시 화질로 덮어쓰지 않음)"""
+        file_key = self._file_key(file_path)
+        if file_key is None:
+            return
+        key = ("preview", file_key, canvas_size)
+        if not preview.final:
+            cached = self._get(key)
+            if cached is not None and cached.final:
+                return
+        size = preview.image.width * preview.image.height * len(preview.image.getbands())
+        self._put(key, preview, size)
+
+    def get_source(self, file_path: Path) -> Optional[PreviewImage]:
+        """캐시된 디코딩 원본 반환"""
+        file_key = self._file_key(file_path)
+        return self._get(("source", file_key)) if file_key else None
+
+    def put_source(self, file_path: Path, source: PreviewImage):
+        """디코딩 원본 저장"""
+        file_key = self._file_key(file_path)
+        if file_key is not None:
+            size = source.image.width * source.image.height * len(source.image.getbands())
+            self._put(("source", file_key), source, size)
+
+    def get_details(self, file_path: Path) -> Optional[ImageDetails]:
+        """캐시된 메타데이터 반환"""
+        file_key = self._file_key(file_path)
+        return self._get(("details", file_key)) if file_key else None
+
+    def put_details(self, file_path: Path, details: ImageDetails):
+        """메타데이터 저장"""
+        file_key = self._file_key(file_path)
+        if file_key is not None:
+            self._put(("details", file_key), details, details.memory_size)
+
+    def clear(self):
+        """캐시 비우기"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+def load_file_view(cache: PreviewCache, file_path: Path, canvas_size: Tuple[int, int],
+                   fast: bool = True, with_preview: bool = True) -> Tuple[ImageDetails, Optional[PreviewImage]]:
+    """메타데이터와 미리보기를 캐시에서 가져오고, 없는 것만 파일을 한 번 열어 생성
+
+    fast=True는 UI 스레드용으로, 내장 썸네일이 없으면 미리보기 없이(None) 반환합니다.
+    이때 전체 디코딩은 render_final_preview로 백그라운드에서 합니다.
+    """
+    details = cache.get_details(file_path)
+    preview = cache.get_preview(file_path, canvas_size) if with_preview else None
+    need_preview = with_preview and (preview is None or (not fast and not preview.final))
+
+    if details is None or need_preview:
+        with Image.open(file_path) as image:
+            if details is None:
+                details = ImageDetails.from_image(file_path, image)
+                cache.put_details(file_path, details)
+            if need_preview:
+                rendered, source = _render_open_image(image, canvas_size, fast)
+                if rendered is not None:
+                    preview = rendered
+                    cache.put_preview(file_path, canvas_size, preview)
+                if source is not None:
+                    cache.put_source(file_path, source)
+
+    return details, preview
+
+def render_final_preview(cache: PreviewCache, file_path: Path, canvas_size: Tuple[int, int]) -> PreviewImage:
+    """고화질 미리보기 (백그라운드 스레드용)
+
+    캐시된 디코딩 원본이 캔버스보다 크면 파일을 다시 열지 않고 리샘플링만 합니다.
+    """
+    cached = cache.get_preview(file_path, canvas_size)
+    if cached is not None and cached.final:
+        return cached
+
+    source = cache.get_source(file_path)
+    if source is not None:
+        target_size = fit_size(source.full_size, canvas_size)
+        if target_size[0] <= source.image.width:
+            resized_image = source.image.resize(target_size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+            preview = PreviewImage(resized_image, source.full_size, True)
+            cache.put_preview(file_path, canvas_size, preview)
+            return preview
+
+    _, preview = load_file_view(cache, file_path, canvas_size, fast=False)
+    return preview
+
+class PreviewPrefetcher:
+    """주변 파일의 미리보기와 메타데이터를 백그라운드에서 미리 준비"""
+
+    def __init__(self, cache: PreviewCache):
+        self.cache = cache
+        self._pending: List[Path] = []
+        self._canvas_size: Tuple[int, int] = (400, 300)
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def request(self, file_paths: List[Path], canvas_size: Tuple[int, int]):
+        """미리 읽을 파일 목록 교체 (가까운 파일부터, 이전 요청은 취소)"""
+        with self._condition:
+            self._pending = list(reversed(file_paths))
+            self._canvas_size = canvas_size
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                file_path = self._pending.pop()
+                canvas_size = self._canvas_size
+
+            try:
+                details, _ = load_file_view(self.cache, file_path, canvas_size, fast=False)
+                details.info_lines()
+            except Exception as e:
+                logger.debug(f"미리 읽기 실패 ({file_path}): {e}")
@@ -0,0 +1,119 @@
+"""변환 단계별 소요 시간 통계
+
+파일마다 측정한 단계별 시간(해시, 디코딩, 메타데이터, 크기 조절, 인코딩, 쓰기)을
+로그 간격 히스토그램으로 모아 p50/p95/p99를 계산하고 JSON/CSV로 내보냅니다.
+"""
+import csv
+import json
+import math
+from pathlib import Path
+from typing import Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 측정하는 단계 (처리 순서)
+STAGES = ("hash", "decode", "metadata", "resize", "encode", "write")
+
+# 히스토그램 구간: 10µs부터 5%씩 증가 (백분위 오차 약 2.5% 이내)
+HISTOGRAM_MIN_SECONDS = 1e-5
+HISTOGRAM_GROWTH = 1.05
+
+# 내보내는 백분위
+PERCENTILES = (50, 95, 99)
+
+class StageHistogram:
+    """소요 시간 히스토그램 (파일 수와 관계없이 메모리 사용량이 일정)"""
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = 0.0
+
+    def add(self, seconds: float):
+        """측정값 하나 추가"""
+        index = int(math.log(max(seconds, HISTOGRAM_MIN_SECONDS) / HISTOGRAM_MIN_SECONDS)
+                    / math.log(HISTOGRAM_GROWTH))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.minimum = min(self.minimum, seconds)
+        self.maximum = max(self.maximum, seconds)
+
+    def percentile(self, percent: float) -> float:
+        """백분위 값 (구간의 기하 중앙값, 실제 최소/최대 범위로 제한)"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                value = HISTOGRAM_MIN_SECONDS * HISTOGRAM_GROWTH ** (index + 0.5)
+                return min(max(value, self.minimum), self.maximum)
+        return self.maximum
+
+    def to_dict(self) -> Dict[str, float]:
+        """요약 통계 (시간은 ms)"""
+        summary = {
+            "count": self.count,
+            "total_seconds": self.total,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+        }
+        for percent in PERCENTILES:
+            summary[f"p{percent}_ms"] = self.percentile(percent) * 1000
+        summary["max_ms"] = self.maximum * 1000
+        return summary
+
+class StageProfile:
+    """단계별 히스토그램 모음 (한 스레드에서만 갱신)"""
+
+    def __init__(self):
+        self.histograms = {stage: StageHistogram() for stage in STAGES}
+
+    def add(self, stage_seconds: Dict[str, float]):
+        """파일 하나의 단계별 시간 추가"""
+        for stage, seconds in stage_seconds.items():
+            self.histograms[stage].add(seconds)
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """측정된 단계만 요약 통계로 변환"""
+        return {stage: histogram.to_dict() for stage, histogram in self.histograms.items() if histogram.count}
+
+    def format_lines(self) -> List[str]:
+        """로그/대화상자 표시용 표"""
+        lines = [f"{'stage':<9} {'files':>7} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8}  (ms)"]
+        for stage, summary in self.to_dict().items():
+            lines.append(
+                f"{stage:<9} {summary['count']:>7,} {summary['mean_ms']:>8.1f} {summary['p50_ms']:>8.1f} "
+                f"{summary['p95_ms']:>8.1f} {summary['p99_ms']:>8.1f}"
+            )
+        return lines
+
+    def write_json(self, path: Path):
+        """JSON으로 저장"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def write_csv(self, path: Path):
+        """CSV로 저장 (단계별 한 줄)"""
+        rows = self.to_dict()
+        fields = ["stage", "count", "total_seconds", "mean_ms"] + [f"p{p}_ms" for p in PERCENTILES] + ["max_ms"]
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for stage, summary in rows.items():
+                writer.writerow({"stage": stage, **summary})
+
+    def export(self, path: Path):
+        """확장자(.json/.csv)에 맞는 형식으로 저장"""
+        path = Path(path)
+        if path.suffix.lower() == ".csv":
+            self.write_csv(path)
+        elif path.suffix.lower() == ".json":
+            self.write_json(path)
+        else:
+            raise ValueError(f"지원하지 않는 내보내기 형식입니다: {path.suffix}")
+        logger.info(f"단계별 시간 저장: {path}")
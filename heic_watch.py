@@ -0,0 +1,492 @@
+"""폴더 감시 모드
+
+휴대폰에서 받은 HEIC 파일이 계속 들어오는 폴더를 감시하다가, 새 파일의 쓰기가 끝나면 모아서 변환합니다.
+Linux에서는 inotify로 변경 알림을 기다리므로 대기 중에는 CPU를 거의 쓰지 않고,
+그 밖의 환경(또는 inotify를 쓸 수 없을 때)에서는 폴더 수정 시각을 주기적으로 확인하는 방식으로 동작합니다.
+파일 목록 필터와 출력 폴더 규칙은 일반 변환과 같고, 변환은 배치마다 같은 작업 풀을 재사용합니다.
+"""
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from dataclasses import dataclass
+import logging
+
+from heic_engine import (
+    ConversionEngine, ConversionSummary, ProgressCallback, ScanEntry,
+    create_executor, iter_heic_files, matches_scan_filters
+)
+
+logger = logging.getLogger(__name__)
+
+# 크기와 수정 시각이 이 시간 동안 그대로여야 쓰기가 끝난 것으로 봄 (초)
+WATCH_SETTLE_SECONDS = 2.0
+# 폴링 방식의 확인 간격: 변화가 없으면 최대값까지 두 배씩 늘림 (초)
+WATCH_POLL_INTERVAL = 1.0
+WATCH_IDLE_POLL_INTERVAL = 8.0
+# 폴링 방식에서 폴더 수정 시각으로 알 수 없는 변경(같은 이름으로 덮어쓰기 등)을 찾는 전체 스캔 간격 (초)
+WATCH_FULL_SCAN_INTERVAL = 300.0
+
+# inotify 이벤트 (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+INOTIFY_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+INOTIFY_EVENT = struct.Struct("iIII")
+INOTIFY_READ_SIZE = 64 * 1024
+
+# 파일 상태 (크기, 수정 시각)
+Signature = Tuple[int, float]
+
+class FolderWatcher(ABC):
+    """변경 감지 공통 부분
+
+    start()는 감시를 시작하면서 현재 파일 목록을, wait()는 바뀌었을 수 있는 파일 목록을 반환합니다.
+    반환한 파일이 실제로 새 파일인지, 쓰기가 끝났는지는 SettleTracker가 판단합니다.
+    full_scan은 마지막으로 반환한 목록이 폴더 전체를 스캔한 결과인지 나타냅니다 (없는 파일 정리용).
+    """
+    method = ""
+
+    def __init__(self, directory: Path, recursive: bool = True,
+                 include: Optional[Sequence[str]] = None,
+                 exclude: Optional[Sequence[str]] = None,
+                 ignore_directories: Iterable[Path] = ()):
+        self.directory = Path(directory)
+        self.recursive = recursive
+        self.include = include
+        self.exclude = exclude
+        # 출력 폴더 등 감시하지 않을 폴더 (절대 경로, 원본 폴더 자체는 제외할 수 없음)
+        self.ignore_directories = {os.path.normcase(os.path.abspath(path)) for path in ignore_directories}
+        self.ignore_directories.discard(os.path.normcase(os.path.abspath(self.directory)))
+        self.full_scan = False
+        self._stopped = threading.Event()
+
+    def is_ignored(self, rel_dir: str) -> bool:
+        """감시하지 않는 폴더인지 확인"""
+        if rel_dir and not matches_scan_filters(rel_dir, True, exclude=self.exclude):
+            return True
+        path = os.path.normcase(os.path.abspath(os.path.join(self.directory, rel_dir)))
+        return path in self.ignore_directories
+
+    def scan_all(self) -> List[ScanEntry]:
+        """폴더 전체 스캔"""
+        self.full_scan = True
+        return [entry for entry in iter_heic_files(self.directory, self.recursive, self.include, self.exclude)
+                if not self.is_ignored(entry.file_name.rpartition("/")[0])]
+
+    def scan_directory(self, rel_dir: str) -> Tuple[List[ScanEntry], List[str]]:
+        """폴더 하나만 스캔해 (HEIC 파일, 하위 폴더) 반환"""
+        files: List[ScanEntry] = []
+        sub_dirs: List[str] = []
+        try:
+            with os.scandir(os.path.join(self.directory, rel_dir)) as it:
+                for entry in it:
+                    rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.recursive and not self.is_ignored(rel_path):
+                                sub_dirs.append(rel_path)
+                        elif matches_scan_filters(rel_path, False, self.include, self.exclude) and entry.is_file():
+                            stat = entry.stat()
+                            files.append(ScanEntry(rel_path, stat.st_size, stat.st_mtime))
+                    except OSError as e:
+                        logger.debug(f"파일 정보를 읽을 수 없습니다 ({rel_path}): {e}")
+        except OSError as e:
+            logger.debug(f"폴더를 읽을 수 없습니다 ({rel_dir or self.directory}): {e}")
+        return files, sub_dirs
+
+    @abstractmethod
+    def start(self) -> List[ScanEntry]:
+        """감시를 시작하고 현재 파일 목록 반환"""
+
+    @abstractmethod
+    def wait(self, timeout: Optional[float]) -> List[ScanEntry]:
+        """변경을 timeout초(None이면 무한정)까지 기다려 바뀌었을 수 있는 파일 목록 반환"""
+
+    def stop(self):
+        """대기 중인 wait()를 깨우고 이후 호출은 바로 반환 (다른 스레드나 시그널 핸들러에서 호출 가능)"""
+        self._stopped.set()
+
+    def close(self):
+        """감시 종료"""
+
+class PollingWatcher(FolderWatcher):
+    """폴더 수정 시각을 주기적으로 확인하는 감시 방식 (모든 환경에서 동작)
+
+    파일이 생기거나 이름이 바뀌면 그 폴더의 수정 시각이 바뀌므로, 평소에는 폴더마다 stat 한 번만 합니다.
+    """
+    method = "polling"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.directory_mtimes: Dict[str, int] = {}
+        self.interval = WATCH_POLL_INTERVAL
+        self.last_full_scan = 0.0
+
+    def _scan_tree(self, rel_dirs: List[str]) -> List[ScanEntry]:
+        """폴더들과 그 하위 폴더를 스캔하면서 폴더 수정 시각 기록"""
+        entries: List[ScanEntry] = []
+        pending = list(rel_dirs)
+        while pending:
+            rel_dir = pending.pop()
+            try:
+                self.directory_mtimes[rel_dir] = os.stat(os.path.join(self.directory, rel_dir)).st_mtime_ns
+            except OSError:
+                self.directory_mtimes.pop(rel_dir, None)
+                continue
+            files, sub_dirs = self.scan_directory(rel_dir)
+            entries.extend(files)
+            # 이미 아는 하위 폴더는 자기 수정 시각으로 따로 확인
+            pending.extend(sub_dir for sub_dir in sub_dirs if sub_dir not in self.directory_mtimes)
+        return entries
+
+    def start(self) -> List[ScanEntry]:
+        self.directory_mtimes.clear()
+        self.last_full_scan = time.monotonic()
+        self.full_scan = True
+        return self._scan_tree([""])
+
+    def wait(self, timeout: Optional[float]) -> List[ScanEntry]:
+        self.full_scan = False
+        # 확인할 파일이 남아 있으면 그 시점까지만 대기
+        delay = self.interval if timeout is None else min(self.interval, timeout)
+        if self._stopped.wait(delay):
+            return []
+
+        if time.monotonic() - self.last_full_scan >= WATCH_FULL_SCAN_INTERVAL:
+            return self.start()
+
+        changed = []
+        for rel_dir, mtime_ns in list(self.directory_mtimes.items()):
+            try:
+                current = os.stat(os.path.join(self.directory, rel_dir)).st_mtime_ns
+            except OSError:
+                del self.directory_mtimes[rel_dir]
+                continue
+            if current != mtime_ns:
+                changed.append(rel_dir)
+        if not changed:
+            self.interval = min(self.interval * 2, WATCH_IDLE_POLL_INTERVAL)
+            return []
+
+        self.interval = WATCH_POLL_INTERVAL
+        for rel_dir in changed:
+            self.directory_mtimes.pop(rel_dir, None)
+        return self._scan_tree(changed)
+
+class InotifyWatcher(FolderWatcher):
+    """Linux inotify로 변경 알림을 기다리는 감시 방식 (대기 중에는 깨어나지 않음)
+
+    하위 폴더마다 감시를 추가하며, 감시 개수 한도를 넘는 등 사용할 수 없으면 OSError가 발생합니다.
+    """
+    method = "inotify"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._libc = load_inotify()
+        if self._libc is None:
+            raise OSError(errno.ENOSYS, "inotify를 사용할 수 없습니다")
+        self.fd = self._libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self.watches: Dict[int, str] = {}  # 감시 번호 → 상대 폴더 경로
+        # stop()이 대기 중인 select를 바로 깨우도록 사용하는 파이프
+        self._wake_read, self._wake_write = os.pipe()
+        os.set_blocking(self._wake_read, False)
+        os.set_blocking(self._wake_write, False)
+
+    def _add_tree(self, rel_dir: str) -> List[ScanEntry]:
+        """폴더와 하위 폴더에 감시를 추가하고 안에 있던 파일 반환 (감시를 먼저 추가해 사이에 생긴 파일도 놓치지 않음)"""
+        entries: List[ScanEntry] = []
+        pending = [rel_dir]
+        while pending:
+            rel_dir = pending.pop()
+            path = os.fsencode(os.path.join(self.directory, rel_dir))
+            wd = self._libc.inotify_add_watch(self.fd, path, INOTIFY_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error in (errno.ENOENT, errno.ENOTDIR):
+                    continue  # 그 사이에 지워진 폴더
+                raise OSError(error, f"{os.strerror(error)}: {rel_dir or self.directory}")
+            self.watches[wd] = rel_dir
+            files, sub_dirs = self.scan_directory(rel_dir)
+            entries.extend(files)
+            pending.extend(sub_dirs)
+        return entries
+
+    def start(self) -> List[ScanEntry]:
+        self.full_scan = True
+        return self._add_tree("")
+
+    def wait(self, timeout: Optional[float]) -> List[ScanEntry]:
+        self.full_scan = False
+        if self._stopped.is_set():
+            return []
+        readable, _, _ = select.select([self.fd, self._wake_read], [], [], timeout)
+        if self._wake_read in readable or self.fd not in readable:
+            return []
+        try:
+            data = os.read(self.fd, INOTIFY_READ_SIZE)
+        except BlockingIOError:
+            return []
+
+        entries: List[ScanEntry] = []
+        changed: Set[str] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # 이벤트가 넘쳐 일부를 잃어버림: 전체를 다시 스캔
+                logger.warning("변경 알림이 너무 많아 폴더 전체를 다시 스캔합니다")
+                return self.scan_all()
+            if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                if self.watches.pop(wd, None) is not None and mask & IN_MOVE_SELF:
+                    self._libc.inotify_rm_watch(self.fd, wd)
+                continue
+            rel_dir = self.watches.get(wd)
+            if rel_dir is None or not name:
+                continue
+            rel_path = f"{rel_dir}/{name}" if rel_dir else name
+            if mask & IN_ISDIR:
+                if self.recursive and not self.is_ignored(rel_path):
+                    try:
+                        entries.extend(self._add_tree(rel_path))
+                    except OSError as e:
+                        # 이미 들어 있던 파일만 변환하고 이후 변경은 감지하지 못함
+                        logger.warning(f"하위 폴더를 감시할 수 없습니다 ({rel_path}): {e}")
+                        entries.extend(self.scan_directory(rel_path)[0])
+            elif matches_scan_filters(rel_path, False, self.include, self.exclude):
+                changed.add(rel_path)
+
+        for rel_path in changed:
+            try:
+                stat = os.stat(self.directory / rel_path)
+            except OSError:
+                continue
+            entries.append(ScanEntry(rel_path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def stop(self):
+        super().stop()
+        try:
+            os.write(self._wake_write, b"\0")
+        except OSError:
+            pass
+
+    def close(self):
+        for fd in (self.fd, self._wake_read, self._wake_write):
+            os.close(fd)
+
+def load_inotify() -> Optional[ctypes.CDLL]:
+    """inotify 함수를 가진 libc (Linux가 아니면 None)"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+def start_watcher(directory: Path, recursive: bool = True,
+                  include: Optional[Sequence[str]] = None,
+                  exclude: Optional[Sequence[str]] = None,
+                  ignore_directories: Iterable[Path] = (),
+                  polling: bool = False) -> Tuple[FolderWatcher, List[ScanEntry]]:
+    """가능하면 inotify, 아니면 폴링 방식으로 감시를 시작하고 (감시, 현재 파일 목록) 반환"""
+    if not polling:
+        watcher = None
+        try:
+            watcher = InotifyWatcher(directory, recursive, include, exclude, ignore_directories)
+            return watcher, watcher.start()
+        except OSError as e:
+            # 감시 개수 한도(fs.inotify.max_user_watches)를 넘는 경우 등
+            if watcher is not None:
+                watcher.close()
+            logger.info(f"inotify를 사용할 수 없어 폴링 방식으로 감시합니다: {e}")
+    watcher = PollingWatcher(directory, recursive, include, exclude, ignore_directories)
+    return watcher, watcher.start()
+
+class SettleTracker:
+    """쓰기가 끝난 새 파일 판별
+
+    크기와 수정 시각이 settle_seconds 동안 그대로이고 파일을 열 수 있으면 쓰기가 끝난 것으로 봅니다.
+    감시를 시작할 때 있던 파일은 수정 시각부터 계산하므로 기다리지 않고 바로 변환하고,
+    그 뒤에 나타난 파일은 처음 본 시각부터 계산합니다 (복사 프로그램이 원본 수정 시각을 먼저 써 두는 경우가 있음).
+    변환을 넘긴 파일은 그때의 상태를 기억해, 내용이 바뀌기 전에는 다시 넘기지 않습니다.
+    전체 스캔 결과를 받으면 그 사이 사라진 파일의 기록은 지웁니다.
+    """
+
+    def __init__(self, source_directory: Path, settle_seconds: float = WATCH_SETTLE_SECONDS):
+        self.source_directory = Path(source_directory)
+        self.settle_seconds = settle_seconds
+        self.pending: Dict[str, Tuple[Signature, float]] = {}  # 파일 → (마지막 상태, 바뀐 시각)
+        self.handled: Dict[str, Signature] = {}  # 변환을 넘긴 파일 → 그때의 상태
+
+    def observe(self, entries: Iterable[ScanEntry], initial: bool = False, full_scan: bool = False):
+        """바뀌었을 수 있는 파일 기록 (initial은 감시 시작 시 스캔 결과, full_scan은 폴더 전체 스캔 결과)"""
+        now = time.time()
+        if full_scan:
+            entries = list(entries)
+            present = {entry.file_name for entry in entries}
+            for file_name in [name for name in self.handled if name not in present]:
+                del self.handled[file_name]
+        for entry in entries:
+            signature = (entry.size, entry.mtime)
+            if self.handled.get(entry.file_name) == signature:
+                continue
+            previous = self.pending.get(entry.file_name)
+            if previous is None:
+                self.pending[entry.file_name] = (signature, min(entry.mtime, now) if initial else now)
+            elif previous[0] != signature:
+                self.pending[entry.file_name] = (signature, now)
+
+    def next_check(self) -> Optional[float]:
+        """다음에 확인할 때까지 남은 시간 (기다리는 파일이 없으면 None)"""
+        if not self.pending:
+            return None
+        earliest = min(changed_at for _, changed_at in self.pending.values())
+        return max(0.0, earliest + self.settle_seconds - time.time())
+
+    def collect_ready(self) -> List[str]:
+        """쓰기가 끝난 파일을 꺼내 반환 (스캔 순서)"""
+        now = time.time()
+        ready = []
+        for file_name, (signature, changed_at) in list(self.pending.items()):
+            if now - changed_at < self.settle_seconds:
+                continue
+            path = self.source_directory / file_name
+            try:
+                stat = os.stat(path)
+                current = (stat.st_size, stat.st_mtime)
+                if current == signature and stat.st_size > 0:
+                    # 다른 프로세스가 쓰는 중이면 열리지 않는 환경(Windows)도 있음
+                    with open(path, 'rb'):
+                        pass
+            except OSError:
+                if not path.exists():
+                    del self.pending[file_name]
+                    continue
+                current = None
+            if current != signature or current[0] == 0:
+                self.pending[file_name] = (current or signature, now)
+                continue
+            del self.pending[file_name]
+            self.handled[file_name] = signature
+            ready.append(file_name)
+        return ready
+
+@dataclass
+class WatchBatch:
+    """감시 모드에서 변환한 배치 하나의 결과"""
+    files: List[str]
+    summary: ConversionSummary
+
+class InboxWatcher:
+    """폴더에 들어오는 HEIC 파일을 계속 변환하는 감시 모드
+
+    engine_factory(executor=..., reserved_names=...)로 배치마다 변환 엔진을 만들고, 작업 풀은 감시가 끝날 때까지 재사용합니다.
+    엔진 설정(증분 변환, 출력 이름 템플릿 등)은 배치마다 그대로 적용되며,
+    템플릿으로 정한 출력 이름은 감시하는 동안 기억해 다른 배치의 파일과도 겹치지 않게 합니다.
+    stop()은 다른 스레드나 시그널 핸들러에서 호출할 수 있고, 진행 중인 파일만 마친 뒤 run()이 반환됩니다.
+    """
+
+    def __init__(self, source_directory: Path, engine_factory: Callable[..., ConversionEngine],
+                 recursive: bool = True,
+                 include: Optional[Sequence[str]] = None,
+                 exclude: Optional[Sequence[str]] = None,
+                 settle_seconds: float = WATCH_SETTLE_SECONDS,
+                 polling: bool = False):
+        self.source_directory = Path(source_directory)
+        self.engine_factory = engine_factory
+        self.recursive = recursive
+        self.include = include
+        self.exclude = exclude
+        self.tracker = SettleTracker(self.source_directory, settle_seconds)
+        self.polling = polling
+        self.watcher: Optional[FolderWatcher] = None
+        self._engine: Optional[ConversionEngine] = None
+        # 출력 이름 템플릿으로 정한 이름 (원본 → 출력 이름, 배치가 달라도 겹치지 않도록 감시하는 동안 유지)
+        self.output_names: Dict[str, str] = {}
+        self._stopped = threading.Event()
+
+    def stop(self):
+        """감시 종료 요청 (변환 중이면 진행 중인 파일만 마침)"""
+        self._stopped.set()
+        if self.watcher is not None:
+            self.watcher.stop()
+        engine = self._engine
+        if engine is not None:
+            engine.cancel()
+
+    @property
+    def is_stopped(self) -> bool:
+        """종료 요청 여부"""
+        return self._stopped.is_set()
+
+    def run(self, progress_callback: Optional[ProgressCallback] = None,
+            batch_callback: Optional[Callable[[WatchBatch], None]] = None,
+            ready_callback: Optional[Callable[[str], None]] = None) -> List[WatchBatch]:
+        """stop()이 호출될 때까지 감시하며 변환 (변환한 배치 목록 반환)
+
+        ready_callback은 감시를 시작한 뒤 감시 방식 이름("inotify"/"polling")으로 한 번 호출됩니다.
+        """
+        # 출력 폴더는 감시하지 않음 (엔진 생성은 파일을 건드리지 않으므로 설정 확인용으로 하나 만듦)
+        template = self.engine_factory()
+        self.watcher, entries = start_watcher(self.source_directory, self.recursive, self.include, self.exclude,
+                                              template.format_directories, self.polling)
+        if self.is_stopped:
+            self.watcher.stop()
+        batches: List[WatchBatch] = []
+        try:
+            self.tracker.observe(entries, initial=True)
+            if ready_callback:
+                ready_callback(self.watcher.method)
+            with create_executor(template.backend, template.max_workers) as executor:
+                while not self.is_stopped:
+                    ready = self.tracker.collect_ready()
+                    if ready:
+                        batch = self._convert(ready, executor, progress_callback)
+                        batches.append(batch)
+                        if batch_callback:
+                            batch_callback(batch)
+                        continue
+                    entries = self.watcher.wait(self.tracker.next_check())
+                    self.tracker.observe(entries, full_scan=self.watcher.full_scan)
+        finally:
+            self.watcher.close()
+        return batches
+
+    def _convert(self, file_names: List[str], executor,
+                 progress_callback: Optional[ProgressCallback]) -> WatchBatch:
+        """쓰기가 끝난 파일들을 하나의 배치로 변환"""
+        engine = self.engine_factory(executor=executor, reserved_names=self.output_names)
+        self._engine = engine
+        if self.is_stopped:
+            engine.cancel()
+        try:
+            summary = engine.run(file_names, progress_callback, len(file_names))
+        finally:
+            self._engine = None
+        return WatchBatch(file_names, summary)